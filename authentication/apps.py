@@ -6,4 +6,4 @@ class AuthenticationConfig(AppConfig):
     name = "authentication"
 
     def ready(self):
-        from . import signals
+        from . import checks, signals
@@ -0,0 +1,184 @@
+import functools
+import hashlib
+import re
+import time
+from threading import Lock
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+from django.utils.translation import gettext_lazy as _
+from rest_framework import HTTP_HEADER_ENCODING
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+from rest_framework.exceptions import AuthenticationFailed as DRFAuthenticationFailed
+from rest_framework_simplejwt.authentication import AUTH_HEADER_TYPE_BYTES, JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from authentication import user_cache
+
+# The authenticators DispatchAuthentication routes to, by name.
+BACKENDS = {
+    'jwt': 'authentication.authentication.ClaimsJWTAuthentication',
+    'oauth2': 'oauth2_provider.contrib.rest_framework.OAuth2Authentication',
+    'social': 'drf_social_oauth2.authentication.SocialAuthentication',
+}
+
+# Backends whose rejections are remembered: both look the token up in the
+# database or at the provider. A bad JWT fails its signature check faster
+# than a cache read.
+NEGATIVE_CACHE_BACKENDS = ('oauth2', 'social')
+
+# Seconds a rejected token is answered from the cache.
+NEGATIVE_CACHE_TTL = 30
+
+# RFC 6750 b64token, the shape of a django-oauth-toolkit access token.
+BEARER_TOKEN_RE = re.compile(r'^[A-Za-z0-9\-._~+/]+=*$')
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that trusts the token's signature and its embedded
+    claims (see authentication.tokens) and looks the user up in the shared
+    user cache rather than the database.
+
+    request.user is still a full CustomUser, since views filter and create
+    rows with it; request.auth carries the signed claims. A cache hit costs
+    one cache read and no query, and signals drop a user's entry whenever
+    the user is saved or deleted, so deactivation and profile or password
+    changes take effect on the next request.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = user_cache.get_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
+
+
+@functools.cache
+def backend_class(backend):
+    return import_string(BACKENDS[backend])
+
+
+class BackendTimings:
+    """
+    Per-process counters of how often each backend ran, how it answered and
+    how long it took.
+    """
+    OUTCOMES = ('authenticated', 'anonymous', 'rejected')
+
+    def __init__(self):
+        self._lock = Lock()
+        self._counters = {}
+
+    def record(self, backend, outcome, seconds, cached=False):
+        with self._lock:
+            counters = self._counters.setdefault(backend, dict.fromkeys(
+                self.OUTCOMES + ('negative_cache_hits', 'requests', 'seconds'), 0))
+            counters[outcome] += 1
+            counters['requests'] += 1
+            counters['seconds'] += seconds
+            if cached:
+                counters['negative_cache_hits'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            counters = {backend: dict(values) for backend, values in self._counters.items()}
+        for values in counters.values():
+            seconds = values.pop('seconds')
+            values['total_ms'] = round(seconds * 1000, 3)
+            values['mean_ms'] = round(seconds * 1000 / values['requests'], 3)
+        return counters
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+
+
+backend_timings = BackendTimings()
+
+
+class DispatchAuthentication(BaseAuthentication):
+    """
+    Picks the one backend in BACKENDS that can handle the Authorization
+    header and runs only that one, instead of trying each in turn:
+
+        JWT <token>                  -> jwt
+        Bearer <token>               -> oauth2
+        Bearer <backend> <token>     -> social
+
+    Other schemes, and Bearer tokens that cannot be OAuth2 tokens, are left
+    anonymous without running any backend. Headerless requests still reach
+    oauth2 when they pass an access_token query parameter. Rejections by the
+    backends in NEGATIVE_CACHE_BACKENDS are cached for NEGATIVE_CACHE_TTL
+    seconds, and every run is counted in backend_timings.
+    """
+
+    def authenticate(self, request):
+        backend = self.select_backend(request)
+        if backend is None:
+            return None
+
+        started = time.perf_counter()
+        key = None
+        if backend in NEGATIVE_CACHE_BACKENDS:
+            key = self.negative_cache_key(request)
+            rejection = cache.get(key)
+            if rejection is not None:
+                return self.replay(request, backend, rejection, started)
+
+        try:
+            result = self.get_authenticator(backend).authenticate(request)
+        except DRFAuthenticationFailed as exc:
+            backend_timings.record(backend, 'rejected', time.perf_counter() - started)
+            if key is not None:
+                cache.set(key, ('rejected', exc.detail, exc.get_codes()), NEGATIVE_CACHE_TTL)
+            raise
+
+        if result is None:
+            backend_timings.record(backend, 'anonymous', time.perf_counter() - started)
+            if key is not None:
+                cache.set(key, ('anonymous', getattr(request, 'oauth2_error', {})), NEGATIVE_CACHE_TTL)
+            return None
+        backend_timings.record(backend, 'authenticated', time.perf_counter() - started)
+        return result
+
+    def authenticate_header(self, request):
+        return self.get_authenticator(self.select_backend(request) or 'jwt').authenticate_header(request)
+
+    def select_backend(self, request):
+        parts = get_authorization_header(request).split()
+        if not parts:
+            return 'oauth2' if 'access_token' in request.query_params else None
+        if parts[0] in AUTH_HEADER_TYPE_BYTES:
+            return 'jwt'
+        if parts[0].lower() != b'bearer':
+            return None
+        if len(parts) != 2:
+            # The social backend also owns the errors for malformed headers.
+            return 'social'
+        if BEARER_TOKEN_RE.match(parts[1].decode(HTTP_HEADER_ENCODING)):
+            return 'oauth2'
+        return None
+
+    def get_authenticator(self, backend):
+        return backend_class(backend)()
+
+    def negative_cache_key(self, request):
+        header = get_authorization_header(request) or request.query_params['access_token'].encode()
+        return f'auth:rejected:{hashlib.sha256(header).hexdigest()}'
+
+    def replay(self, request, backend, rejection, started):
+        outcome, *details = rejection
+        backend_timings.record(backend, outcome, time.perf_counter() - started, cached=True)
+        if outcome == 'rejected':
+            detail, code = details
+            raise DRFAuthenticationFailed(detail, code)
+        # OAuth2Authentication builds its WWW-Authenticate header from this.
+        request.oauth2_error = details[0]
+        return None
@@ -0,0 +1,34 @@
+from django.core.checks import Error, Tags, Warning, register
+from utils.shared_cache import is_shared
+
+
+def process_local_cache(level, id):
+    return [level(
+        "The default cache is local to each process, so cached users and token "
+        "revocations are not shared between workers.",
+        hint="Set REDIS_CACHE_URL to use Redis for the default cache.",
+        id=id,
+    )]
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    The user cache and the revocation version only work across workers when
+    the default cache is shared. A process-local cache is fine for
+    development and tests, so outside deployment checks it is a warning.
+    """
+    if is_shared():
+        return []
+    return process_local_cache(Warning, 'authentication.W001')
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache_deploy(app_configs, **kwargs):
+    """
+    check_shared_cache for `manage.py check --deploy`, which the release
+    phase runs: there a process-local cache is an error.
+    """
+    if is_shared():
+        return []
+    return process_local_cache(Error, 'authentication.E001')
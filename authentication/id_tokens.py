@@ -0,0 +1,252 @@
+import json
+import logging
+import re
+import threading
+import time
+import jwt
+import requests
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_CERTS_URL = 'https://www.googleapis.com/oauth2/v3/certs'
+GOOGLE_ISSUERS = ('accounts.google.com', 'https://accounts.google.com')
+
+# Seconds keys are kept when the issuer sends no usable max-age.
+DEFAULT_KEYS_MAX_AGE = 60 * 60
+
+# Share of the max-age after which keys are refreshed in the background
+# while the current ones keep verifying tokens.
+REFRESH_AHEAD = 0.8
+
+# Least seconds between fetches after a failed one or for an unknown kid,
+# so an unreachable issuer or tokens with made-up key ids cannot turn every
+# login into an outbound request.
+REFETCH_INTERVAL = 60
+
+KEYS_FETCH_TIMEOUT = 5
+
+CACHE_CONTROL_MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+
+class IDTokenError(ValueError):
+    pass
+
+
+class KeysUnavailable(IDTokenError):
+    pass
+
+
+class JWKSKeySource:
+    """
+    Fetches a JSON Web Key Set over HTTP and reads how long it may be kept
+    from the response's Cache-Control and Age headers.
+    """
+
+    def __init__(self, url=GOOGLE_CERTS_URL, timeout=KEYS_FETCH_TIMEOUT):
+        self.url = url
+        self.timeout = timeout
+
+    def fetch(self):
+        """
+        Returns (jwks, max_age), max_age being None when the response does
+        not say.
+        """
+        response = requests.get(self.url, timeout=self.timeout)
+        response.raise_for_status()
+        match = CACHE_CONTROL_MAX_AGE_RE.search(response.headers.get('Cache-Control', ''))
+        max_age = None
+        if match:
+            try:
+                age = int(response.headers.get('Age', 0))
+            except ValueError:
+                age = 0
+            max_age = max(int(match.group(1)) - age, 0)
+        return response.json(), max_age
+
+
+class StaticKeySource:
+    """
+    Serves a fixed key set, such as a local issuer's, with no network.
+    """
+
+    def __init__(self, jwks, max_age=None):
+        self.jwks = json.loads(jwks) if isinstance(jwks, str) else jwks
+        self.max_age = max_age
+
+    def fetch(self):
+        return self.jwks, self.max_age
+
+
+class CachedKeySet:
+    """
+    Signing keys from a key source, by kid, kept for the max-age the source
+    gives. Past REFRESH_AHEAD of it a single background thread fetches new
+    keys while the current ones are still served; only expired keys, or a
+    kid not seen before, make a caller wait for a fetch.
+
+    _lock serializes the fetches callers wait for and every swap of the
+    keys. The background refresh fetches without it and only takes it to
+    swap, so it never holds up a caller; _refresh_lock guards its flag.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.keys = {}
+        self.fetched_at = None
+        self.refresh_at = self.expires_at = 0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refreshing = False
+
+    def get(self, kid):
+        now = time.monotonic()
+        if now >= self.expires_at:
+            self.fetch_now(now)
+        elif now >= self.refresh_at:
+            self.refresh_in_background()
+
+        key = self.keys.get(kid)
+        if key is None and (self.fetched_at is None or now - self.fetched_at >= REFETCH_INTERVAL):
+            # The issuer may have rotated its keys before our copy expired.
+            self.fetch_now(now, force=True)
+            key = self.keys.get(kid)
+        if key is None:
+            raise IDTokenError(f"No signing key with kid {kid!r}.")
+        return key
+
+    def fetch_now(self, now, force=False):
+        with self._lock:
+            # Another thread may have fetched while this one waited.
+            if not force and now < self.expires_at:
+                return
+            if force and self.fetched_at is not None and now - self.fetched_at < REFETCH_INTERVAL:
+                return
+            try:
+                self.install(*self.fetch())
+            except Exception as exc:
+                if not self.keys:
+                    raise KeysUnavailable(f"Could not fetch signing keys: {exc}") from exc
+                # Better to keep verifying with the last keys than to fail
+                # every login while the issuer is unreachable.
+                logger.warning(f"Keeping stale signing keys, fetch failed: {exc}")
+                self.fetched_at = time.monotonic()
+                self.refresh_at = self.expires_at = self.fetched_at + REFETCH_INTERVAL
+
+    def refresh_in_background(self):
+        with self._refresh_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self.refresh, daemon=True).start()
+
+    def refresh(self):
+        try:
+            keys, max_age = self.fetch()
+        except Exception as exc:
+            logger.warning(f"Background refresh of signing keys failed: {exc}")
+            with self._lock:
+                self.refresh_at = min(time.monotonic() + REFETCH_INTERVAL, self.expires_at)
+        else:
+            with self._lock:
+                self.install(keys, max_age)
+        finally:
+            with self._refresh_lock:
+                self._refreshing = False
+
+    def fetch(self):
+        """
+        Fetches and parses the key set, returning (keys by kid, max_age).
+        """
+        jwks, max_age = self.source.fetch()
+        keys = {}
+        for data in jwks.get('keys', []):
+            try:
+                key = jwt.PyJWK(data)
+            except jwt.PyJWKError:
+                continue
+            keys[key.key_id] = key
+        if not keys:
+            raise IDTokenError("The key set has no usable keys.")
+        return keys, max_age
+
+    def install(self, keys, max_age):
+        if max_age is None:
+            max_age = DEFAULT_KEYS_MAX_AGE
+        now = time.monotonic()
+        self.keys = keys
+        self.fetched_at = now
+        self.expires_at = now + max_age
+        self.refresh_at = now + max_age * REFRESH_AHEAD
+
+
+class IDTokenVerifier:
+    """
+    Verifies OpenID Connect ID tokens locally against an issuer's cached
+    signing keys, checking signature, expiry, audience and issuer.
+    """
+
+    def __init__(self, key_source, issuers, audience, algorithms=('RS256',), leeway=0):
+        self.keys = CachedKeySet(key_source)
+        self.issuers = tuple(issuers)
+        self.audience = audience
+        self.algorithms = list(algorithms)
+        self.leeway = leeway
+
+    def verify(self, token):
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.PyJWTError as exc:
+            raise IDTokenError(str(exc)) from exc
+        if header.get('alg') not in self.algorithms:
+            raise IDTokenError(f"Unexpected signing algorithm {header.get('alg')!r}.")
+
+        key = self.keys.get(header.get('kid'))
+        try:
+            claims = jwt.decode(
+                token, key=key.key, algorithms=self.algorithms, audience=self.audience,
+                leeway=self.leeway, options={'require': ['exp', 'iat', 'iss', 'aud', 'sub']})
+        except jwt.PyJWTError as exc:
+            raise IDTokenError(str(exc)) from exc
+        if claims['iss'] not in self.issuers:
+            raise IDTokenError(f"Wrong issuer {claims['iss']!r}.")
+        return claims
+
+
+def google_key_source():
+    """
+    The key source named by the GOOGLE_ID_TOKEN_KEY_SOURCE setting, a dotted
+    path to a callable returning one; Google's JWKS endpoint by default.
+    """
+    path = getattr(settings, 'GOOGLE_ID_TOKEN_KEY_SOURCE', None)
+    if path:
+        return import_string(path)()
+    return JWKSKeySource(GOOGLE_CERTS_URL)
+
+
+_google_verifier = None
+_google_verifier_lock = threading.Lock()
+
+
+def google_verifier():
+    global _google_verifier
+    if _google_verifier is None:
+        with _google_verifier_lock:
+            if _google_verifier is None:
+                _google_verifier = IDTokenVerifier(
+                    google_key_source(), GOOGLE_ISSUERS, list(settings.GOOGLE_CLIENT_IDS))
+    return _google_verifier
+
+
+def verify_google_id_token(token):
+    return google_verifier().verify(token)
+
+
+@receiver(setting_changed)
+def reset_google_verifier(*, setting, **kwargs):
+    global _google_verifier
+    if setting in ('GOOGLE_CLIENT_IDS', 'GOOGLE_ID_TOKEN_KEY_SOURCE'):
+        _google_verifier = None
@@ -0,0 +1,86 @@
+import time
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils.module_loading import import_string
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from authentication.authentication import BACKENDS, ClaimsJWTAuthentication, DispatchAuthentication, backend_timings
+from authentication.models import CustomUser
+from authentication.tokens import ClaimsRefreshToken
+from authentication.user_cache import user_cache_key
+
+
+def authenticate_chain(authenticators, request):
+    """
+    Runs authenticators in turn the way DRF does with several
+    DEFAULT_AUTHENTICATION_CLASSES, stopping at the first answer.
+    """
+    for authenticator in authenticators:
+        result = authenticator.authenticate(request)
+        if result is not None:
+            return result
+    return None
+
+
+class Command(BaseCommand):
+    help = ("Measures the per-request cost of authentication: the JWT user lookup with and "
+            "without the user cache, and the backend chain against DispatchAuthentication.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('email', help="Email of an existing, active user to authenticate as.")
+        parser.add_argument('--rounds', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        try:
+            user = CustomUser.objects.get(email__iexact=options['email'])
+        except CustomUser.DoesNotExist:
+            raise CommandError(f"There is no user {options['email']}.")
+        rounds = options['rounds']
+
+        access = ClaimsRefreshToken.for_user(user).access_token
+        jwt_header = f'{api_settings.AUTH_HEADER_TYPES[0]} {access}'
+        cache.delete(user_cache_key(user.pk))
+
+        self.stdout.write("User lookup, valid JWT:")
+        for name, backend in (('JWTAuthentication', JWTAuthentication()),
+                              ('ClaimsJWTAuthentication', ClaimsJWTAuthentication())):
+            self.report(name, backend.authenticate, jwt_header, rounds)
+
+        chain = [import_string(path)() for path in BACKENDS.values()]
+        dispatch = DispatchAuthentication()
+        for title, header in (("valid JWT", jwt_header),
+                              ("unknown OAuth2 token", 'Bearer 0123456789abcdefghijABCDEFGHIJ'),
+                              ("no Authorization header", None)):
+            self.stdout.write(f"Backend selection, {title}:")
+            self.report('chain', lambda request: authenticate_chain(chain, request), header, rounds)
+            self.report('DispatchAuthentication', dispatch.authenticate, header, rounds)
+
+        backend_timings.reset()
+
+    def report(self, name, authenticate, header, rounds):
+        extra = {'HTTP_AUTHORIZATION': header} if header else {}
+        request = Request(RequestFactory().get('/', **extra))
+        seconds, queries = self.measure(authenticate, request, rounds)
+        self.stdout.write(
+            f"  {name}: {seconds * 1000000:.0f} us and {queries / rounds:.2f} queries per request")
+
+    def measure(self, authenticate, request, rounds):
+        # One warm-up call fills the caches, as the first request would.
+        self.attempt(authenticate, request)
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for _ in range(rounds):
+                self.attempt(authenticate, request)
+            seconds = (time.perf_counter() - started) / rounds
+        return seconds, len(queries)
+
+    def attempt(self, authenticate, request):
+        try:
+            return authenticate(request)
+        except AuthenticationFailed:
+            return None
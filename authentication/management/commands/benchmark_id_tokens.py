@@ -0,0 +1,110 @@
+import json
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import jwt
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from django.core.management.base import BaseCommand
+from google.auth.transport import requests as google_requests
+from google.oauth2 import id_token
+from authentication.id_tokens import GOOGLE_ISSUERS, IDTokenVerifier, JWKSKeySource
+
+AUDIENCE = 'benchmark.apps.googleusercontent.com'
+
+
+class LocalIssuer:
+    """
+    A stand-in for Google's token issuer: an RSA key that signs ID tokens,
+    published over HTTP both as a JWKS (/jwks) and in the kid -> x509
+    certificate format google-auth reads (/certs).
+    """
+
+    def __init__(self, max_age=3600):
+        self.kid = uuid.uuid4().hex
+        self.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.max_age = max_age
+        self.fetches = 0
+        jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(self.private_key.public_key()))
+        jwk.update(kid=self.kid, alg='RS256', use='sig')
+        self.documents = {
+            '/jwks': json.dumps({'keys': [jwk]}).encode(),
+            '/certs': json.dumps({self.kid: self.certificate()}).encode(),
+        }
+
+    def certificate(self):
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'local issuer')])
+        now = datetime.now(timezone.utc)
+        certificate = (x509.CertificateBuilder().subject_name(name).issuer_name(name)
+                       .public_key(self.private_key.public_key())
+                       .serial_number(x509.random_serial_number())
+                       .not_valid_before(now - timedelta(days=1)).not_valid_after(now + timedelta(days=1))
+                       .sign(self.private_key, hashes.SHA256()))
+        return certificate.public_bytes(serialization.Encoding.PEM).decode()
+
+    def token(self, audience=AUDIENCE):
+        now = int(time.time())
+        claims = {'iss': GOOGLE_ISSUERS[1], 'aud': audience, 'sub': '1', 'email': 'user@example.com',
+                  'iat': now, 'exp': now + 3600}
+        return jwt.encode(claims, self.private_key, algorithm='RS256', headers={'kid': self.kid})
+
+    def serve(self):
+        issuer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = issuer.documents.get(self.path)
+                if body is None:
+                    self.send_error(404)
+                    return
+                issuer.fetches += 1
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Cache-Control', f'public, max-age={issuer.max_age}')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+class Command(BaseCommand):
+    help = ("Compares google-auth's verify_token, which fetches the signing certificates on "
+            "every call, with IDTokenVerifier's cached keys, against a local issuer.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=500)
+
+    def handle(self, *args, **options):
+        issuer = LocalIssuer()
+        server, url = issuer.serve()
+        token = issuer.token()
+        rounds = options['rounds']
+        verifier = IDTokenVerifier(JWKSKeySource(f'{url}/jwks'), GOOGLE_ISSUERS, AUDIENCE)
+
+        def google_auth():
+            return id_token.verify_token(token, google_requests.Request(), AUDIENCE, certs_url=f'{url}/certs')
+
+        try:
+            for name, verify in (('google-auth verify_token', google_auth),
+                                 ('IDTokenVerifier', lambda: verifier.verify(token))):
+                verify()
+                issuer.fetches = 0
+                started = time.perf_counter()
+                for _ in range(rounds):
+                    verify()
+                seconds = (time.perf_counter() - started) / rounds
+                self.stdout.write(
+                    f"{name}: {seconds * 1000000:.0f} us and {issuer.fetches / rounds:.2f} "
+                    f"key fetches per token")
+        finally:
+            server.shutdown()
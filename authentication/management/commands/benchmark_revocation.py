@@ -0,0 +1,61 @@
+import time
+import uuid
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from authentication.revocation import RevocationStore
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ("Compares the blacklist check of a refresh token, a query per check against the "
+            "revocation store, for blacklists of growing size. Rows are rolled back afterwards.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tokens', type=int, nargs='+', default=[1000, 100000],
+                            help="Blacklist sizes to measure.")
+        parser.add_argument('--rounds', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        for size in options['tokens']:
+            try:
+                with transaction.atomic():
+                    self.measure_size(size, options['rounds'])
+                    raise Rollback
+            except Rollback:
+                pass
+
+    def measure_size(self, size, rounds):
+        expires_at = timezone.now() + timedelta(days=1)
+        outstanding = OutstandingToken.objects.bulk_create(
+            [OutstandingToken(jti=uuid.uuid4().hex, token='', expires_at=expires_at) for _ in range(size)],
+            batch_size=5000)
+        BlacklistedToken.objects.bulk_create(
+            [BlacklistedToken(token=token) for token in outstanding], batch_size=5000)
+        revoked = outstanding[size // 2].jti
+        store = RevocationStore()
+
+        def query(jti):
+            return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+        self.stdout.write(f"{size} blacklisted tokens:")
+        started = time.perf_counter()
+        store.sync()
+        self.stdout.write(f"  filter load: {(time.perf_counter() - started) * 1000:.0f} ms")
+        for name, check in (('query', query), ('RevocationStore', store.is_revoked)):
+            for label, jti in (('live token', uuid.uuid4().hex), ('revoked token', revoked)):
+                connection.queries_log.clear()
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    for _ in range(rounds):
+                        check(jti)
+                    seconds = (time.perf_counter() - started) / rounds
+                self.stdout.write(
+                    f"  {name}, {label}: {seconds * 1000000:.0f} us and "
+                    f"{len(queries) / rounds:.2f} queries per check")
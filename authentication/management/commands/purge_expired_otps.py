@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from authentication.otp import purge_expired
+
+
+class Command(BaseCommand):
+    help = ("Deletes expired OTPs and OTP send windows. Expired rows are already ignored "
+            "or replaced in place, so this only keeps the tables small.")
+
+    def handle(self, *args, **options):
+        otps, windows = purge_expired()
+        self.stdout.write(f"Deleted {otps} expired OTPs and {windows} expired send windows.")
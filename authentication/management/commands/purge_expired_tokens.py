@@ -0,0 +1,44 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+
+class Command(BaseCommand):
+    help = ("Deletes expired outstanding and blacklisted refresh tokens in small batches. "
+            "Unlike flushexpiredtokens it never holds one long transaction or scans the "
+            "table for every batch, so it can run while the API is serving refreshes.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--sleep', type=float, default=0,
+                            help="Seconds to pause between batches.")
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        last_pk = 0
+        deleted_outstanding = deleted_blacklisted = 0
+
+        # Walk the primary key instead of filtering on expires_at, which
+        # has no index: each batch reads batch-size rows whatever the table
+        # size, and the walk ends after one pass.
+        while True:
+            rows = list(OutstandingToken.objects.filter(pk__gt=last_pk)
+                        .order_by('pk').values_list('pk', 'expires_at')[:options['batch_size']])
+            if not rows:
+                break
+            last_pk = rows[-1][0]
+            expired = [pk for pk, expires_at in rows if expires_at < now]
+            if not expired:
+                continue
+
+            with transaction.atomic():
+                deleted_blacklisted += BlacklistedToken.objects.filter(token_id__in=expired).delete()[0]
+                deleted_outstanding += OutstandingToken.objects.filter(pk__in=expired).delete()[0]
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(
+            f"Deleted {deleted_outstanding} expired outstanding tokens and "
+            f"{deleted_blacklisted} blacklisted tokens.")
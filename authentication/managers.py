@@ -1,9 +1,27 @@
 from django.contrib.auth.base_user import BaseUserManager
+from django.db import models
 from django.utils.translation import gettext_lazy as _
 
 
+def email_key(email):
+    """
+    The case-insensitive form of an email address: what CustomUser.email_key
+    stores and what every lookup by email compares against.
+    """
+    return (email or '').strip().lower()
 
-class CustomUserManager(BaseUserManager):
+
+class CustomUserQuerySet(models.QuerySet):
+    def by_email(self, email):
+        # An exact match on the indexed email_key column; email__iexact
+        # compiles to UPPER(email) = UPPER(%s), which no index serves.
+        return self.filter(email_key=email_key(email))
+
+
+class CustomUserManager(BaseUserManager.from_queryset(CustomUserQuerySet)):
+
+    def get_by_natural_key(self, username):
+        return self.by_email(username).get()
 
     def create_user(self, email, password=None, **extra_fields):
        
@@ -25,4 +43,4 @@ class CustomUserManager(BaseUserManager):
             raise ValueError(_('Superuser must have is_staff=True.'))
         if extra_fields.get('is_superuser') is not True:
             raise ValueError(_('Superuser must have is_superuser=True.'))
-        return self.create_user(email, password, **extra_fields)
\ No newline at end of file
+        return self.create_user(email, password, **extra_fields)
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentication", "0003_rename_businesscategogy_businesscategory"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customuser",
+            name="updated_on",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,41 @@
+from collections import defaultdict
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+
+def backfill_email_key(apps, schema_editor):
+    CustomUser = apps.get_model("authentication", "CustomUser")
+    users = CustomUser.objects.filter(email_key__isnull=True).only("id", "email").order_by("pk")
+
+    # The next migration makes email_key unique; name the accounts that
+    # would collide rather than let it fail on an IntegrityError.
+    by_key = defaultdict(list)
+    for email in CustomUser.objects.values_list("email", flat=True).iterator():
+        by_key[email.strip().lower()].append(email)
+    duplicates = [emails for emails in by_key.values() if len(emails) > 1]
+    if duplicates:
+        raise RuntimeError(
+            "These accounts differ only in the case of their email and must be merged "
+            f"before email_key can be unique: {duplicates}")
+
+    batch = []
+    for user in users.iterator(chunk_size=BATCH_SIZE):
+        user.email_key = user.email.strip().lower()
+        batch.append(user)
+        if len(batch) == BATCH_SIZE:
+            CustomUser.objects.bulk_update(batch, ["email_key"])
+            batch = []
+    if batch:
+        CustomUser.objects.bulk_update(batch, ["email_key"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentication", "0005_customuser_email_key"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_email_key, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentication", "0006_backfill_customuser_email_key"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="customuser",
+            name="email_key",
+            field=models.CharField(editable=False, max_length=254, unique=True),
+        ),
+    ]
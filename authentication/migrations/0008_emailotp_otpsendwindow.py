@@ -0,0 +1,55 @@
+# Generated by Django 5.0.6 on 2026-10-18 12:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentication", "0007_alter_customuser_email_key"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EmailOTP",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("purpose", models.CharField(max_length=50)),
+                ("email_digest", models.CharField(max_length=64)),
+                ("code_digest", models.CharField(max_length=64)),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                ("expires_at", models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name="OTPSendWindow",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.CharField(max_length=100, unique=True)),
+                ("count", models.PositiveIntegerField(default=0)),
+                ("window_ends_at", models.DateTimeField()),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="emailotp",
+            constraint=models.UniqueConstraint(
+                fields=("purpose", "email_digest"), name="email_otp_purpose_email_uniq"
+            ),
+        ),
+    ]
@@ -4,7 +4,7 @@ from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
-from .managers import CustomUserManager
+from .managers import CustomUserManager, email_key
 from cloudinary.models import CloudinaryField
 
 
@@ -18,6 +18,9 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     id = models.UUIDField(
         primary_key=True, default=uuid.uuid4, editable=False, db_index=True)
     email = models.EmailField(_('email address'), unique=True)
+    # email lower-cased, kept in step by save(); lookups go through
+    # CustomUser.objects.by_email() so they hit this column's index.
+    email_key = models.CharField(max_length=254, unique=True, editable=False)
     is_staff = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
     is_superuser = models.BooleanField(default=False)
@@ -36,6 +39,7 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     is_business = models.BooleanField(default=False)
     is_social_user = models.BooleanField(default=False)
     date_joined = models.DateTimeField(default=timezone.now)
+    updated_on = models.DateTimeField(auto_now=True)
 
     objects = CustomUserManager()
 
@@ -48,6 +52,13 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return str(self.email)
 
+    def save(self, *args, **kwargs):
+        self.email_key = email_key(self.email)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'email' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'email_key'}
+        super().save(*args, **kwargs)
+
     def get_short_name(self):
         """
         Returns the short name for the user.
@@ -87,3 +98,38 @@ class UserBusiness(models.Model):
 
     def __str__(self):
         return self.business_name
+
+
+class EmailOTP(models.Model):
+    """
+    The live one-time password of an email for one purpose (see
+    authentication.otp). Only HMACs of the email and the code are stored,
+    and the wrong-guess counter lives and expires with the code.
+    """
+    purpose = models.CharField(max_length=50)
+    email_digest = models.CharField(max_length=64)
+    code_digest = models.CharField(max_length=64)
+    attempts = models.PositiveIntegerField(default=0)
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return f'{self.purpose} OTP'
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['purpose', 'email_digest'],
+                                    name='email_otp_purpose_email_uniq'),
+        ]
+
+
+class OTPSendWindow(models.Model):
+    """
+    OTP sends counted for one client IP or email address (an HMAC of it)
+    in a fixed window ending at window_ends_at.
+    """
+    key = models.CharField(max_length=100, unique=True)
+    count = models.PositiveIntegerField(default=0)
+    window_ends_at = models.DateTimeField()
+
+    def __str__(self):
+        return f'{self.key} ({self.count})'
@@ -0,0 +1,125 @@
+import hashlib
+import hmac
+import secrets
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from authentication.managers import email_key
+from authentication.models import EmailOTP, OTPSendWindow
+
+OTP_LENGTH = 6
+
+# Seconds an OTP stays valid.
+OTP_TTL = 10 * 60
+
+# Wrong guesses allowed per OTP before it is thrown away. With six digits
+# this caps a guessing attack at a 1 in 200,000 chance per OTP sent.
+OTP_MAX_ATTEMPTS = 5
+
+# (sends, seconds) allowed per email address and per client IP.
+OTP_EMAIL_SEND_RATE = (3, 10 * 60)
+OTP_IP_SEND_RATE = (10, 60 * 60)
+
+OTP_VERIFIED = 'verified'
+OTP_INVALID = 'invalid'
+OTP_MISSING = 'missing'
+OTP_LOCKED = 'locked'
+
+
+def normalize_email(email):
+    return email_key(email)
+
+
+def digest(value):
+    return hmac.new(settings.SECRET_KEY.encode(), value.encode(), hashlib.sha256).hexdigest()
+
+
+class OTPStore:
+    """
+    One-time passwords kept in the EmailOTP table, so every worker and
+    process sees the same codes. Only HMACs of the email and the code are
+    stored, and a code's wrong-guess counter sits on the same row, so the
+    two expire together after OTP_TTL.
+
+    Each email has at most one live code per purpose: issuing a new one
+    replaces the old one and resets its attempt counter.
+    """
+
+    def __init__(self, purpose):
+        self.purpose = purpose
+
+    def otps(self, email):
+        return EmailOTP.objects.filter(purpose=self.purpose, email_digest=digest(normalize_email(email)))
+
+    def issue(self, email):
+        code = f'{secrets.randbelow(10 ** OTP_LENGTH):0{OTP_LENGTH}d}'
+        EmailOTP.objects.update_or_create(
+            purpose=self.purpose, email_digest=digest(normalize_email(email)),
+            defaults={
+                'code_digest': digest(code),
+                'attempts': 0,
+                'expires_at': timezone.now() + timedelta(seconds=OTP_TTL),
+            })
+        return code
+
+    def verify(self, email, code):
+        """
+        Checks code against the email's live OTP and returns one of the
+        OTP_* outcomes. A verified code is consumed, and so is one that has
+        seen OTP_MAX_ATTEMPTS wrong guesses.
+        """
+        otp = self.otps(email).filter(expires_at__gt=timezone.now()).first()
+        if otp is None:
+            return OTP_MISSING
+        # Rows are matched on the code as read, so that a code issued in
+        # the meantime is neither counted against nor consumed here.
+        same_otp = EmailOTP.objects.filter(pk=otp.pk, code_digest=otp.code_digest)
+        # The guess is counted before it is compared, in one conditional
+        # UPDATE, so concurrent guesses cannot get past OTP_MAX_ATTEMPTS.
+        if not same_otp.filter(attempts__lt=OTP_MAX_ATTEMPTS).update(attempts=F('attempts') + 1):
+            same_otp.delete()
+            return OTP_LOCKED
+        if not hmac.compare_digest(otp.code_digest, digest(str(code or ''))):
+            return OTP_INVALID
+        # Only the request that actually deletes the code wins, so a code
+        # cannot be redeemed twice by concurrent requests.
+        if not same_otp.delete()[0]:
+            return OTP_MISSING
+        return OTP_VERIFIED
+
+    def discard(self, email):
+        self.otps(email).delete()
+
+
+def allow_send(scope, ident, rate):
+    """
+    Counts one OTP send against a fixed window for scope/ident and returns
+    False once rate = (sends, seconds) is used up. Each step is a single
+    conditional statement, so concurrent sends are all counted.
+    """
+    sends, seconds = rate
+    now = timezone.now()
+    window_ends_at = now + timedelta(seconds=seconds)
+    key = f'{scope}:{digest(ident)}'
+    windows = OTPSendWindow.objects.filter(key=key)
+    # A window that has run out starts over with this send.
+    if windows.filter(window_ends_at__lte=now).update(count=1, window_ends_at=window_ends_at):
+        return True
+    window, created = OTPSendWindow.objects.get_or_create(
+        key=key, defaults={'count': 1, 'window_ends_at': window_ends_at})
+    if created:
+        return True
+    return bool(windows.filter(count__lt=sends, window_ends_at__gt=now).update(count=F('count') + 1))
+
+
+def purge_expired(now=None):
+    """
+    Deletes expired OTPs and send windows and returns how many of each.
+    """
+    now = now or timezone.now()
+    return (EmailOTP.objects.filter(expires_at__lte=now).delete()[0],
+            OTPSendWindow.objects.filter(window_ends_at__lte=now).delete()[0])
+
+
+email_verification = OTPStore('email_verification')
@@ -9,6 +9,7 @@ from rest_framework.validators import ValidationError
 from rest_framework.authtoken.models import Token
 from django.contrib.auth import get_user_model
 from exceptions.custom_apiexception_class import *
+from utils.taxonomy_cache import TaxonomyCache
 User = get_user_model()
 
 
@@ -56,6 +57,14 @@ class UserSerializer(serializers.ModelSerializer):
                   'first_name', 'last_name', 'phone_number', 'image', 'is_verified', 'is_social_user', 'is_business']
         extra_kwargs = {'password': {'write_only': True}}
 
+    def validate_email(self, value):
+        users = User.objects.by_email(value)
+        if self.instance is not None:
+            users = users.exclude(pk=self.instance.pk)
+        if users.exists():
+            raise ValidationError("A user with this email address already exists.")
+        return value
+
     def create(self, validated_data):
         password = validated_data.pop('password')
 
@@ -121,12 +130,18 @@ class UserBusinessSerializer(serializers.ModelSerializer):
         category_type_data = validated_data.pop('category_type', [])
         user_business = UserBusiness.objects.create(**validated_data)
 
-        # Process each category and either get or create it based on the "text" field
+        # Resolve each category by its "text" field, from the taxonomy cache
+        # where possible, creating the ones that do not exist yet
+        texts = [category_data.get('text') for category_data in category_type_data]
+        known = TaxonomyCache.for_model(
+            BusinessCategory).ids_by_name(texts)
         categories = []
-        for category_data in category_type_data:
-            text_value = category_data.get('text')
-            category_obj, created = BusinessCategory.objects.get_or_create(text=text_value)
-            categories.append(category_obj)
+        for text_value in texts:
+            if text_value in known:
+                categories.append(known[text_value])
+            else:
+                category_obj, created = BusinessCategory.objects.get_or_create(text=text_value)
+                categories.append(category_obj.pk)
 
         user_business.category_type.set(categories)
         return user_business
@@ -1,9 +1,11 @@
 import logging
 from django.conf import settings
 from django.dispatch import receiver
-from authentication.models import UserBusiness
+from authentication.models import BusinessCategory, UserBusiness
+from authentication.taxonomy import business_categories
+from authentication.user_cache import invalidate_user
 from django.contrib.auth import get_user_model
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.core.mail import EmailMultiAlternatives, BadHeaderError
 from django.template.loader import render_to_string, TemplateDoesNotExist
 from django_rest_passwordreset.signals import reset_password_token_created
@@ -52,3 +54,15 @@ def update_user_is_business(sender, instance, created, **kwargs):
         user = instance.user
         user.is_business = True
         user.save()
+
+
+# TAXONOMY CACHE
+@receiver([post_save, post_delete], sender=BusinessCategory)
+def invalidate_business_categories(sender, **kwargs):
+    business_categories.invalidate()
+
+
+# USER CACHE
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
@@ -0,0 +1,6 @@
+from authentication.models import BusinessCategory
+from authentication.serializers import BusinessCategorySerializer
+from utils.taxonomy_cache import TaxonomyCache
+
+business_categories = TaxonomyCache(
+    BusinessCategory, BusinessCategorySerializer, 'text')
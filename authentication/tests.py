@@ -1,3 +1,466 @@
-from django.test import TestCase
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+from django.core.cache import cache
+from django.db import IntegrityError
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from oauth2_provider.models import AccessToken
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from authentication import user_cache
+from authentication.authentication import NEGATIVE_CACHE_TTL, DispatchAuthentication, backend_timings
+from authentication.checks import check_shared_cache, check_shared_cache_deploy
+from authentication.id_tokens import GOOGLE_ISSUERS, IDTokenError, IDTokenVerifier, StaticKeySource
+from authentication.management.commands.benchmark_id_tokens import AUDIENCE, LocalIssuer
+from authentication.models import CustomUser, EmailOTP, OTPSendWindow
+from authentication.otp import (
+    OTP_INVALID, OTP_LOCKED, OTP_MAX_ATTEMPTS, OTP_MISSING, OTP_TTL, OTP_VERIFIED, OTPStore, allow_send,
+    purge_expired)
+from authentication.revocation import REVOCATION_SYNC_INTERVAL, RevocationStore
+from authentication.tokens import ClaimsRefreshToken
 
-# Create your tests here.
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+DATABASE_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'cache'}}
+
+# The tests' local memory cache stands in for a cache shared by workers:
+# every worker the tests play runs in this one process.
+shared_cache = mock.patch('utils.shared_cache.PROCESS_LOCAL_CACHES', ())
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+
+    @override_settings(CACHES=DATABASE_CACHES)
+    def test_shared_cache_passes(self):
+        self.assertEqual(check_shared_cache(None) + check_shared_cache_deploy(None), [])
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_process_local_cache_is_a_warning(self):
+        self.assertEqual([error.id for error in check_shared_cache(None)], ['authentication.W001'])
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_process_local_cache_fails_the_deploy_check(self):
+        self.assertEqual([error.id for error in check_shared_cache_deploy(None)], ['authentication.E001'])
+
+
+class UserCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email='user@example.com', password='x' * 12)
+
+    def setUp(self):
+        cache.clear()
+
+    @shared_cache
+    def test_cached_user_is_invalidated_on_save(self):
+        self.assertTrue(user_cache.get_user(self.user.pk).is_active)
+        self.assertIsNotNone(cache.get(user_cache.user_cache_key(self.user.pk)))
+        self.user.is_active = False
+        self.user.save()
+        self.assertFalse(user_cache.get_user(self.user.pk).is_active)
+
+    def test_process_local_cache_is_bypassed(self):
+        user_cache.get_user(self.user.pk)
+        self.assertIsNone(cache.get(user_cache.user_cache_key(self.user.pk)))
+        CustomUser.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertFalse(user_cache.get_user(self.user.pk).is_active)
+
+
+class RevocationStoreTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email='user@example.com', password='x' * 12)
+
+    def setUp(self):
+        cache.clear()
+
+    def issue(self):
+        return ClaimsRefreshToken.for_user(self.user)
+
+    @shared_cache
+    def test_revocation_reaches_other_processes(self):
+        token = self.issue()
+        jti = token[api_settings.JTI_CLAIM]
+        # Each store stands for the filter of a separate worker.
+        worker = RevocationStore()
+        self.assertFalse(worker.is_revoked(jti))
+        with self.captureOnCommitCallbacks(execute=True):
+            token.blacklist()
+        with self.assertNumQueries(2):
+            # Incremental load, blacklist confirmation.
+            self.assertTrue(worker.is_revoked(jti))
+
+    @shared_cache
+    def test_unrevoked_tokens_skip_the_blacklist_query(self):
+        jti = self.issue()[api_settings.JTI_CLAIM]
+        worker = RevocationStore()
+        worker.sync()
+        with self.assertNumQueries(0):
+            # Only the cache version is read.
+            self.assertFalse(worker.is_revoked(jti))
+
+    @shared_cache
+    def test_lost_version_change_is_picked_up_after_the_sync_interval(self):
+        token = self.issue()
+        worker = RevocationStore()
+        worker.sync()
+        # Blacklisted without the version change, as if it was evicted.
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=token[api_settings.JTI_CLAIM]))
+        self.assertFalse(worker.is_revoked(token[api_settings.JTI_CLAIM]))
+        worker.synced_at -= REVOCATION_SYNC_INTERVAL
+        self.assertTrue(worker.is_revoked(token[api_settings.JTI_CLAIM]))
+
+    def test_process_local_cache_checks_the_blacklist(self):
+        token = self.issue()
+        worker = RevocationStore()
+        self.assertFalse(worker.is_revoked(token[api_settings.JTI_CLAIM]))
+        with self.captureOnCommitCallbacks(execute=True):
+            token.blacklist()
+        self.assertTrue(worker.is_revoked(token[api_settings.JTI_CLAIM]))
+        self.assertIsNone(worker.filter)
+
+
+class OTPStoreTests(TestCase):
+
+    def setUp(self):
+        self.store = OTPStore('test')
+
+    def age(self, seconds):
+        EmailOTP.objects.update(expires_at=timezone.now() + timedelta(seconds=OTP_TTL - seconds))
+
+    def test_code_is_verified_once(self):
+        code = self.store.issue('Ada@Example.com')
+        self.assertNotIn(code, EmailOTP.objects.get().code_digest)
+        self.assertEqual(self.store.verify('ada@example.com', code), OTP_VERIFIED)
+        self.assertEqual(self.store.verify('ada@example.com', code), OTP_MISSING)
+
+    def test_code_is_valid_for_the_whole_ttl(self):
+        code = self.store.issue('ada@example.com')
+        self.store.verify('ada@example.com', 'wrong')
+        self.age(OTP_TTL - 1)
+        self.assertEqual(self.store.verify('ada@example.com', code), OTP_VERIFIED)
+
+    def test_expired_code_is_missing(self):
+        code = self.store.issue('ada@example.com')
+        self.age(OTP_TTL)
+        self.assertEqual(self.store.verify('ada@example.com', code), OTP_MISSING)
+
+    def test_codes_are_kept_per_purpose(self):
+        code = self.store.issue('ada@example.com')
+        self.assertEqual(OTPStore('other').verify('ada@example.com', code), OTP_MISSING)
+
+    def test_wrong_guesses_lock_the_code(self):
+        code = self.store.issue('ada@example.com')
+        for _ in range(OTP_MAX_ATTEMPTS):
+            self.assertEqual(self.store.verify('ada@example.com', 'wrong'), OTP_INVALID)
+        self.assertEqual(self.store.verify('ada@example.com', code), OTP_LOCKED)
+        self.assertEqual(self.store.verify('ada@example.com', code), OTP_MISSING)
+
+    def test_guesses_already_counted_lock_the_code(self):
+        # As after concurrent guesses: the counter, not the order of the
+        # comparisons, decides.
+        code = self.store.issue('ada@example.com')
+        EmailOTP.objects.update(attempts=OTP_MAX_ATTEMPTS)
+        self.assertEqual(self.store.verify('ada@example.com', code), OTP_LOCKED)
+
+    def test_new_code_replaces_the_old_one_and_its_attempts(self):
+        old = self.store.issue('ada@example.com')
+        for _ in range(OTP_MAX_ATTEMPTS):
+            self.store.verify('ada@example.com', 'wrong')
+        new = self.store.issue('ada@example.com')
+        if old != new:
+            self.assertEqual(self.store.verify('ada@example.com', old), OTP_INVALID)
+        self.assertEqual(self.store.verify('ada@example.com', new), OTP_VERIFIED)
+        self.assertEqual(EmailOTP.objects.count(), 0)
+
+
+class OTPSendLimitTests(TestCase):
+    rate = (3, 600)
+
+    def sends(self, count, scope='email', ident='ada@example.com'):
+        return [allow_send(scope, ident, self.rate) for _ in range(count)]
+
+    def test_sends_are_limited_per_window(self):
+        self.assertEqual(self.sends(4), [True, True, True, False])
+        self.assertEqual(OTPSendWindow.objects.get().count, 3)
+
+    def test_limits_are_kept_per_scope_and_ident(self):
+        self.sends(3)
+        self.assertEqual(self.sends(1, ident='obi@example.com'), [True])
+        self.assertEqual(self.sends(1, scope='ip'), [True])
+
+    def test_window_starts_over_once_it_runs_out(self):
+        self.sends(4)
+        OTPSendWindow.objects.update(window_ends_at=timezone.now())
+        self.assertEqual(self.sends(4), [True, True, True, False])
+
+    def test_expired_rows_are_purged(self):
+        OTPStore('test').issue('ada@example.com')
+        self.sends(1)
+        self.assertEqual(purge_expired(), (0, 0))
+        self.assertEqual(purge_expired(timezone.now() + timedelta(seconds=OTP_TTL)), (1, 1))
+
+
+class DispatchAuthenticationTests(TestCase):
+    stats_url = '/api/v1/authorization/authentication-stats/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email='user@example.com', password='x' * 12)
+        cls.admin = CustomUser.objects.create_superuser(email='admin@example.com', password='x' * 12)
+
+    def setUp(self):
+        cache.clear()
+        backend_timings.reset()
+        self.addCleanup(backend_timings.reset)
+
+    def request(self, authorization=None, **params):
+        headers = {'HTTP_AUTHORIZATION': authorization} if authorization else {}
+        return Request(APIRequestFactory().get('/', params, **headers))
+
+    def authenticate(self, authorization=None, **params):
+        return DispatchAuthentication().authenticate(self.request(authorization, **params))
+
+    def jwt(self, user=None):
+        return f'JWT {ClaimsRefreshToken.for_user(user or self.user).access_token}'
+
+    def oauth2_token(self, token='oauth2-token'):
+        AccessToken.objects.create(
+            user=self.user, token=token, scope='read write',
+            expires=timezone.now() + timedelta(hours=1))
+        return f'Bearer {token}'
+
+    def requests(self, backend):
+        return backend_timings.snapshot().get(backend, {})
+
+    def test_backend_is_chosen_by_header(self):
+        dispatch = DispatchAuthentication()
+        for authorization, params, backend in (
+                ('JWT a.b.c', {}, 'jwt'),
+                ('Bearer abc123', {}, 'oauth2'),
+                ('Bearer google-oauth2 abc123', {}, 'social'),
+                (None, {'access_token': 'abc123'}, 'oauth2'),
+                ('Bearer not:a/token!', {}, None),
+                ('Basic dXNlcjpwYXNz', {}, None),
+                (None, {}, None)):
+            with self.subTest(authorization=authorization, params=params):
+                self.assertEqual(dispatch.select_backend(self.request(authorization, **params)), backend)
+
+    def test_jwt_authenticates_without_other_backends(self):
+        user, claims = self.authenticate(self.jwt())
+        self.assertEqual((user, claims['email']), (self.user, self.user.email))
+        self.assertEqual(list(backend_timings.snapshot()), ['jwt'])
+
+    def test_oauth2_token_authenticates(self):
+        user, token = self.authenticate(self.oauth2_token())
+        self.assertEqual((user, token.token), (self.user, 'oauth2-token'))
+        self.assertEqual(self.requests('oauth2')['authenticated'], 1)
+
+    def test_session_and_unknown_schemes_run_no_backend(self):
+        self.client.force_login(self.user)
+        response = self.client.get('/api/v1/authorization/user_profile/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIsNone(self.authenticate('Basic dXNlcjpwYXNz'))
+        self.assertEqual(backend_timings.snapshot(), {})
+
+    def test_rejected_oauth2_token_is_answered_from_the_cache(self):
+        self.assertIsNone(self.authenticate('Bearer unknown'))
+        with self.assertNumQueries(0):
+            self.assertIsNone(self.authenticate('Bearer unknown'))
+        self.assertEqual(self.requests('oauth2')['negative_cache_hits'], 1)
+        self.assertEqual(self.requests('oauth2')['anonymous'], 2)
+
+    def test_negative_cache_entries_expire(self):
+        self.assertIsNone(self.authenticate('Bearer oauth2-token'))
+        # Issued after the rejection was cached: still refused until the
+        # entry expires.
+        authorization = self.oauth2_token()
+        self.assertIsNone(self.authenticate(authorization))
+        with mock.patch('time.time', return_value=time.time() + NEGATIVE_CACHE_TTL + 1):
+            user, token = self.authenticate(authorization)
+        self.assertEqual(user, self.user)
+
+    def test_revoked_oauth2_token_is_rejected_after_success(self):
+        authorization = self.oauth2_token()
+        self.assertEqual(self.authenticate(authorization)[0], self.user)
+        AccessToken.objects.get(token='oauth2-token').revoke()
+        self.assertIsNone(self.authenticate(authorization))
+        self.assertEqual(self.requests('oauth2')['anonymous'], 1)
+
+    @shared_cache
+    def test_deactivated_user_is_rejected_after_success(self):
+        authorization = self.jwt()
+        self.assertEqual(self.authenticate(authorization)[0], self.user)
+        self.assertIsNotNone(cache.get(user_cache.user_cache_key(self.user.pk)))
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(authorization)
+        self.assertEqual(self.requests('jwt')['rejected'], 1)
+
+    def test_stats_are_for_admins_only(self):
+        self.authenticate('Bearer unknown')
+        self.assertEqual(self.client.get(self.stats_url).status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.get(self.stats_url, HTTP_AUTHORIZATION=self.jwt())
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get(self.stats_url, HTTP_AUTHORIZATION=self.jwt(self.admin))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        stats = response.json()['data']
+        self.assertEqual(stats['oauth2']['anonymous'], 1)
+        # The 403 request and this one.
+        self.assertEqual(stats['jwt']['authenticated'], 2)
+        self.assertEqual(stats['jwt']['rejected'], 0)
+
+
+class ProfileConditionalGetTests(TestCase):
+    url = '/api/v1/authorization/user_profile/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email='user@example.com', password='x' * 12)
+
+    def setUp(self):
+        cache.clear()
+        token = ClaimsRefreshToken.for_user(self.user).access_token
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'JWT {token}'
+
+    def test_unchanged_profile_is_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+
+    def test_stale_if_match_fails(self):
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MATCH='"stale"').status_code,
+                         status.HTTP_412_PRECONDITION_FAILED)
+
+    def test_profile_changes_are_seen(self):
+        etag = self.client.get(self.url)['ETag']
+        self.user.first_name = 'Renamed'
+        self.user.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['data']['first_name'], 'Renamed')
+
+
+class BlockingKeySource(StaticKeySource):
+    """
+    A key source whose fetches wait for release once blocking is set, like
+    an issuer that is slow to answer.
+    """
+
+    def __init__(self, jwks):
+        super().__init__(jwks, max_age=3600)
+        self.blocking = False
+        self.release = threading.Event()
+
+    def fetch(self):
+        if self.blocking:
+            self.release.wait(5)
+        return super().fetch()
+
+
+class IDTokenVerifierTests(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.issuer = LocalIssuer()
+
+    def setUp(self):
+        self.source = BlockingKeySource(self.issuer.documents['/jwks'].decode())
+        self.verifier = IDTokenVerifier(self.source, GOOGLE_ISSUERS, AUDIENCE)
+
+    def test_verifies_signed_claims(self):
+        self.assertEqual(self.verifier.verify(self.issuer.token())['aud'], AUDIENCE)
+
+    def test_rejects_other_audiences(self):
+        with self.assertRaises(IDTokenError):
+            self.verifier.verify(self.issuer.token(audience='someone-else'))
+
+    def test_background_refresh_does_not_block_verification(self):
+        keys = self.verifier.keys
+        token = self.issuer.token()
+        self.verifier.verify(token)
+        self.source.blocking = True
+        keys.refresh_at = 0
+        try:
+            started = time.monotonic()
+            for _ in range(3):
+                self.verifier.verify(token)
+            self.assertLess(time.monotonic() - started, 1)
+            self.assertTrue(keys._refreshing)
+        finally:
+            self.source.release.set()
+        deadline = time.monotonic() + 5
+        while keys._refreshing and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertGreater(keys.refresh_at, started)
+
+
+class GoogleAPIViewTests(SimpleTestCase):
+    url = '/api/v1/authorization/google-verify-api/'
+
+    def test_get_explains_the_move_to_post(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+        self.assertIn('POST the Google ID token', response.json()['message'])
+
+    def test_post_requires_a_token(self):
+        response = self.client.post(self.url, {}, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class EmailKeyTests(TestCase):
+    password = 'correct horse battery'
+
+    def register(self, email):
+        return self.client.post('/api/v1/authorization/register/', {
+            'email': email, 'password': self.password, 'first_name': 'Ada', 'last_name': 'Obi',
+            'phone_number': '+2348000000000',
+        }, content_type='application/json')
+
+    def login(self, email):
+        return self.client.post('/api/v1/authorization/login/', {
+            'email': email, 'password': self.password,
+        }, content_type='application/json')
+
+    def test_lookup_by_email_uses_the_email_key_index(self):
+        plan = CustomUser.objects.by_email('Ada@Example.com').explain()
+        self.assertIn('email_key', plan)
+        # Neither a PostgreSQL nor an SQLite full table scan.
+        self.assertNotRegex(plan, r'Seq Scan|SCAN authentication_customuser(?! USING)')
+
+    def test_email_key_is_lower_cased_on_save(self):
+        user = CustomUser.objects.create_user(email=' Ada@Example.COM ', password=self.password)
+        self.assertEqual(user.email_key, 'ada@example.com')
+        user.email = 'Ada.Obi@Example.com'
+        user.save(update_fields=['email'])
+        user.refresh_from_db()
+        self.assertEqual(user.email_key, 'ada.obi@example.com')
+        self.assertEqual(CustomUser.objects.by_email('ADA.OBI@example.com').get(), user)
+
+    def test_email_key_is_unique(self):
+        CustomUser.objects.create_user(email='ada@example.com', password=self.password)
+        with self.assertRaises(IntegrityError):
+            CustomUser.objects.create_user(email='ADA@example.com', password=self.password)
+
+    def test_registration_in_another_case_is_rejected(self):
+        self.assertEqual(self.register('Ada@Example.com').status_code, status.HTTP_201_CREATED)
+        response = self.register('ada@EXAMPLE.com')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, response.content)
+        self.assertEqual(CustomUser.objects.count(), 1)
+
+    def test_login_in_another_case_finds_the_user(self):
+        self.register('Ada@Example.com')
+        for email in ('Ada@Example.com', 'ada@example.com', 'ADA@EXAMPLE.COM'):
+            with self.subTest(email=email):
+                response = self.login(email)
+                self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+                self.assertEqual(response.json()['data']['user']['email'], 'Ada@Example.com')
@@ -0,0 +1,70 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import ValidationError
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer, TokenVerifySerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken, UntypedToken
+from authentication import user_cache
+from authentication.revocation import revocations
+
+# User fields signed into every token next to the user id claim. Access
+# tokens copy them from the refresh token they are made from.
+USER_CLAIMS = ('email', 'is_business', 'is_verified', 'is_staff')
+
+
+def user_claims(user):
+    return {claim: getattr(user, claim) for claim in USER_CLAIMS}
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """
+    Refresh token carrying USER_CLAIMS. Each access token made from it
+    re-reads the claims from the user cache, so a refresh picks up profile
+    changes made since login.
+
+    The blacklist is checked through authentication.revocation, which only
+    queries it for tokens that may be on it.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token.payload.update(user_claims(user))
+        return token
+
+    @property
+    def access_token(self):
+        user = user_cache.get_user(self[api_settings.USER_ID_CLAIM])
+        if user is not None:
+            self.payload.update(user_claims(user))
+        return super().access_token
+
+    def check_blacklist(self):
+        if revocations.is_revoked(self.payload.get(api_settings.JTI_CLAIM)):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        blacklisted = super().blacklist()
+        revocations.revoked()
+        return blacklisted
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = ClaimsRefreshToken
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = ClaimsRefreshToken
+
+
+class RevocationCheckedTokenVerifySerializer(TokenVerifySerializer):
+    """
+    TokenVerifySerializer that checks the blacklist through the revocation
+    store rather than with a query per token.
+    """
+
+    def validate(self, attrs):
+        token = UntypedToken(attrs['token'])
+        if api_settings.BLACKLIST_AFTER_ROTATION and revocations.is_revoked(token.get(api_settings.JTI_CLAIM)):
+            raise ValidationError("Token is blacklisted")
+        return {}
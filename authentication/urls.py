@@ -1,6 +1,6 @@
 # urls.py
 from django.urls import path, include, re_path
-from .views import BusinesscategoryAPIView, ChangePasswordView, DeleteAccount, EmailOTPAuthentication, GoogleAPIView,  Logout, RegisterView, LoginView, TokenRefreshView, TokenVerifyView, UserBusinessAPIView, UserProfileView
+from .views import AuthenticationStatsView, BusinesscategoryAPIView, ChangePasswordView, DeleteAccount, EmailOTPAuthentication, GoogleAPIView,  Logout, RegisterView, LoginView, TokenRefreshView, TokenVerifyView, UserBusinessAPIView, UserProfileView
 
 urlpatterns = [
 
@@ -14,6 +14,7 @@ urlpatterns = [
     re_path(r'^social/', include('drf_social_oauth2.urls', namespace='social')),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('token/verify/', TokenVerifyView.as_view(), name='token_verify'),
+    path('authentication-stats/', AuthenticationStatsView.as_view(), name='authentication_stats'),
     path('password_reset/', include('django_rest_passwordreset.urls')),
     path('email/verify/', EmailOTPAuthentication.as_view(), name='email_verify'),
     path('user-business/', UserBusinessAPIView.as_view(), name='email_verify'),
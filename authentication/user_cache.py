@@ -0,0 +1,47 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from utils.shared_cache import is_shared
+
+# Seconds a user stays in the shared cache. Saves and deletes invalidate it
+# at once; the TTL only bounds how long a change made behind the ORM's back
+# (a queryset update(), a manual SQL fix) can go unnoticed.
+USER_CACHE_TTL = 5 * 60
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def get_user(user_id):
+    """
+    Returns the user with the given id from the shared cache, loading it
+    from the database on a miss, or None if there is no such user.
+
+    The password hash is deferred, so it never lands in the cache; code
+    that checks or sets a password loads it with one extra query.
+
+    With a process-local cache the user is always read from the database:
+    invalidate_user() could only reach the current process, and a disabled
+    user would stay active on the other workers until the TTL ran out.
+    """
+    queryset = get_user_model().objects.defer('password').filter(pk=user_id)
+    if not is_shared():
+        return queryset.first()
+
+    key = user_cache_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = queryset.first()
+        if user is None:
+            return None
+        cache.set(key, user, USER_CACHE_TTL)
+    return user
+
+
+def invalidate_user(user_id):
+    key = user_cache_key(user_id)
+    cache.delete(key)
+    # A request running while the change is uncommitted can put the old row
+    # back in the cache, so drop it again once the change is visible.
+    transaction.on_commit(lambda: cache.delete(key))
@@ -2,31 +2,35 @@
 import os
 import logging
 import base64
-import random
 from urllib.parse import urlencode
-from google.oauth2 import id_token
-from google.auth.transport import requests
 from rest_framework.decorators import api_view
 from django.shortcuts import get_object_or_404, redirect
 from authentication.models import BusinessCategory, CustomUser, UserBusiness
+from authentication.otp import OTP_EMAIL_SEND_RATE, OTP_IP_SEND_RATE, OTP_LOCKED, OTP_MISSING, OTP_VERIFIED, allow_send, email_verification, normalize_email
+from authentication.taxonomy import business_categories
 from exceptions.custom_apiexception_class import *
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_protect
 from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
+from django.template.loader import render_to_string, TemplateDoesNotExist
 from dotenv import load_dotenv
 from rest_framework import generics
 from rest_framework import status
 from rest_framework.views import APIView
+from rest_framework.throttling import BaseThrottle
 from utils.custom_response import custom_response
+from utils.conditional import conditional_get, make_etag
+from utils.taxonomy_cache import taxonomy_response
 from drf_yasg import openapi
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from drf_yasg.utils import swagger_auto_schema
 from django.contrib.auth import get_user_model
 from .serializers import BusinessCategorySerializer, ChangePasswordSerializer, UserBusinessSerializer, UserSerializer, TokenObtainPairResponseSerializer, TokenRefreshResponseSerializer, TokenVerifyResponseSerializer
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView, TokenVerifyView
 from rest_framework_simplejwt.exceptions import TokenError
-from rest_framework_simplejwt.tokens import RefreshToken
+from authentication.authentication import backend_timings
+from authentication.id_tokens import IDTokenError, KeysUnavailable, verify_google_id_token
+from authentication.tokens import ClaimsRefreshToken
 from rest_framework.permissions import AllowAny
 
 logger = logging.getLogger(__name__)
@@ -46,7 +50,7 @@ class RegisterView(APIView):
         serializer = UserSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.save()
-            refresh = RefreshToken.for_user(user)
+            refresh = ClaimsRefreshToken.for_user(user)
             response_data = {
                 'user': serializer.data,
                 'refresh': str(refresh),
@@ -90,7 +94,7 @@ class LoginView(TokenObtainPairView):
         user_email = request.data['email']
         print(user_email)
         try:
-            profile = CustomUser.objects.get(email__iexact=user_email)
+            profile = CustomUser.objects.by_email(user_email).get()
         except CustomUser.DoesNotExist:
             logger.error(f"User with email {user_email} does not exist.")
             return CustomAPIException(
@@ -152,6 +156,11 @@ class TokenVerifyView(TokenVerifyView):
             return CustomAPIException(detail="Token is invalid or expired.", status_code=response.status_code, data=response.data).get_full_details()
 
 
+def profile_validators(view, request, *args, **kwargs):
+    user = request.user
+    return make_etag('profile', user.pk, user.updated_on), user.updated_on
+
+
 class UserProfileView(APIView):
     permission_classes = [IsAuthenticated]
     csrf_protect_method = method_decorator(csrf_protect)
@@ -163,7 +172,7 @@ class UserProfileView(APIView):
         user_email = request.user.email
 
         try:
-            profile = CustomUser.objects.get(email__exact=user_email)
+            profile = CustomUser.objects.by_email(user_email).get()
             logger.debug(f"User profile found for email: {user_email}")
         except CustomUser.DoesNotExist:
             logger.error(f"User profile not found for email: {user_email}")
@@ -182,13 +191,14 @@ class UserProfileView(APIView):
         raise CustomAPIException(
             detail=serializers.errors, status_code=status.HTTP_400_BAD_REQUEST).get_full_details()
 
+    @conditional_get(profile_validators)
     def get(self, request):
         logger.info(
             f"UserProfile GET request received for user: {request.user.email}")
         email = request.user.email
 
         try:
-            profile = CustomUser.objects.get(email__exact=email)
+            profile = CustomUser.objects.by_email(email).get()
             logger.debug(f"User profile found for email: {email}")
         except CustomUser.DoesNotExist:
             logger.error(f"User profile not found for email: {email}")
@@ -223,7 +233,7 @@ class Logout(APIView):
             refresh_token = request.data['refresh']
             logger.debug(f"Refresh token received: {refresh_token}")
 
-            token = RefreshToken(refresh_token)
+            token = ClaimsRefreshToken(refresh_token)
             token.blacklist()
 
             logger.info(
@@ -282,7 +292,7 @@ class DeleteAccount(APIView):
     def get_object(self):
         user_email = self.request.user.email
         logger.info(f"Fetching user object for email: {user_email}")
-        return get_object_or_404(CustomUser, email=user_email)
+        return get_object_or_404(CustomUser.objects.by_email(user_email))
 
     def delete(self, request, *args, **kwargs):
         try:
@@ -306,24 +316,43 @@ class DeleteAccount(APIView):
         logger.info(f"User instance deleted: {instance.email}")
 
 
-otp_storage = {}
+class AuthenticationStatsView(APIView):
+    """
+    Counters kept by DispatchAuthentication for the worker process that
+    serves the request: runs, outcomes, negative cache hits and time spent
+    per authentication backend.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return custom_response(status_code=status.HTTP_200_OK, message="Success", data=backend_timings.snapshot())
 
 
 class EmailOTPAuthentication(APIView):
     def post(self, request):
         email = request.data.get('email')
+        if not email:
+            return CustomAPIException(detail="Email is required.", status_code=status.HTTP_400_BAD_REQUEST).get_full_details()
 
-        otp = ''.join([str(random.randint(0, 9)) for _ in range(6)])
+        # Both limits are counted on every request so neither can be dodged
+        # by varying the other.
+        ip_allowed = allow_send('ip', BaseThrottle().get_ident(request), OTP_IP_SEND_RATE)
+        email_allowed = allow_send('email', normalize_email(email), OTP_EMAIL_SEND_RATE)
+        if not (ip_allowed and email_allowed):
+            return CustomAPIException(detail="Too many OTP requests. Please try again later.", status_code=status.HTTP_429_TOO_MANY_REQUESTS).get_full_details()
 
-        # Store the OTP with the email as the key
-        otp_storage[email] = otp
+        otp = email_verification.issue(email)
 
         merge_data = {
             'inshopper_user': request.user.email,
             'otp': otp,
         }
-        html_body = render_to_string(
-            "emails/otp_mail.html", merge_data)
+        try:
+            html_body = render_to_string(
+                "emails/otp_mail.html", merge_data)
+        except TemplateDoesNotExist as template_error:
+            logger.error(f"Template not found: {template_error}")
+            html_body = f"Your email verification OTP is: {otp}"
         msg = EmailMultiAlternatives(
             subject="Email Verification OTP.",
             from_email=os.getenv('EMAIL_USER'),
@@ -339,14 +368,14 @@ class EmailOTPAuthentication(APIView):
         email = request.data.get('email')
         otp_entered = request.data.get('otp')
 
-        if email not in otp_storage:
-            return CustomAPIException(detail="OTP not sent for this email.", status_code=status.HTTP_400_BAD_REQUEST).get_full_details()
-
-        if otp_entered == otp_storage[email]:
-            del otp_storage[email]
+        result = email_verification.verify(email, otp_entered)
+        if result == OTP_VERIFIED:
             return custom_response(status_code=status.HTTP_200_OK, message="Email verification successful.", data=None)
-        else:
-            return CustomAPIException(detail="Incorrect OTP.", status_code=status.HTTP_400_BAD_REQUEST).get_full_details()
+        if result == OTP_MISSING:
+            return CustomAPIException(detail="OTP not sent for this email or it has expired.", status_code=status.HTTP_400_BAD_REQUEST).get_full_details()
+        if result == OTP_LOCKED:
+            return CustomAPIException(detail="Too many incorrect attempts. Please request a new OTP.", status_code=status.HTTP_429_TOO_MANY_REQUESTS).get_full_details()
+        return CustomAPIException(detail="Incorrect OTP.", status_code=status.HTTP_400_BAD_REQUEST).get_full_details()
 
 
 class BusinesscategoryAPIView(APIView):
@@ -354,16 +383,12 @@ class BusinesscategoryAPIView(APIView):
 
     def get(self, request, format=None):
         try:
-            amenity = BusinessCategory.objects.all()
-        except BusinessCategory.DoesNotExist:
-            error_msg = f"Business category not found."
-            return CustomAPIException(detail=error_msg, status_code=status.HTTP_404_NOT_FOUND).get_full_details()
+            categories = business_categories.all()
         except Exception as e:
             error_msg = f"An error occurred while retrieving the Business category: {str(e)}"
             return CustomAPIException(detail=error_msg, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR).get_full_details()
 
-        serializer = BusinessCategorySerializer(amenity, many=True)
-        return custom_response(status_code=status.HTTP_200_OK, message="Business category fetched successfully", data=serializer.data)
+        return taxonomy_response(request, business_categories, "Business category fetched successfully", categories)
 
     @swagger_auto_schema(
         request_body=BusinessCategorySerializer(many=True),
@@ -484,18 +509,52 @@ class UserBusinessAPIView(APIView):
 
 
 class GoogleAPIView(APIView):
+    """
+    Verifies a Google ID token POSTed as {"token": ...} and returns its
+    claims.
+
+    GET used to verify a token hardcoded in the view and no longer does
+    anything. It answers 405 with a message pointing at POST for one
+    release, so existing clients get an explanation rather than a bare
+    405, and is removed after that.
+    """
     permission_classes = [AllowAny]
 
+    @swagger_auto_schema(
+        deprecated=True,
+        operation_description="Removed: POST the Google ID token as {\"token\": ...} instead.",
+        responses={status.HTTP_405_METHOD_NOT_ALLOWED: "Always; use POST."},
+    )
     def get(self, request, format=None):
-        token = "eyJhbGciOiJSUzI1NiIsImtpZCI6ImIyZjgwYzYzNDYwMGVkMTMwNzIxMDFhOGI0MjIwNDQzNDMzZGIyODIiLCJ0eXAiOiJKV1QifQ.eyJpc3MiOiJodHRwczovL2FjY291bnRzLmdvb2dsZS5jb20iLCJhenAiOiIzNTA1NTU0NTA2OTMtOWJhYTE3MjdxYzI4aTdpOGcwc3NoaDRhNTJhYTMzMW8uYXBwcy5nb29nbGV1c2VyY29udGVudC5jb20iLCJhdWQiOiIzNTA1NTU0NTA2OTMtZ2ppYnFhcXRxdDZxMW8wNjF2YXBzNDZjMGNzN3BvY2kuYXBwcy5nb29nbGV1c2VyY29udGVudC5jb20iLCJzdWIiOiIxMTM1ODc2MTQxMzU4Mjg2NDcyNzAiLCJlbWFpbCI6ImdtYXJzaGFsMDcwQGdtYWlsLmNvbSIsImVtYWlsX3ZlcmlmaWVkIjp0cnVlLCJuYW1lIjoiR3JlYXRuZXNzIE1hcnNoYWwiLCJwaWN0dXJlIjoiaHR0cHM6Ly9saDMuZ29vZ2xldXNlcmNvbnRlbnQuY29tL2EvQUNnOG9jSVl6dnZLbXFHcWRfYzFwTG5qZG9vQXBrSU12ZGJUNTAwWTg4ZE9GSnBZdEQycDBJOXo9czk2LWMiLCJnaXZlbl9uYW1lIjoiR3JlYXRuZXNzIiwiZmFtaWx5X25hbWUiOiJNYXJzaGFsIiwiaWF0IjoxNzI1NDQ5Nzk1LCJleHAiOjE3MjU0NTMzOTV9.of5fqF5lC_I_3PnOh_G17a66SASvpOq6xkrrJj1Y0TyptTaWNHJB92Aoy7aOK17DO1gHS8gAQoLHMrSBusj0_5lKkdTx6nocDpSYkjCdjz6qUhQeE8Z8J_vP4pNGMM8kShfgijuFTeP1jn_vscF0E9hYRgRH2tKAh6KIpoKM0625b_GFdsj1pBg1MrpmQLC_k21ZUMLjY1yU70RKc4frwE9G1NvWc7YCO0CQ"
-        CLIENT_ID = "350555450693-gjibqaqtqt6q1o061vaps46c0cs7poci.apps.googleusercontent.com"
-        try:
-            idinfo = id_token.verify_oauth2_token(
-                token, requests.Request(), "350555450693-gjibqaqtqt6q1o061vaps46c0cs7poci.apps.googleusercontent.com")
+        return CustomAPIException(
+            detail="GET is no longer supported on this endpoint. POST the Google ID token as {\"token\": \"...\"} instead.",
+            status_code=status.HTTP_405_METHOD_NOT_ALLOWED).get_full_details()
 
-            print("Token is valid:", idinfo)
-            return custom_response(status_code=status.HTTP_200_OK, message="User success", data=idinfo)
+    @swagger_auto_schema(
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            required=['token'],
+            properties={'token': openapi.Schema(type=openapi.TYPE_STRING, description="Google ID token")},
+        ),
+        responses={
+            status.HTTP_200_OK: "The token's claims.",
+            status.HTTP_401_UNAUTHORIZED: "The token is invalid or expired.",
+            status.HTTP_503_SERVICE_UNAVAILABLE: "Google's signing keys could not be fetched.",
+        }
+    )
+    def post(self, request, format=None):
+        token = request.data.get('token')
+        if not token:
+            return CustomAPIException(detail="Token is required.", status_code=status.HTTP_400_BAD_REQUEST).get_full_details()
 
-        except Exception as e:
+        try:
+            idinfo = verify_google_id_token(token)
+        except KeysUnavailable as e:
+            logger.error(f"Google ID token verification unavailable: {e}")
             return CustomAPIException(
-                detail=str(e), status_code=status.HTTP_404_NOT_FOUND).get_full_details()
+                detail="Unable to verify the token right now.", status_code=status.HTTP_503_SERVICE_UNAVAILABLE).get_full_details()
+        except IDTokenError as e:
+            return CustomAPIException(
+                detail=str(e), status_code=status.HTTP_401_UNAUTHORIZED).get_full_details()
+
+        return custom_response(status_code=status.HTTP_200_OK, message="User success", data=idinfo)
@@ -0,0 +1,43 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Exists, OuterRef
+
+from booking.models import Booking
+
+
+def overlapping_bookings(content_type, start_time, end_time):
+    """
+    Returns the non-cancelled bookings of a listing type whose interval
+    intersects [start_time, end_time). Two intervals overlap when each one
+    starts before the other ends, which the booking_availability_idx
+    (content_type, object_id, start_time, end_time) index answers with a
+    range scan.
+    """
+    return Booking.objects.filter(
+        content_type=content_type,
+        start_time__lt=end_time,
+        end_time__gt=start_time,
+    ).exclude(status='CANCELLED')
+
+
+def is_available(listing, start_time, end_time, exclude=None):
+    """
+    Returns True when the listing has no booking overlapping the window.
+    Pass exclude to ignore a booking that is being rescheduled.
+    """
+    content_type = ContentType.objects.get_for_model(listing)
+    bookings = overlapping_bookings(content_type, start_time, end_time).filter(
+        object_id=listing.pk)
+    if exclude is not None:
+        bookings = bookings.exclude(pk=exclude)
+    return not bookings.exists()
+
+
+def available_listings(queryset, start_time, end_time):
+    """
+    Narrows a listing queryset to the listings that are free for the whole
+    window, as a single NOT EXISTS anti-join against Booking.
+    """
+    content_type = ContentType.objects.get_for_model(queryset.model)
+    conflicts = overlapping_bookings(content_type, start_time, end_time).filter(
+        object_id=OuterRef('pk'))
+    return queryset.filter(~Exists(conflicts))
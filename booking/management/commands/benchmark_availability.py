@@ -0,0 +1,119 @@
+import random
+import time
+import uuid
+from datetime import timedelta
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+from authentication.models import CustomUser, UserBusiness
+from booking.availability import available_listings, is_available, overlapping_bookings
+from booking.models import Booking
+from listing.models import DiscountOption, ShortletListing
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ("Loads synthetic shortlets and bookings and measures the availability checks "
+            "against them: is_available for one listing, and available_listings next to "
+            "calling is_available listing by listing. Rows are rolled back afterwards.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bookings', type=int, default=1000000)
+        parser.add_argument('--listings', type=int, default=1000)
+        parser.add_argument('--rounds', type=int, default=200)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        try:
+            with transaction.atomic():
+                self.measure(options['bookings'], options['listings'], options['rounds'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def measure(self, booking_count, listing_count, rounds):
+        started = time.perf_counter()
+        listings, span = self.load(booking_count, listing_count)
+        self.stdout.write(
+            f"{booking_count} bookings over {listing_count} shortlets loaded in "
+            f"{time.perf_counter() - started:.1f} s")
+
+        def random_window():
+            start_time = span[0] + timedelta(hours=random.randrange(int((span[1] - span[0]).total_seconds() // 3600)))
+            return start_time, start_time + timedelta(days=random.randint(1, 7))
+
+        content_type = ContentType.objects.get_for_model(ShortletListing)
+        plan = overlapping_bookings(content_type, *random_window()).filter(
+            object_id=listings[0].pk).explain()
+        self.stdout.write(f"is_available plan: {' '.join(plan.split())}")
+
+        windows = [random_window() for _ in range(rounds)]
+        self.report('is_available, one listing', [
+            lambda listing=random.choice(listings), window=window: is_available(listing, *window)
+            for window in windows])
+
+        queryset = ShortletListing.objects.filter(pk__in=[listing.pk for listing in listings])
+        windows = windows[:max(rounds // 20, 1)]
+        self.report(f'available_listings, {listing_count} listings', [
+            lambda window=window: list(available_listings(queryset, *window).values_list('pk', flat=True))
+            for window in windows])
+        self.report(f'is_available per listing, {listing_count} listings', [
+            lambda window=window: [listing.pk for listing in listings if is_available(listing, *window)]
+            for window in windows])
+
+    def report(self, name, checks):
+        queries = []
+
+        def count(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            started = time.perf_counter()
+            for check in checks:
+                check()
+            seconds = (time.perf_counter() - started) / len(checks)
+        self.stdout.write(
+            f"{name}: {seconds * 1000:.2f} ms and {len(queries) / len(checks):.0f} queries per check")
+
+    def load(self, booking_count, listing_count):
+        """
+        Creates listing_count shortlets and booking_count bookings spread
+        evenly over them, each listing booked back to back with gaps, and
+        returns the listings and the (first, last) booked instant.
+        """
+        host = CustomUser.objects.create_user(email=f'{uuid.uuid4().hex}@benchmark.local')
+        business = UserBusiness.objects.create(
+            user=host, business_name='Benchmark', business_country='NG',
+            business_state='Lagos', business_postal_code='100001')
+        discount_option = DiscountOption.objects.create(title=f'Benchmark {uuid.uuid4().hex}')
+        listings = ShortletListing.objects.bulk_create([
+            ShortletListing(
+                user=host, business=business, address=f'{i} Benchmark Road', landmark_1='',
+                landmark_2='', landmark_3='', product_name=f'Benchmark {i}', type_of_apartment='studio',
+                utility_service_staffs='0', max_guests=2, price_per_day=100, discount='0',
+                discount_option=discount_option)
+            for i in range(listing_count)], batch_size=1000)
+
+        content_type = ContentType.objects.get_for_model(ShortletListing)
+        first = timezone.now()
+        ends = {listing.pk: first for listing in listings}
+        batch = []
+        for i in range(booking_count):
+            listing = listings[i % listing_count]
+            start_time = ends[listing.pk] + timedelta(hours=random.randint(0, 72))
+            ends[listing.pk] = end_time = start_time + timedelta(days=random.randint(1, 7))
+            batch.append(Booking(
+                user=host, owner=host, start_time=start_time, end_time=end_time,
+                location=listing.address, content_type=content_type, object_id=listing.pk,
+                status='CANCELLED' if random.random() < 0.1 else 'CONFIRMED'))
+            if len(batch) == 10000:
+                Booking.objects.bulk_create(batch)
+                batch = []
+        Booking.objects.bulk_create(batch)
+        return listings, (first, max(ends.values()))
@@ -0,0 +1,24 @@
+from django.db import models
+from django.contrib.contenttypes.prefetch import GenericPrefetch
+
+
+class BookingQuerySet(models.QuerySet):
+
+    def for_api(self):
+        """
+        Joins the booking's users and prefetches the booked listing with the
+        same eager loading the listing endpoints use.
+        """
+        from listing.models import CarListing, ShortletListing
+
+        return self.select_related(
+            'user', 'owner', 'content_type'
+        ).prefetch_related(
+            GenericPrefetch('content_object', [
+                ShortletListing.objects.for_api(),
+                CarListing.objects.for_api(),
+            ])
+        )
+
+
+BookingManager = models.Manager.from_queryset(BookingQuerySet)
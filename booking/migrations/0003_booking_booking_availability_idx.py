@@ -0,0 +1,20 @@
+# Generated by Django 5.0.6 on 2026-10-18 10:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0002_booking_booking_updated_id_idx'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['content_type', 'object_id', 'start_time', 'end_time'], name='booking_availability_idx'),
+        ),
+    ]
@@ -7,6 +7,7 @@ from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 
 from authentication.models import CustomUser
+from booking.managers import BookingManager
 
 
 class Booking(models.Model):
@@ -43,8 +44,16 @@ class Booking(models.Model):
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
 
+    objects = BookingManager()
+
     def __str__(self):
         return f"Booking {self.id} by {self.user.username} from {self.start_time} to {self.end_time}"
 
     class Meta:
         ordering = ['-created_on']
+        indexes = [
+            models.Index(fields=['updated_on', 'id'],
+                         name='booking_updated_id_idx'),
+            models.Index(fields=['content_type', 'object_id', 'start_time', 'end_time'],
+                         name='booking_availability_idx'),
+        ]
@@ -18,9 +18,9 @@ class BookingSerializer(serializers.ModelSerializer):
                   'pick_up_location', 'drop_off_location', 'notes', 'price', 'status', 'created_on', 'updated_on']
 
     def get_content_object(self, obj):
-        content_type = obj.content_type.model_class()
-        if isinstance(obj.car_rental, CarListing):
-            return CarListingSerializer(obj.car_rental).data
-        elif isinstance(obj.shortlet, ShortletListing):
-            return ShortletListingSerializer(obj.shortlet).data
+        content_object = obj.content_object
+        if isinstance(content_object, CarListing):
+            return CarListingSerializer(content_object).data
+        elif isinstance(content_object, ShortletListing):
+            return ShortletListingSerializer(content_object).data
         return None
@@ -1,3 +1,154 @@
+from datetime import datetime, timedelta, timezone
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from authentication.models import CustomUser, UserBusiness
+from booking.availability import available_listings, is_available
+from booking.models import Booking
+from listing.models import Amenities, DiscountOption, ShortletListing
 
-# Create your tests here.
+START = datetime(2030, 1, 10, 12, tzinfo=timezone.utc)
+
+
+def window(start_day, end_day):
+    return START + timedelta(days=start_day), START + timedelta(days=end_day)
+
+
+class BookingTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.host = CustomUser.objects.create_user(email='host@example.com', password='x' * 12)
+        cls.guest = CustomUser.objects.create_user(email='guest@example.com', password='x' * 12)
+        business = UserBusiness.objects.create(
+            user=cls.host, business_name='Host', business_country='NG',
+            business_state='Lagos', business_postal_code='100001')
+        discount_option = DiscountOption.objects.create(title='Weekly')
+        cls.listing, cls.other_listing = [
+            ShortletListing.objects.create(
+                user=cls.host, business=business, address=f'{i} Admiralty Way', landmark_1='a',
+                landmark_2='b', landmark_3='c', product_name=f'Flat {i}', type_of_apartment='studio',
+                utility_service_staffs='1', max_guests=2, price_per_day=100, discount='0',
+                discount_option=discount_option)
+            for i in range(2)]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.guest)
+
+    def book(self, listing, start_day, end_day, status='PENDING'):
+        start_time, end_time = window(start_day, end_day)
+        return Booking.objects.create(
+            user=self.guest, owner=self.host, start_time=start_time, end_time=end_time,
+            location=listing.address, status=status,
+            content_type=ContentType.objects.get_for_model(listing), object_id=listing.pk)
+
+    def post_booking(self, start_day, end_day):
+        start_time, end_time = window(start_day, end_day)
+        return self.client.post(reverse('booking:booking-list'), {
+            'content_type': 'shortletlisting', 'content_object_id': str(self.listing.pk),
+            'start_time': start_time.isoformat(), 'end_time': end_time.isoformat(),
+            'location': self.listing.address,
+        }, format='json')
+
+
+class BookingAvailabilityTests(BookingTestCase):
+
+    def test_overlapping_booking_is_rejected(self):
+        self.book(self.listing, 0, 3)
+        response = self.post_booking(2, 5)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT, response.content)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_booking_inside_an_existing_one_is_rejected(self):
+        self.book(self.listing, 0, 10)
+        response = self.post_booking(3, 4)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT, response.content)
+
+    def test_free_window_is_booked(self):
+        response = self.post_booking(0, 3)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+        booking = Booking.objects.get()
+        self.assertEqual((booking.user, booking.owner, booking.object_id),
+                         (self.guest, self.host, self.listing.pk))
+
+    def test_back_to_back_bookings_are_allowed(self):
+        self.book(self.listing, 0, 3)
+        self.book(self.listing, 6, 9)
+        response = self.post_booking(3, 6)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+
+    def test_cancelled_bookings_are_ignored(self):
+        self.book(self.listing, 0, 3, status='CANCELLED')
+        response = self.post_booking(1, 2)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+
+    def test_bookings_of_other_listings_are_ignored(self):
+        self.book(self.other_listing, 0, 3)
+        self.assertTrue(is_available(self.listing, *window(0, 3)))
+
+    def test_rescheduled_booking_does_not_conflict_with_itself(self):
+        booking = self.book(self.listing, 0, 3)
+        start_time, end_time = window(1, 4)
+        response = self.client.put(
+            reverse('booking:booking-detail', args=[booking.pk]),
+            {'start_time': start_time.isoformat(), 'end_time': end_time.isoformat()}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        booking.refresh_from_db()
+        self.assertEqual((booking.start_time, booking.end_time), (start_time, end_time))
+
+    def test_rescheduling_onto_another_booking_is_rejected(self):
+        booking = self.book(self.listing, 0, 3)
+        self.book(self.listing, 5, 8)
+        start_time, end_time = window(4, 6)
+        response = self.client.put(
+            reverse('booking:booking-detail', args=[booking.pk]),
+            {'start_time': start_time.isoformat(), 'end_time': end_time.isoformat()}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT, response.content)
+
+    def test_available_listings_excludes_booked_listings(self):
+        self.book(self.listing, 0, 3)
+        self.book(self.other_listing, 3, 5, status='CANCELLED')
+        self.assertQuerySetEqual(
+            available_listings(ShortletListing.objects.all(), *window(2, 4)), [self.other_listing])
+        self.assertQuerySetEqual(
+            available_listings(ShortletListing.objects.order_by('product_name'), *window(3, 5)),
+            [self.listing, self.other_listing])
+
+
+class BookingConditionalGetTests(BookingTestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.booking = self.book(self.listing, 0, 3)
+        self.url = reverse('booking:booking-detail', args=[self.booking.pk])
+
+    def assertChanges(self, change):
+        etag = self.client.get(self.url)['ETag']
+        change()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_unchanged_booking_is_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+
+    def test_stale_if_match_fails(self):
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MATCH='"stale"').status_code,
+                         status.HTTP_412_PRECONDITION_FAILED)
+
+    def test_booking_changes_are_seen(self):
+        def cancel():
+            self.booking.status = 'CANCELLED'
+            self.booking.save()
+        self.assertChanges(cancel)
+
+    def test_listing_changes_are_seen(self):
+        amenity = Amenities.objects.create(tag='Pool')
+        self.assertChanges(lambda: self.listing.amenities.add(amenity))
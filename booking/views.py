@@ -1,22 +1,54 @@
 # views.py
+from asgiref.sync import sync_to_async
+from booking.availability import is_available
+from listing.cache import get_listing_version, last_modified, taxonomy_versions, version_time
 from booking.models import Booking
 from booking.serializer import BookingSerializer
 from exceptions.custom_apiexception_class import *
 from rest_framework import status
-from rest_framework.views import APIView
+from utils.async_views import AsyncAPIView
+from utils.conditional import conditional_get, make_etag
 from utils.custom_response import custom_response
+from utils.custom_pagination import CursorPagination
 from drf_yasg import openapi
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from drf_yasg.utils import swagger_auto_schema
 from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Q
 
 
-class BookingAPIView(APIView):
+BOOKABLE_MODELS = ['shortletlisting', 'carlisting']
+
+
+def booking_validators(view, request, pk=None, *args, **kwargs):
+    """
+    Validators for a booking detail: the booking's updated_on combined with
+    the cached version of the listing it embeds.
+    """
+    if pk is None:
+        return None, None
+    row = Booking.objects.filter(id=pk).values_list(
+        'updated_on', 'content_type', 'object_id').first()
+    if row is None:
+        return None, None
+    updated_on, content_type_id, object_id = row
+    listing_model = ContentType.objects.get_for_id(
+        content_type_id).model_class()
+    version = get_listing_version(listing_model, object_id)
+    etag = make_etag('booking', pk, updated_on, version, taxonomy_versions())
+    return etag, last_modified(updated_on, version and version_time(version))
+
+
+class BookingAPIView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
 
-    def get(self, request, pk, format=None):
+    @conditional_get(booking_validators)
+    async def get(self, request, pk=None, format=None):
+        if pk is None:
+            return await self.list(request)
         try:
-            booking = Booking.objects.get(id=pk)
+            booking = await Booking.objects.for_api().aget(id=pk)
         except Booking.DoesNotExist:
             return CustomAPIException(
                 detail=f"Booking with id {pk} not found.",
@@ -28,13 +60,32 @@ class BookingAPIView(APIView):
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
             ).get_full_details()
 
-        serializer = BookingSerializer(booking)
+        data = await sync_to_async(lambda: BookingSerializer(booking).data)()
         return custom_response(
             status_code=status.HTTP_200_OK,
             message="Booking fetched successfully",
-            data=serializer.data
+            data=data
         )
 
+    async def list(self, request):
+        try:
+            paginator = CursorPagination()
+            bookings = await paginator.apaginate_queryset(
+                Booking.objects.for_api().filter(
+                    Q(user=request.user) | Q(owner=request.user)),
+                request, view=self)
+        except CustomAPIException as e:
+            return e.get_full_details()
+        except Exception as e:
+            return CustomAPIException(
+                detail=f"An error occurred while retrieving the bookings: {str(e)}",
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+            ).get_full_details()
+
+        data = await sync_to_async(lambda: BookingSerializer(bookings, many=True).data)()
+        return paginator.get_paginated_response(
+            data, message="Bookings fetched successfully")
+
     @swagger_auto_schema(
         request_body=BookingSerializer,
         responses={
@@ -46,14 +97,37 @@ class BookingAPIView(APIView):
         if serializer.is_valid():
             try:
                 content_type_model = request.data.get('content_type')
+                if content_type_model not in BOOKABLE_MODELS:
+                    return CustomAPIException(
+                        detail="Invalid content type. Must be 'shortletlisting' or 'carlisting'.",
+                        status_code=status.HTTP_400_BAD_REQUEST
+                    ).get_full_details()
                 content_type = ContentType.objects.get(
                     model=content_type_model)
                 content_object_id = request.data.get('content_object_id')
-                content_object = content_type.get_object_for_this_type(
-                    id=content_object_id)
 
-                booking = serializer.save(
-                    content_type=content_type, content_object=content_object)
+                start_time = serializer.validated_data['start_time']
+                end_time = serializer.validated_data['end_time']
+                if start_time >= end_time:
+                    return CustomAPIException(
+                        detail="start_time must be before end_time.",
+                        status_code=status.HTTP_400_BAD_REQUEST
+                    ).get_full_details()
+
+                # Lock the listing row so concurrent requests for the same
+                # listing run the overlap check one at a time.
+                with transaction.atomic():
+                    content_object = content_type.model_class().objects.select_for_update().get(
+                        id=content_object_id)
+                    if not is_available(content_object, start_time, end_time):
+                        return CustomAPIException(
+                            detail="Listing is already booked for the selected period.",
+                            status_code=status.HTTP_409_CONFLICT
+                        ).get_full_details()
+
+                    serializer.save(
+                        user=request.user, owner=content_object.user,
+                        content_type=content_type, object_id=content_object.id)
 
                 response_data = serializer.data
                 return custom_response(
@@ -96,7 +170,25 @@ class BookingAPIView(APIView):
             booking, data=request.data, partial=True)
         if serializer.is_valid():
             try:
-                serializer.save()
+                start_time = serializer.validated_data.get(
+                    'start_time', booking.start_time)
+                end_time = serializer.validated_data.get(
+                    'end_time', booking.end_time)
+                if start_time >= end_time:
+                    return CustomAPIException(
+                        detail="start_time must be before end_time.",
+                        status_code=status.HTTP_400_BAD_REQUEST
+                    ).get_full_details()
+
+                with transaction.atomic():
+                    content_object = booking.content_type.model_class().objects.select_for_update().get(
+                        id=booking.object_id)
+                    if not is_available(content_object, start_time, end_time, exclude=booking.id):
+                        return CustomAPIException(
+                            detail="Listing is already booked for the selected period.",
+                            status_code=status.HTTP_409_CONFLICT
+                        ).get_full_details()
+                    serializer.save()
                 return custom_response(
                     status_code=status.HTTP_200_OK,
                     message="Booking updated successfully",
@@ -0,0 +1,276 @@
+import hashlib
+import uuid
+from functools import wraps
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+from rest_framework.response import Response
+from authentication.models import BusinessCategory
+from listing.models import Amenities, DiscountOption, Specifications
+from utils.conditional import make_etag
+from utils.taxonomy_cache import TaxonomyCache
+
+# Seconds a rendered listing detail is kept. Changes made through the ORM
+# move the listing's version, so this only bounds staleness for changes
+# nothing signals, such as edits to the owner's user profile.
+LISTING_CACHE_TTL = 60 * 60
+
+LISTING_VERSION_TTL = 24 * 60 * 60
+
+# Search results are only expired, never invalidated listing by listing.
+SEARCH_CACHE_TTL = 30
+
+# Taxonomies rendered inside listing responses. Their snapshot ETags are
+# part of every cache key, so renaming an amenity retires all cached
+# listings without enumerating them.
+RENDERED_TAXONOMIES = (Amenities, Specifications, DiscountOption, BusinessCategory)
+
+# Search parameters whose filters ignore case.
+CASE_INSENSITIVE_SEARCH_PARAMS = ('q', 'product_name', 'address')
+
+
+def version_key(model, pk):
+    return f'listing:version:{model._meta.label_lower}:{pk}'
+
+
+def generation_key(model):
+    return f'listing:generation:{model._meta.label_lower}'
+
+
+def collection_key(model):
+    # Moves with every listing version of model, so collection ETags see
+    # changes that leave updated_on alone, such as tags and reviews.
+    return f'listing:collection:{model._meta.label_lower}'
+
+
+def new_version():
+    # Versions start with the time they were issued, which doubles as the
+    # listing's Last-Modified; the suffix keeps same-instant bumps apart.
+    return f'{timezone.now().isoformat()}|{uuid.uuid4().hex[:8]}'
+
+
+def version_time(version):
+    return parse_datetime(version.split('|')[0])
+
+
+def bump_listing_versions(model, pks):
+    """
+    Gives each listing a fresh version, retiring its cached responses and
+    the ETags of the collections it may appear in.
+    """
+    version = new_version()
+    versions = {version_key(model, pk): version for pk in pks}
+    if versions:
+        versions[collection_key(model)] = version
+        cache.set_many(versions, LISTING_VERSION_TTL)
+
+
+def forget_listing(model, pk):
+    cache.delete(version_key(model, pk))
+    cache.set(collection_key(model), new_version(), LISTING_VERSION_TTL)
+
+
+def bump_listing_generation(model):
+    """
+    Retires the cached responses of every listing of model at once, for
+    bulk changes that bypass the model signals.
+    """
+    cache.set(generation_key(model), new_version(), None)
+
+
+def get_listing_version(model, pk):
+    """
+    Returns the listing's cache version, seeding it from updated_on the first
+    time, or None when the listing does not exist.
+    """
+    key = version_key(model, pk)
+    version = cache.get(key)
+    if version is None:
+        updated_on = model.objects.filter(pk=pk).values_list(
+            'updated_on', flat=True).first()
+        if updated_on is None:
+            return None
+        version = updated_on.isoformat()
+        cache.set(key, version, LISTING_VERSION_TTL)
+    return version
+
+
+def normalize_query_params(query_params, case_insensitive=()):
+    """
+    Returns a canonical string for a request's query parameters: keys and
+    repeated values sorted, blanks dropped and, for the given keys, case
+    folded.
+    """
+    parts = []
+    for key in sorted(query_params):
+        values = [value.strip() for value in query_params.getlist(key)]
+        if key in case_insensitive:
+            values = [value.lower() for value in values]
+        values = sorted(value for value in values if value)
+        if values:
+            parts.append(f'{key}={",".join(values)}')
+    return '&'.join(parts)
+
+
+def taxonomy_versions():
+    return ':'.join(TaxonomyCache.for_model(model).snapshot().etag
+                    for model in RENDERED_TAXONOMIES)
+
+
+def last_modified(*times):
+    """
+    Returns the latest of times and of the rendered taxonomies' changes.
+    """
+    times += tuple(TaxonomyCache.for_model(model).snapshot().last_modified
+                   for model in RENDERED_TAXONOMIES)
+    return max((time for time in times if time is not None), default=None)
+
+
+def hashed_key(prefix, *parts):
+    digest = hashlib.md5('|'.join(str(part) for part in parts).encode()).hexdigest()
+    return f'{prefix}:{digest}'
+
+
+def listing_detail_state(request, model, pk):
+    """
+    Returns everything a rendered listing detail depends on, or None when
+    the listing does not exist. Costs no queries once the version is cached.
+    """
+    version = get_listing_version(model, pk)
+    if version is None:
+        return None
+    return (version, cache.get(generation_key(model)), taxonomy_versions(),
+            normalize_query_params(request.query_params))
+
+
+def listing_detail_key(request, model, pk):
+    state = listing_detail_state(request, model, pk)
+    if state is None:
+        return None
+    return hashed_key(f'listing:detail:{model._meta.label_lower}:{pk}', *state)
+
+
+def listing_detail_validators(model):
+    """
+    Returns a conditional_get validators function for a listing detail view.
+    """
+    def validators(view, request, pk, *args, **kwargs):
+        state = listing_detail_state(request, model, pk)
+        if state is None:
+            return None, None
+        version, generation = state[:2]
+        times = [version_time(version)]
+        if generation:
+            times.append(version_time(generation))
+        return make_etag(model._meta.label_lower, pk, *state), last_modified(*times)
+    return validators
+
+
+def collection_validators(request, queryset):
+    """
+    Returns (etag, last_modified) for a page of listings from one aggregate
+    over the filtered queryset, which tells how many listings match and when
+    any of them, their businesses or their owners last changed, and from
+    the model's collection and generation versions, which move with every
+    other change a listing response renders.
+    """
+    model = queryset.model
+    stats = queryset.order_by().aggregate(
+        count=Count('id', distinct=True),
+        updated_on=Max('updated_on'),
+        business_updated_on=Max('business__updated_on'),
+        user_updated_on=Max('user__updated_on'),
+    )
+    versions = cache.get_many([collection_key(model), generation_key(model)])
+    collection = versions.get(collection_key(model))
+    generation = versions.get(generation_key(model))
+    etag = make_etag(
+        model._meta.label_lower, stats['count'], stats['updated_on'],
+        stats['business_updated_on'], stats['user_updated_on'], collection, generation,
+        taxonomy_versions(), normalize_query_params(request.query_params))
+    return etag, last_modified(
+        stats['updated_on'], stats['business_updated_on'], stats['user_updated_on'],
+        collection and version_time(collection), generation and version_time(generation))
+
+
+def search_key(request, model):
+    return hashed_key(
+        f'listing:search:{model._meta.label_lower}', taxonomy_versions(),
+        normalize_query_params(request.query_params, CASE_INSENSITIVE_SEARCH_PARAMS))
+
+
+def cached_response(key, ttl, build):
+    """
+    Returns the cached body for key, or calls build() and caches its body
+    when it is a 200. A key of None bypasses the cache.
+    """
+    if key is not None:
+        data = cache.get(key)
+        if data is not None:
+            return Response(data, status=status.HTTP_200_OK)
+    response = build()
+    if key is not None and response.status_code == status.HTTP_200_OK:
+        cache.set(key, response.data, ttl)
+    return response
+
+
+async def acached_response(key, ttl, build):
+    """
+    cached_response() for coroutine views; build() returns an awaitable.
+    """
+    if key is not None:
+        data = await cache.aget(key)
+        if data is not None:
+            return Response(data, status=status.HTTP_200_OK)
+    response = await build()
+    if key is not None and response.status_code == status.HTTP_200_OK:
+        await cache.aset(key, response.data, ttl)
+    return response
+
+
+def cache_listing_detail(model):
+    """
+    Decorates a listing detail view's get(request, pk), sync or async, with
+    the per-listing response cache.
+    """
+    def decorator(get):
+        if iscoroutinefunction(get):
+            @wraps(get)
+            async def async_wrapper(view, request, pk, *args, **kwargs):
+                key = await sync_to_async(listing_detail_key)(request, model, pk)
+                return await acached_response(
+                    key, LISTING_CACHE_TTL,
+                    lambda: get(view, request, pk, *args, **kwargs))
+            return async_wrapper
+
+        @wraps(get)
+        def wrapper(view, request, pk, *args, **kwargs):
+            return cached_response(
+                listing_detail_key(request, model, pk), LISTING_CACHE_TTL,
+                lambda: get(view, request, pk, *args, **kwargs))
+        return wrapper
+    return decorator
+
+
+def cache_search(get):
+    """
+    Decorates a search view's get(request) with a short-lived cache keyed by
+    the view's model and the normalized query parameters.
+    """
+    if iscoroutinefunction(get):
+        @wraps(get)
+        async def async_wrapper(view, request, *args, **kwargs):
+            key = await sync_to_async(search_key)(request, view.model)
+            return await acached_response(
+                key, SEARCH_CACHE_TTL, lambda: get(view, request, *args, **kwargs))
+        return async_wrapper
+
+    @wraps(get)
+    def wrapper(view, request, *args, **kwargs):
+        return cached_response(
+            search_key(request, view.model), SEARCH_CACHE_TTL,
+            lambda: get(view, request, *args, **kwargs))
+    return wrapper
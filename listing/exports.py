@@ -0,0 +1,86 @@
+import csv
+from utils.renderers import dumps
+from listing.imports import CSV_LIST_SEPARATOR, FK_TAG_FIELDS, IMPORT_BATCH_SIZE, IMPORT_SERIALIZERS, M2M_TAG_FIELDS
+
+EXPORT_CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+
+class Echo:
+    """
+    Stands in for a file so csv.writer hands each formatted line back
+    instead of buffering it.
+    """
+
+    def write(self, value):
+        return value
+
+
+def export_columns(model):
+    """
+    Columns written for a listing model: the fields the import accepts.
+    Ids are left out because an import only ever creates listings, so an
+    exported file imports as copies rather than updating the originals.
+    """
+    serializer = IMPORT_SERIALIZERS[model]()
+    return [name for name, field in serializer.fields.items() if not field.read_only]
+
+
+def export_rows(queryset, chunk_size=IMPORT_BATCH_SIZE):
+    """
+    Yields one dict per listing with tags, car types and car models given by
+    name. Listings are read with iterator(), which streams from a server-side
+    cursor where the database has one, and relations are prefetched per
+    chunk.
+    """
+    model = queryset.model
+    columns = export_columns(model)
+    fk_fields = FK_TAG_FIELDS[model]
+    queryset = queryset.select_related(*fk_fields).prefetch_related(
+        *M2M_TAG_FIELDS).order_by('created_on', 'id')
+
+    for listing in queryset.iterator(chunk_size=chunk_size):
+        row = {}
+        for column in columns:
+            if column in M2M_TAG_FIELDS:
+                name_field = M2M_TAG_FIELDS[column][1]
+                value = [getattr(tag, name_field)
+                         for tag in getattr(listing, column).all()]
+            elif column in fk_fields:
+                related = getattr(listing, column)
+                value = getattr(related, fk_fields[column][1]) if related else None
+            else:
+                value = getattr(listing, column)
+                if not isinstance(value, (str, int, float, bool, type(None))):
+                    value = str(value)
+            row[column] = value
+        yield row
+
+
+def stream_csv(rows, columns):
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([
+            CSV_LIST_SEPARATOR.join(value) if isinstance(value, list)
+            else '' if value is None else value
+            for value in (row[column] for column in columns)
+        ])
+
+
+def stream_jsonl(rows):
+    for row in rows:
+        yield dumps(row).decode() + '\n'
+
+
+def stream_export(queryset, file_format, chunk_size=IMPORT_BATCH_SIZE):
+    """
+    Returns a generator of text chunks in file_format for the listings of
+    queryset, suitable for a StreamingHttpResponse or writing to a file.
+    """
+    rows = export_rows(queryset, chunk_size=chunk_size)
+    if file_format == 'jsonl':
+        return stream_jsonl(rows)
+    return stream_csv(rows, export_columns(queryset.model))
@@ -0,0 +1,162 @@
+import math
+from django.db.models import F, Q
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# Precision stored on listings; 9 characters is a cell of roughly 5 m.
+GEOHASH_PRECISION = 9
+
+# Most geohash prefixes a bounding box may expand into before falling back
+# to a coarser precision.
+MAX_COVER_CELLS = 16
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    geohash = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(geohash) < precision:
+        value, bounds = (longitude, lng_range) if even else (latitude, lat_range)
+        mid = (bounds[0] + bounds[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            bounds[0] = mid
+        else:
+            bounds[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(geohash)
+
+
+def listing_geohash(latitude, longitude):
+    """
+    Returns the geohash stored for a listing, or '' when it has no
+    coordinates.
+    """
+    if latitude is None or longitude is None:
+        return ''
+    return encode_geohash(latitude, longitude)
+
+
+def cell_size(precision):
+    """
+    Returns the (latitude, longitude) span in degrees of a geohash cell.
+    """
+    total_bits = 5 * precision
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lng_bits)
+
+
+def longitude_ranges(min_lng, max_lng):
+    """
+    Splits a longitude span into (min, max) ranges that do not cross the
+    antimeridian. A span whose min_lng is greater than its max_lng crosses
+    it, as in GeoJSON bounding boxes.
+    """
+    if min_lng <= max_lng:
+        return [(min_lng, max_lng)]
+    return [(min_lng, 180.0), (-180.0, max_lng)]
+
+
+def cover_bounding_box(min_lat, min_lng, max_lat, max_lng):
+    """
+    Returns the smallest set of geohash prefixes, at the finest precision
+    that needs no more than MAX_COVER_CELLS of them, whose cells together
+    contain the bounding box.
+    """
+    ranges = longitude_ranges(min_lng, max_lng)
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_step, lng_step = cell_size(precision)
+        rows = math.ceil((max_lat - min_lat) / lat_step) + 1
+        columns = [math.ceil((high - low) / lng_step) + 1 for low, high in ranges]
+        if rows * sum(columns) <= MAX_COVER_CELLS:
+            break
+
+    cells = set()
+    for (low, high), column_count in zip(ranges, columns):
+        for row in range(rows + 1):
+            latitude = min(min_lat + row * lat_step, max_lat)
+            for column in range(column_count + 1):
+                longitude = min(low + column * lng_step, high)
+                cells.add(encode_geohash(latitude, longitude, precision))
+    return cells
+
+
+def wrap_longitude(longitude):
+    return (longitude + 180.0) % 360.0 - 180.0
+
+
+def radius_bounding_box(latitude, longitude, radius_km):
+    """
+    Returns the bounding box of a circle; its longitudes wrap around the
+    antimeridian when the circle crosses it, and span the whole globe when
+    it reaches a pole.
+    """
+    angle = radius_km / EARTH_RADIUS_KM
+    min_lat = latitude - math.degrees(angle)
+    max_lat = latitude + math.degrees(angle)
+    if min_lat <= -90.0 or max_lat >= 90.0:
+        return max(min_lat, -90.0), -180.0, min(max_lat, 90.0), 180.0
+    # The circle is widest in longitude north or south of its centre, where
+    # its meridians touch it; this is that half-width.
+    lng_delta = math.degrees(math.asin(math.sin(angle) / math.cos(math.radians(latitude))))
+    return (
+        min_lat, wrap_longitude(longitude - lng_delta),
+        max_lat, wrap_longitude(longitude + lng_delta),
+    )
+
+
+def within_bounding_box(queryset, min_lat, min_lng, max_lat, max_lng):
+    """
+    Narrows a listing queryset to a bounding box: first to the covering
+    geohash cells, which the indexed geohash column answers with range
+    scans, then to the exact coordinates.
+    """
+    cells = Q()
+    for cell in cover_bounding_box(min_lat, min_lng, max_lat, max_lng):
+        # A prefix match written as a range, which every backend can answer
+        # from a plain b-tree index ('~' sorts after the geohash alphabet).
+        cells |= Q(geohash__gte=cell, geohash__lt=cell + '~')
+    longitudes = Q()
+    for longitude_range in longitude_ranges(min_lng, max_lng):
+        longitudes |= Q(longitude__range=longitude_range)
+    return queryset.filter(cells).filter(
+        longitudes, latitude__range=(min_lat, max_lat))
+
+
+def haversine_distance(latitude, longitude):
+    """
+    Database expression for the great-circle distance in km between each
+    row's coordinates and the given point.
+    """
+    lat_delta = Radians(F('latitude') - latitude)
+    lng_delta = Radians(F('longitude') - longitude)
+    a = Power(Sin(lat_delta / 2), 2) + (
+        math.cos(math.radians(latitude)) * Cos(Radians(F('latitude')))
+        * Power(Sin(lng_delta / 2), 2)
+    )
+    return 2 * EARTH_RADIUS_KM * ASin(Sqrt(a))
+
+
+def within_radius(queryset, latitude, longitude, radius_km):
+    """
+    Narrows a listing queryset to listings within radius_km of the point and
+    annotates each with distance_km.
+    """
+    queryset = within_bounding_box(
+        queryset, *radius_bounding_box(latitude, longitude, radius_km))
+    return queryset.annotate(
+        distance_km=haversine_distance(latitude, longitude)
+    ).filter(distance_km__lte=radius_km)
@@ -0,0 +1,231 @@
+import csv
+import json
+import os
+from itertools import chain, islice
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+from listing.geo import listing_geohash
+from listing.models import Amenities, CarListing, CarModel, CarType, DiscountOption, ShortletListing, Specifications
+from listing.search import add_to_search_index, build_search_document
+from listing.serializers import CarListingImportSerializer, ShortletListingImportSerializer
+from utils.taxonomy_cache import TaxonomyCache
+
+# Rows per INSERT statement when bulk creating listings, tags and M2M rows.
+IMPORT_BATCH_SIZE = 500
+
+# Listing models by the name operators use for them on the command line.
+LISTING_KINDS = {
+    'shortlet': ShortletListing,
+    'car': CarListing,
+}
+
+IMPORT_SERIALIZERS = {
+    ShortletListing: ShortletListingImportSerializer,
+    CarListing: CarListingImportSerializer,
+}
+
+IMPORT_FORMATS = ('csv', 'jsonl')
+
+# Separates the names in multi-valued CSV cells such as amenities.
+CSV_LIST_SEPARATOR = ';'
+
+# Row errors kept for the summary of a streamed import; the rest are counted.
+MAX_REPORTED_ERRORS = 100
+
+# Many-to-many fields given as lists of names: field -> (model, name field).
+M2M_TAG_FIELDS = {
+    'amenities': (Amenities, 'tag'),
+    'specification': (Specifications, 'tag'),
+}
+
+# Foreign keys given as a single name, per listing model.
+FK_TAG_FIELDS = {
+    ShortletListing: {
+        'discount_option': (DiscountOption, 'title'),
+    },
+    CarListing: {
+        'discount_option': (DiscountOption, 'title'),
+        'type_of_car': (CarType, 'title'),
+        'car_model': (CarModel, 'title'),
+    },
+}
+
+
+def resolve_names(model, name_field, names):
+    """
+    Maps each distinct name to an instance of model. Names the taxonomy
+    cache knows cost nothing; the rest are looked up in one query and the
+    ones that do not exist yet are bulk created.
+    """
+    names = {name for name in names if name}
+    taxonomy = TaxonomyCache.for_model(model)
+    resolved = {
+        name: model(pk=pk, **{name_field: name})
+        for name, pk in taxonomy.ids_by_name(names).items()
+    }
+    unknown = names - resolved.keys()
+    if not unknown:
+        return resolved
+
+    for obj in model.objects.filter(**{f'{name_field}__in': unknown}):
+        resolved.setdefault(getattr(obj, name_field), obj)
+    missing = [model(**{name_field: name}) for name in unknown - resolved.keys()]
+    model.objects.bulk_create(missing, batch_size=IMPORT_BATCH_SIZE)
+    resolved.update((getattr(obj, name_field), obj) for obj in missing)
+    # bulk_create sends no post_save, so the cache is not told otherwise.
+    if missing:
+        taxonomy.invalidate()
+    return resolved
+
+
+def validate_rows(model, rows):
+    """
+    Validates every row on its own and returns (valid_rows, errors), where
+    each error is {'row': index, 'errors': ...} so callers can report it
+    against the uploaded data.
+    """
+    serializer = IMPORT_SERIALIZERS[model]()
+    valid_rows, errors = [], []
+    for index, row in enumerate(rows):
+        try:
+            valid_rows.append(serializer.run_validation(row))
+        except ValidationError as e:
+            errors.append({'row': index, 'errors': e.detail})
+    return valid_rows, errors
+
+
+def import_listings(model, rows, user, business):
+    """
+    Creates a listing for every valid row with a fixed number of queries per
+    batch: one lookup and one insert per tag model, then the listings and
+    their M2M rows, all in one transaction.
+
+    bulk_create bypasses the model signals, so the geohash and search
+    document that signals maintain for single saves are filled in here.
+    Returns (listings, errors) as validate_rows describes errors.
+    """
+    valid_rows, errors = validate_rows(model, rows)
+    if not valid_rows:
+        return [], errors
+
+    fk_fields = FK_TAG_FIELDS[model]
+    with transaction.atomic():
+        m2m_names = {
+            field_name: resolve_names(tag_model, name_field, chain.from_iterable(
+                row.get(field_name) or () for row in valid_rows))
+            for field_name, (tag_model, name_field) in M2M_TAG_FIELDS.items()
+        }
+        fk_names = {
+            field_name: resolve_names(tag_model, name_field, (
+                row.get(field_name) for row in valid_rows))
+            for field_name, (tag_model, name_field) in fk_fields.items()
+        }
+
+        listings = []
+        listing_tags = []
+        for row in valid_rows:
+            tags = {
+                field_name: [names[name] for name in dict.fromkeys(row.pop(field_name, None) or ())]
+                for field_name, names in m2m_names.items()
+            }
+            for field_name, names in fk_names.items():
+                row[field_name] = names.get(row.pop(field_name, None))
+            listing = model(user=user, business=business, **row)
+            listing.geohash = listing_geohash(
+                listing.latitude, listing.longitude)
+            listing.search_document = build_search_document(
+                listing, amenities=tags['amenities'], specifications=tags['specification'])
+            listings.append(listing)
+            listing_tags.append(tags)
+
+        model.objects.bulk_create(listings, batch_size=IMPORT_BATCH_SIZE)
+
+        for field_name in M2M_TAG_FIELDS:
+            field = model._meta.get_field(field_name)
+            through = field.remote_field.through
+            source = f'{field.m2m_field_name()}_id'
+            target = f'{field.m2m_reverse_field_name()}_id'
+            through.objects.bulk_create([
+                through(**{source: listing.pk, target: tag.pk})
+                for listing, tags in zip(listings, listing_tags)
+                for tag in tags[field_name]
+            ], batch_size=IMPORT_BATCH_SIZE)
+
+        add_to_search_index(listings, using=model.objects.db)
+    return listings, errors
+
+
+def guess_format(filename, default='csv'):
+    extension = os.path.splitext(filename or '')[1].lstrip('.').lower()
+    if extension == 'ndjson':
+        return 'jsonl'
+    return extension if extension in IMPORT_FORMATS else default
+
+
+def read_csv_rows(lines):
+    """
+    Yields one dict per CSV record, dropping empty cells so that optional
+    columns can be left blank and splitting the tag columns into lists.
+    """
+    for record in csv.DictReader(lines):
+        row = {}
+        for column, value in record.items():
+            if column is None or not value:
+                continue
+            if column in M2M_TAG_FIELDS:
+                value = [name.strip() for name in value.split(
+                    CSV_LIST_SEPARATOR) if name.strip()]
+            row[column] = value
+        yield row
+
+
+def read_jsonl_rows(lines):
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            # Left to validation, which reports it against the row number.
+            yield line
+
+
+def read_rows(lines, file_format):
+    """
+    Lazily parses an iterable of text lines in one of IMPORT_FORMATS.
+    """
+    if file_format == 'jsonl':
+        return read_jsonl_rows(lines)
+    return read_csv_rows(lines)
+
+
+def import_stream(model, rows, user, business, chunk_size=IMPORT_BATCH_SIZE, start_row=0, progress=None):
+    """
+    Imports an iterable of rows chunk_size rows at a time, each chunk in its
+    own transaction, so memory stays flat however large the file is.
+
+    Rows before start_row are skipped, which resumes an interrupted run
+    from the next_row it last reported. progress, if given, is called with
+    (next_row, created, failed) after every committed chunk.
+    """
+    rows = iter(rows)
+    next(islice(rows, start_row, start_row), None)
+
+    summary = {'next_row': start_row, 'created': 0,
+               'failed': 0, 'errors': []}
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        listings, errors = import_listings(model, chunk, user, business)
+        for error in errors:
+            error['row'] += summary['next_row']
+        room = MAX_REPORTED_ERRORS - len(summary['errors'])
+        summary['errors'] += errors[:max(room, 0)]
+        summary['created'] += len(listings)
+        summary['failed'] += len(errors)
+        summary['next_row'] += len(chunk)
+        if progress is not None:
+            progress(summary['next_row'], summary['created'], summary['failed'])
+    return summary
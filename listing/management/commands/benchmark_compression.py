@@ -0,0 +1,45 @@
+import time
+from django.core.management.base import BaseCommand
+from django.utils.text import compress_string
+from listing.imports import LISTING_KINDS
+from listing.management.commands.benchmark_renderers import listing_page
+from utils import middleware
+from utils.renderers import FastJSONRenderer
+
+
+class Command(BaseCommand):
+    help = ("Compares body size, compression time and estimated transfer time of "
+            "a page of listings sent as is, gzipped and brotli-compressed.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(LISTING_KINDS))
+        parser.add_argument('--count', type=int, default=1000)
+        parser.add_argument('--rounds', type=int, default=10)
+        parser.add_argument('--bandwidth', type=int, default=1600,
+                            help="Link speed in kbit/s used for the transfer estimate.")
+        parser.add_argument('--rtt', type=int, default=150,
+                            help="Round trip time in ms added to the transfer estimate.")
+
+    def handle(self, *args, **options):
+        content = FastJSONRenderer().render(listing_page(options['kind'], options['count']))
+
+        candidates = [
+            ('identity', lambda content: content),
+            ('gzip', lambda content: compress_string(
+                content, max_random_bytes=middleware.CompressionMiddleware.max_random_bytes)),
+        ]
+        if middleware.brotli is not None:
+            candidates.append(('br', middleware.compress_brotli))
+
+        for name, compress in candidates:
+            size = len(compress(content))
+            started = time.perf_counter()
+            for _ in range(options['rounds']):
+                compress(content)
+            seconds = (time.perf_counter() - started) / options['rounds']
+            transfer = size * 8 / (options['bandwidth'] * 1000) + options['rtt'] / 1000
+            self.stdout.write(
+                f"{name}: {size / 1024:.0f} KiB ({size / len(content):.1%}), "
+                f"{seconds * 1000:.2f} ms to compress, "
+                f"~{(seconds + transfer) * 1000:.0f} ms to deliver at "
+                f"{options['bandwidth']} kbit/s")
@@ -0,0 +1,105 @@
+import random
+import time
+import uuid
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from authentication.models import CustomUser, UserBusiness
+from listing import geo
+from listing.models import DiscountOption, ShortletListing
+
+
+class Rollback(Exception):
+    pass
+
+
+def distance_filter(queryset, latitude, longitude, radius_km):
+    """
+    The search without the geohash cells: the exact distance of every row.
+    """
+    return queryset.annotate(
+        distance_km=geo.haversine_distance(latitude, longitude)
+    ).filter(distance_km__lte=radius_km)
+
+
+class Command(BaseCommand):
+    help = ("Loads synthetic shortlets scattered over a region and compares near-me searches "
+            "narrowed by geohash cell with a distance filter over every row. Rows are rolled "
+            "back afterwards.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--listings', type=int, default=500000)
+        parser.add_argument('--radius', type=float, nargs='+', default=[1, 5, 25],
+                            help="Search radii in km to measure.")
+        parser.add_argument('--rounds', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--region', type=float, nargs=4, default=[4.0, 2.7, 13.9, 14.7],
+                            metavar=('MIN_LAT', 'MIN_LNG', 'MAX_LAT', 'MAX_LNG'),
+                            help="Box the listings are scattered over; Nigeria by default.")
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        try:
+            with transaction.atomic():
+                self.measure(options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def measure(self, options):
+        min_lat, min_lng, max_lat, max_lng = options['region']
+        started = time.perf_counter()
+        self.load(options['listings'], options['region'])
+        self.stdout.write(
+            f"{options['listings']} shortlets loaded in {time.perf_counter() - started:.1f} s")
+
+        # Unordered, as the default ordering's index would otherwise compete
+        # with the geohash index; the search endpoint orders radius
+        # searches by distance.
+        queryset = ShortletListing.objects.order_by()
+        plan = geo.within_radius(queryset, min_lat, min_lng, options['radius'][0]).explain()
+        self.stdout.write(f"within_radius plan:\n{plan}")
+
+        for radius_km in options['radius']:
+            points = [(random.uniform(min_lat, max_lat), random.uniform(min_lng, max_lng))
+                      for _ in range(options['rounds'])]
+            self.stdout.write(f"{radius_km:g} km radius:")
+            results = []
+            for name, search in (('distance over every row', distance_filter),
+                                 ('within_radius', geo.within_radius)):
+                started = time.perf_counter()
+                found = [set(search(queryset, *point, radius_km).values_list('pk', flat=True))
+                         for point in points]
+                seconds = (time.perf_counter() - started) / len(points)
+                self.stdout.write(
+                    f"  {name}: {seconds * 1000:.2f} ms and "
+                    f"{sum(map(len, found)) / len(points):.1f} listings per search")
+                results.append(found)
+            if results[0] != results[1]:
+                self.stderr.write("  within_radius and the full scan found different listings.")
+
+    def load(self, count, region):
+        """
+        Creates count shortlets at random coordinates within region.
+        """
+        min_lat, min_lng, max_lat, max_lng = region
+        host = CustomUser.objects.create_user(email=f'{uuid.uuid4().hex}@benchmark.local')
+        business = UserBusiness.objects.create(
+            user=host, business_name='Benchmark', business_country='NG',
+            business_state='Lagos', business_postal_code='100001')
+        discount_option = DiscountOption.objects.create(title=f'Benchmark {uuid.uuid4().hex}')
+
+        batch = []
+        for i in range(count):
+            latitude = random.uniform(min_lat, max_lat)
+            longitude = random.uniform(min_lng, max_lng)
+            batch.append(ShortletListing(
+                user=host, business=business, address=f'{i} Benchmark Road', landmark_1='',
+                landmark_2='', landmark_3='', product_name=f'Benchmark {i}', type_of_apartment='studio',
+                utility_service_staffs='0', max_guests=2, price_per_day=100, discount='0',
+                discount_option=discount_option, latitude=latitude, longitude=longitude,
+                # bulk_create skips the pre_save signal that sets it.
+                geohash=geo.listing_geohash(latitude, longitude)))
+            if len(batch) == 5000:
+                ShortletListing.objects.bulk_create(batch)
+                batch = []
+        ShortletListing.objects.bulk_create(batch)
@@ -0,0 +1,65 @@
+import itertools
+import time
+import tracemalloc
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from listing.imports import LISTING_KINDS
+from listing.models import ShortletListing
+from listing.serializers import CarListingSerializer, ShortletListingSerializer
+from listing.views import serialize_listings_with_reviews
+from utils import renderers
+from utils.custom_response import custom_response
+
+
+def listing_page(kind, count):
+    """
+    Returns the response data of a page of count listings of the given kind,
+    shaped like the listing collection endpoints render it. Existing
+    listings are repeated to fill the page.
+    """
+    model = LISTING_KINDS[kind]
+    serializer_class = ShortletListingSerializer if model is ShortletListing else CarListingSerializer
+    listings = list(model.objects.for_api()[:count])
+    if not listings:
+        raise CommandError(f"There are no {model._meta.verbose_name_plural} to render.")
+
+    results = serialize_listings_with_reviews(listings, serializer_class)
+    results = list(itertools.islice(itertools.cycle(results), count))
+    return custom_response(status_code=200, message="Success", data={
+        'count': len(results), 'next': None, 'results': results}).data
+
+
+class Command(BaseCommand):
+    help = "Compares render time and peak memory of the JSON renderers on a page of listings."
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(LISTING_KINDS))
+        parser.add_argument('--count', type=int, default=1000,
+                            help="Listings in the payload; existing ones are repeated to fill it.")
+        parser.add_argument('--rounds', type=int, default=10)
+
+    def handle(self, *args, **options):
+        data = listing_page(options['kind'], options['count'])
+        results = data['data']['results']
+
+        candidates = [('JSONRenderer', JSONRenderer().render)]
+        if renderers.orjson is not None:
+            candidates.append(('FastJSONRenderer', renderers.FastJSONRenderer().render))
+        for name, render in candidates:
+            size, seconds, peak = self.measure(render, data, options['rounds'])
+            self.stdout.write(
+                f"{name}: {len(results)} listings, {size / 1024:.0f} KiB, "
+                f"{seconds * 1000:.2f} ms per render, {peak / 1024:.0f} KiB peak")
+
+    def measure(self, render, data, rounds):
+        size = len(render(data))
+        started = time.perf_counter()
+        for _ in range(rounds):
+            render(data)
+        seconds = (time.perf_counter() - started) / rounds
+
+        tracemalloc.start()
+        render(data)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return size, seconds, peak
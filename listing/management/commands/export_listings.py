@@ -0,0 +1,40 @@
+import sys
+from django.core.management.base import BaseCommand
+from listing.exports import stream_export
+from listing.imports import IMPORT_BATCH_SIZE, IMPORT_FORMATS, LISTING_KINDS, guess_format
+
+
+class Command(BaseCommand):
+    help = "Streams listings to a CSV or JSONL file in the format import_listings reads."
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(LISTING_KINDS))
+        parser.add_argument('--output', help="Defaults to stdout.")
+        parser.add_argument('--format', dest='file_format', choices=IMPORT_FORMATS,
+                            help="Defaults to the output file extension, or csv.")
+        parser.add_argument('--owner', help="Only export this user's listings.")
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        model = LISTING_KINDS[options['kind']]
+        queryset = model.objects.all()
+        if options['owner']:
+            queryset = queryset.filter(user__email=options['owner'])
+
+        output = options['output']
+        file_format = options['file_format'] or guess_format(output)
+        chunks = stream_export(
+            queryset, file_format, chunk_size=options['chunk_size'])
+
+        f = open(output, 'w', newline='', encoding='utf-8') if output else sys.stdout
+        try:
+            for lines, chunk in enumerate(chunks, start=1):
+                f.write(chunk)
+                if output and lines % options['chunk_size'] == 0:
+                    self.stderr.write(f"Wrote {lines} lines.")
+        finally:
+            if output:
+                f.close()
+        if output:
+            self.stdout.write(self.style.SUCCESS(
+                f"Exported {model._meta.verbose_name_plural} to {output}."))
@@ -0,0 +1,56 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from authentication.models import UserBusiness
+from listing.imports import IMPORT_BATCH_SIZE, IMPORT_FORMATS, LISTING_KINDS, guess_format, import_stream, read_rows
+
+
+class Command(BaseCommand):
+    help = "Streams listings from a CSV or JSONL file into the given owner's business."
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(LISTING_KINDS))
+        parser.add_argument('path')
+        parser.add_argument('--owner', required=True,
+                            help="Email of the user whose business gets the listings.")
+        parser.add_argument('--format', dest='file_format', choices=IMPORT_FORMATS,
+                            help="Defaults to the file extension.")
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument('--start-row', type=int, default=0,
+                            help="Number of data rows to skip, to resume an earlier run.")
+        parser.add_argument('--checkpoint',
+                            help="File recording the next row after each committed chunk. "
+                                 "An existing checkpoint overrides --start-row.")
+
+    def handle(self, *args, **options):
+        model = LISTING_KINDS[options['kind']]
+        try:
+            business = UserBusiness.objects.select_related(
+                'user').get(user__email=options['owner'])
+        except UserBusiness.DoesNotExist:
+            raise CommandError(f"No business found for {options['owner']}.")
+
+        start_row = options['start_row']
+        checkpoint = options['checkpoint']
+        if checkpoint and os.path.exists(checkpoint):
+            with open(checkpoint) as f:
+                start_row = int(f.read().strip() or 0)
+            self.stdout.write(f"Resuming from row {start_row}.")
+
+        def progress(next_row, created, failed):
+            if checkpoint:
+                with open(checkpoint, 'w') as f:
+                    f.write(str(next_row))
+            self.stdout.write(
+                f"Rows up to {next_row}: {created} created, {failed} failed.")
+
+        file_format = options['file_format'] or guess_format(options['path'])
+        with open(options['path'], newline='', encoding='utf-8-sig') as f:
+            summary = import_stream(
+                model, read_rows(f, file_format), business.user, business,
+                chunk_size=options['chunk_size'], start_row=start_row, progress=progress)
+
+        for error in summary['errors']:
+            self.stderr.write(f"Row {error['row']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {summary['created']} {model._meta.verbose_name_plural}, "
+            f"{summary['failed']} rows failed."))
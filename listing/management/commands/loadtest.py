@@ -0,0 +1,69 @@
+import asyncio
+import statistics
+import time
+import aiohttp
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = ("Fires concurrent GET requests at a running server and reports throughput "
+            "and latency, to compare the WSGI and ASGI deployments.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='+',
+                            help="Requested round-robin, e.g. a detail and a search URL.")
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--header', action='append', default=[],
+                            help="Extra request header as 'Name: value'; may be repeated.")
+
+    def handle(self, *args, **options):
+        headers = {}
+        for header in options['header']:
+            name, separator, value = header.partition(':')
+            if not separator:
+                raise CommandError(f"Invalid header {header!r}.")
+            headers[name.strip()] = value.strip()
+
+        latencies, failures, seconds = asyncio.run(self.run(
+            options['urls'], options['requests'], options['concurrency'], headers))
+
+        if not latencies:
+            raise CommandError(f"All {failures} requests failed.")
+        latencies.sort()
+        self.stdout.write(
+            f"{len(latencies)} ok, {failures} failed in {seconds:.2f} s: "
+            f"{len(latencies) / seconds:.1f} req/s, "
+            f"p50 {statistics.median(latencies) * 1000:.0f} ms, "
+            f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.0f} ms, "
+            f"max {latencies[-1] * 1000:.0f} ms")
+
+    async def run(self, urls, total, concurrency, headers):
+        latencies = []
+        failures = 0
+        queue = asyncio.Queue()
+        for index in range(total):
+            queue.put_nowait(urls[index % len(urls)])
+
+        async def worker(session):
+            nonlocal failures
+            while not queue.empty():
+                url = queue.get_nowait()
+                started = time.perf_counter()
+                try:
+                    async with session.get(url, headers=headers) as response:
+                        await response.read()
+                        ok = response.status < 400
+                except aiohttp.ClientError:
+                    ok = False
+                if ok:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    failures += 1
+
+        connector = aiohttp.TCPConnector(limit=concurrency)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            started = time.perf_counter()
+            await asyncio.gather(*[worker(session) for _ in range(concurrency)])
+            seconds = time.perf_counter() - started
+        return latencies, failures, seconds
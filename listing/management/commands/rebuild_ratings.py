@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from listing.cache import bump_listing_generation
+from listing.models import CarListing, ShortletListing
+from listing.ratings import rebuild_ratings
+
+
+class Command(BaseCommand):
+    help = "Recomputes the rating average, count and histogram of every listing from its reviews."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        for model in (ShortletListing, CarListing):
+            with transaction.atomic():
+                updated = rebuild_ratings(
+                    model, chunk_size=options['chunk_size'])
+            bump_listing_generation(model)
+            self.stdout.write(self.style.SUCCESS(
+                f"Rebuilt ratings for {updated} reviewed {model._meta.verbose_name_plural}."))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from listing.models import CarListing, ShortletListing
+from listing.search import update_search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the full-text search document and index entry of every listing."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        for model in (ShortletListing, CarListing):
+            listings = model.objects.select_related(
+                'type_of_car', 'car_model') if model is CarListing else model.objects.all()
+            listings = listings.prefetch_related('amenities', 'specification')
+            count = 0
+            for listing in listings.iterator(chunk_size=options['chunk_size']):
+                update_search_index(listing)
+                count += 1
+            self.stdout.write(self.style.SUCCESS(
+                f"Indexed {count} {model._meta.verbose_name_plural}."))
@@ -0,0 +1,111 @@
+from collections import defaultdict
+from django.db import models
+from django.db.models import F, Prefetch, Q, Window
+from django.db.models.functions import RowNumber
+from django.contrib.contenttypes.models import ContentType
+
+
+# select_related/prefetch_related lookups needed by each expandable
+# relation of the listing card serializers.
+# Rendered from listing.taxonomy's cache, so only the related ids of these
+# relations are loaded. discount_option needs no join at all for the same
+# reason.
+CACHED_TAXONOMY_RELATIONS = ('specification', 'amenities')
+
+CARD_EXPAND_RELATIONS = {
+    'user': (['user'], []),
+    'business': (['business__user'], ['business__category_type']),
+    'discount_option': ([], []),
+    'specification': ([], ['specification']),
+    'amenities': ([], ['amenities']),
+}
+
+
+class ListingQuerySet(models.QuerySet):
+
+    def for_api(self):
+        """
+        Joins and prefetches everything ShortletListingSerializer and
+        CarListingSerializer render, so serializing a page of listings
+        costs a fixed number of queries.
+        """
+        return self.select_related(
+            'user', 'business', 'business__user'
+        ).prefetch_related(
+            'business__category_type', *self.taxonomy_prefetches(CACHED_TAXONOMY_RELATIONS)
+        )
+
+    def taxonomy_prefetches(self, field_names):
+        prefetches = []
+        for field_name in field_names:
+            related_model = self.model._meta.get_field(field_name).related_model
+            prefetches.append(Prefetch(
+                field_name, queryset=related_model.objects.only('id')))
+        return prefetches
+
+    def for_card(self, expand=()):
+        """
+        Loads only what the card serializers render: the business name plus
+        whichever relations the client asked to expand.
+        """
+        select_related = ['business']
+        prefetch_related = []
+        for field_name in expand:
+            joins, prefetches = CARD_EXPAND_RELATIONS.get(field_name, ([], []))
+            select_related += joins
+            prefetch_related += prefetches
+        taxonomies = [name for name in prefetch_related if name in CACHED_TAXONOMY_RELATIONS]
+        others = [name for name in prefetch_related if name not in CACHED_TAXONOMY_RELATIONS]
+        return self.select_related(*select_related).prefetch_related(
+            *others, *self.taxonomy_prefetches(taxonomies))
+
+
+class ReviewQuerySet(models.QuerySet):
+
+    def for_objects(self, objects):
+        """
+        Returns the reviews attached to any of the given objects through the
+        content_type/object_id generic relation, in a single query.
+        """
+        ids_by_model = defaultdict(list)
+        for obj in objects:
+            ids_by_model[obj._meta.concrete_model].append(obj.pk)
+        if not ids_by_model:
+            return self.none()
+
+        content_types = ContentType.objects.get_for_models(*ids_by_model)
+        filters = Q()
+        for model, ids in ids_by_model.items():
+            filters |= Q(content_type=content_types[model], object_id__in=ids)
+        return self.filter(filters)
+
+    def latest_for_objects(self, objects, limit):
+        """
+        Returns at most limit newest reviews per object, still in a single
+        query, by numbering each object's reviews with a window function.
+        """
+        return self.for_objects(objects).annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=[F('content_type'), F('object_id')],
+                order_by=[F('created_on').desc(), F('id').desc()],
+            )
+        ).filter(position__lte=limit)
+
+    def grouped_by_object(self, objects, limit=None):
+        """
+        Returns a dict mapping each object id to its list of reviews,
+        newest first, optionally capped at limit reviews per object.
+        """
+        if limit is None:
+            reviews = self.for_objects(objects)
+        else:
+            reviews = self.latest_for_objects(objects, limit)
+        grouped = defaultdict(list)
+        for review in reviews.order_by('-created_on', '-id'):
+            grouped[review.object_id].append(review)
+        return grouped
+
+
+ListingManager = models.Manager.from_queryset(ListingQuerySet)
+ReviewManager = models.Manager.from_queryset(ReviewQuerySet)
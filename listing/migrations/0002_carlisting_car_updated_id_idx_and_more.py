@@ -0,0 +1,29 @@
+# Generated by Django 5.0.6 on 2026-10-18 10:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0003_rename_businesscategogy_businesscategory'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('listing', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='carlisting',
+            index=models.Index(fields=['updated_on', 'id'], name='car_updated_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['user', 'created_on', 'id'], name='review_user_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shortletlisting',
+            index=models.Index(fields=['updated_on', 'id'], name='shortlet_updated_id_idx'),
+        ),
+    ]
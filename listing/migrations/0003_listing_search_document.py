@@ -0,0 +1,54 @@
+# Generated by Django 5.0.6 on 2026-10-18 10:53
+
+from django.db import migrations, models
+
+SEARCH_INDEXES = {
+    "listing_shortletlisting": "shortlet_search_gin_idx",
+    "listing_carlisting": "car_search_gin_idx",
+}
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "postgresql":
+        # Same expression listing.search.PostgresSearchBackend queries with.
+        for table, index in SEARCH_INDEXES.items():
+            schema_editor.execute(
+                f"CREATE INDEX IF NOT EXISTS {index} ON {table} USING GIN "
+                f"(to_tsvector('english'::regconfig, COALESCE((search_document)::text, '')))"
+            )
+    elif connection.vendor == "sqlite":
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS listing_search_fts USING fts5("
+            "document, listing_id UNINDEXED, model UNINDEXED, tokenize='porter unicode61')"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "postgresql":
+        for index in SEARCH_INDEXES.values():
+            schema_editor.execute(f"DROP INDEX IF EXISTS {index}")
+    elif connection.vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS listing_search_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("listing", "0002_carlisting_car_updated_id_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="carlisting",
+            name="search_document",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.AddField(
+            model_name="shortletlisting",
+            name="search_document",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
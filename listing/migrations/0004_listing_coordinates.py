@@ -0,0 +1,47 @@
+# Generated by Django 5.0.6 on 2026-10-18 10:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("listing", "0003_listing_search_document"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="carlisting",
+            name="geohash",
+            field=models.CharField(
+                blank=True, db_index=True, default="", editable=False, max_length=12
+            ),
+        ),
+        migrations.AddField(
+            model_name="carlisting",
+            name="latitude",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="carlisting",
+            name="longitude",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="shortletlisting",
+            name="geohash",
+            field=models.CharField(
+                blank=True, db_index=True, default="", editable=False, max_length=12
+            ),
+        ),
+        migrations.AddField(
+            model_name="shortletlisting",
+            name="latitude",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="shortletlisting",
+            name="longitude",
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("listing", "0005_listing_rating_aggregates"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["content_type", "object_id", "created_on", "id"],
+                name="review_listing_created_idx",
+            ),
+        ),
+    ]
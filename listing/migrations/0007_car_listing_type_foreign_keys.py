@@ -0,0 +1,34 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("listing", "0006_review_listing_created_idx"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="carlisting",
+            name="car_model",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                to="listing.carmodel",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="carlisting",
+            name="type_of_car",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                to="listing.cartype",
+            ),
+        ),
+    ]
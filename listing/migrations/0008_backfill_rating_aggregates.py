@@ -0,0 +1,28 @@
+from django.db import migrations
+from listing.ratings import rebuild_ratings
+
+
+def backfill_rating_aggregates(apps, schema_editor):
+    # 0005 added the aggregate columns at zero; existing reviews were
+    # never counted into them.
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    Review = apps.get_model("listing", "Review")
+    for model_name in ("shortletlisting", "carlisting"):
+        content_type = ContentType.objects.filter(app_label="listing", model=model_name).first()
+        if content_type is None:
+            # A fresh database: no listing has been reviewed yet.
+            continue
+        rebuild_ratings(apps.get_model("listing", model_name),
+                        reviews=Review.objects.filter(content_type=content_type))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("listing", "0007_car_listing_type_foreign_keys"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rating_aggregates, migrations.RunPython.noop),
+    ]
@@ -6,6 +6,7 @@ from django.core.validators import MinValueValidator, MaxValueValidator
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericForeignKey
 from listing.choices import STATUS_TYPE
+from listing.managers import ListingManager, ReviewManager
 
 
 class Specifications(models.Model):
@@ -93,6 +94,11 @@ class ShortletListing(models.Model):
     landmark_1 = models.TextField()
     landmark_2 = models.TextField()
     landmark_3 = models.TextField()
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    # Derived from latitude/longitude by listing.geo for "near me" search.
+    geohash = models.CharField(
+        max_length=12, default='', blank=True, editable=False, db_index=True)
     # Listing Details
     product_name = models.CharField(max_length=250)
     product_description = models.TextField(null=True, blank=True)
@@ -119,14 +125,31 @@ class ShortletListing(models.Model):
         max_length=50, choices=STATUS_TYPE, default='PENDING')
     is_approved = models.BooleanField(default=False)
     is_booked = models.BooleanField(default=False)
+    # Review aggregates maintained by listing.ratings.
+    rating_avg = models.FloatField(default=0, editable=False, db_index=True)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_total = models.PositiveIntegerField(default=0, editable=False)
+    rating_1 = models.PositiveIntegerField(default=0, editable=False)
+    rating_2 = models.PositiveIntegerField(default=0, editable=False)
+    rating_3 = models.PositiveIntegerField(default=0, editable=False)
+    rating_4 = models.PositiveIntegerField(default=0, editable=False)
+    rating_5 = models.PositiveIntegerField(default=0, editable=False)
+    # Flattened text kept in sync by listing.search for full-text search.
+    search_document = models.TextField(default='', blank=True, editable=False)
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
 
+    objects = ListingManager()
+
     def __str__(self):
         return self.product_name
 
     class Meta:
         ordering = ['-updated_on']
+        indexes = [
+            models.Index(fields=['updated_on', 'id'],
+                         name='shortlet_updated_id_idx'),
+        ]
 
 
 class CarListing(models.Model):
@@ -140,6 +163,11 @@ class CarListing(models.Model):
     landmark_1 = models.TextField()
     landmark_2 = models.TextField()
     landmark_3 = models.TextField()
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    # Derived from latitude/longitude by listing.geo for "near me" search.
+    geohash = models.CharField(
+        max_length=12, default='', blank=True, editable=False, db_index=True)
     # Listing Details
     product_name = models.CharField(max_length=250)
     product_description = models.TextField(null=True, blank=True)
@@ -153,9 +181,9 @@ class CarListing(models.Model):
     specification = models.ManyToManyField(Specifications)
     amenities = models.ManyToManyField(Amenities)
 
-    type_of_car = models.OneToOneField(
+    type_of_car = models.ForeignKey(
         CarType, on_delete=models.SET_NULL, null=True, blank=True)
-    car_model = models.OneToOneField(
+    car_model = models.ForeignKey(
         CarModel, on_delete=models.SET_NULL, null=True, blank=True)
     is_driver = models.BooleanField(default=False)
 
@@ -171,14 +199,31 @@ class CarListing(models.Model):
         max_length=50, choices=STATUS_TYPE, default='PENDING')
     is_approved = models.BooleanField(default=False)
     is_booked = models.BooleanField(default=False)
+    # Review aggregates maintained by listing.ratings.
+    rating_avg = models.FloatField(default=0, editable=False, db_index=True)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_total = models.PositiveIntegerField(default=0, editable=False)
+    rating_1 = models.PositiveIntegerField(default=0, editable=False)
+    rating_2 = models.PositiveIntegerField(default=0, editable=False)
+    rating_3 = models.PositiveIntegerField(default=0, editable=False)
+    rating_4 = models.PositiveIntegerField(default=0, editable=False)
+    rating_5 = models.PositiveIntegerField(default=0, editable=False)
+    # Flattened text kept in sync by listing.search for full-text search.
+    search_document = models.TextField(default='', blank=True, editable=False)
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
 
+    objects = ListingManager()
+
     def __str__(self):
         return self.product_name
 
     class Meta:
         ordering = ['-updated_on']
+        indexes = [
+            models.Index(fields=['updated_on', 'id'],
+                         name='car_updated_id_idx'),
+        ]
 
 
 class Review(models.Model):
@@ -193,5 +238,13 @@ class Review(models.Model):
     review = models.TextField(db_index=True)
     created_on = models.DateTimeField(auto_now_add=True)
 
+    objects = ReviewManager()
+
     class Meta:
         ordering = ['-created_on']
+        indexes = [
+            models.Index(fields=['user', 'created_on', 'id'],
+                         name='review_user_created_id_idx'),
+            models.Index(fields=['content_type', 'object_id', 'created_on', 'id'],
+                         name='review_listing_created_idx'),
+        ]
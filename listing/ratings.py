@@ -0,0 +1,68 @@
+from django.db.models import Case, Count, F, FloatField, Q, Sum, Value, When
+from django.db.models.functions import Cast
+
+RATING_VALUES = range(1, 6)
+
+
+def apply_review_rating(review, delta):
+    """
+    Adds (delta=1) or removes (delta=-1) one review's rating from its
+    listing's aggregates in a single UPDATE. Every right-hand side reads the
+    row's current values, so concurrent reviews cannot lose updates.
+
+    updated_on is left alone, so a review does not move the listing in the
+    (updated_on, id) keyset order; the Review signals retire the listing's
+    cached responses instead.
+    """
+    model = review.content_type.model_class()
+    new_count = F('rating_count') + delta
+    new_total = F('rating_total') + delta * review.rating
+    model.objects.filter(pk=review.object_id).update(
+        rating_count=new_count,
+        rating_total=new_total,
+        rating_avg=Case(
+            When(rating_count=-delta, then=Value(0.0)),
+            default=Cast(new_total, FloatField()) / new_count,
+            output_field=FloatField(),
+        ),
+        **{f'rating_{review.rating}': F(f'rating_{review.rating}') + delta},
+    )
+
+
+def rebuild_ratings(model, chunk_size=500, reviews=None):
+    """
+    Recomputes the aggregates of every listing of model from its reviews,
+    by default those in the Review table; migrations pass a queryset of
+    their historical Review model. Returns the number of listings that have
+    reviews.
+    """
+    if reviews is None:
+        from django.contrib.contenttypes.models import ContentType
+        from listing.models import Review
+        reviews = Review.objects.filter(content_type=ContentType.objects.get_for_model(model))
+
+    aggregates = reviews.order_by().values(
+        'object_id'
+    ).annotate(
+        count=Count('id'),
+        total=Sum('rating'),
+        **{f'rating_{value}': Count('id', filter=Q(rating=value)) for value in RATING_VALUES},
+    )
+
+    zeroes = {f'rating_{value}': 0 for value in RATING_VALUES}
+    model.objects.update(rating_avg=0, rating_count=0, rating_total=0, **zeroes)
+
+    fields = ['rating_avg', 'rating_count', 'rating_total'] + list(zeroes)
+    batch = []
+    updated = 0
+    for row in aggregates.iterator(chunk_size=chunk_size):
+        listing = model(pk=row['object_id'], rating_count=row['count'],
+                        rating_total=row['total'], rating_avg=row['total'] / row['count'],
+                        **{key: row[key] for key in zeroes})
+        batch.append(listing)
+        if len(batch) >= chunk_size:
+            updated += model.objects.bulk_update(batch, fields)
+            batch = []
+    if batch:
+        updated += model.objects.bulk_update(batch, fields)
+    return updated
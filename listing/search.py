@@ -0,0 +1,179 @@
+import re
+from django.db import connections
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+
+# Name of the SQLite FTS5 table mirroring listing search documents.
+SQLITE_FTS_TABLE = 'listing_search_fts'
+
+SEARCH_CONFIG = 'english'
+
+
+def build_search_document(listing, amenities=None, specifications=None):
+    """
+    Flattens the searchable text of a listing, including its amenity and
+    specification tags, into one string. Callers that already hold the tags
+    can pass them in to skip the lookups.
+    """
+    if amenities is None:
+        amenities = listing.amenities.all()
+    if specifications is None:
+        specifications = listing.specification.all()
+    parts = [
+        listing.product_name, listing.product_description, listing.address,
+        listing.landmark_1, listing.landmark_2, listing.landmark_3,
+    ]
+    parts += [amenity.tag for amenity in amenities]
+    parts += [spec.tag for spec in specifications]
+    for field_name in ('type_of_car', 'car_model'):
+        related = getattr(listing, field_name, None)
+        if related is not None:
+            parts.append(related.title)
+    return ' '.join(part for part in parts if part)
+
+
+def tokenize(query):
+    return re.findall(r'\w+', query.lower())
+
+
+def unranked(queryset):
+    return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+class FallbackSearchBackend:
+    """
+    Substring match on the stored document for databases without a
+    full-text engine. Results are not ranked.
+    """
+
+    def index(self, listing, document):
+        pass
+
+    def add(self, listings):
+        pass
+
+    def remove(self, model, pk):
+        pass
+
+    def search(self, queryset, query):
+        filters = Q()
+        for token in tokenize(query):
+            filters &= Q(search_document__icontains=token)
+        return unranked(queryset.filter(filters))
+
+
+class PostgresSearchBackend(FallbackSearchBackend):
+    """
+    Matches against to_tsvector(search_document), which is covered by the
+    GIN expression index created in the listing migrations.
+    """
+
+    def search(self, queryset, query):
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+        vector = SearchVector('search_document', config=SEARCH_CONFIG)
+        search_query = SearchQuery(
+            query, config=SEARCH_CONFIG, search_type='websearch')
+        # Cast the real-valued rank to double so it survives the round trip
+        # through a pagination cursor unchanged.
+        return queryset.alias(search_vector=vector).filter(
+            search_vector=search_query
+        ).annotate(
+            search_rank=Cast(SearchRank(vector, search_query), FloatField()))
+
+
+class SQLiteSearchBackend(FallbackSearchBackend):
+    """
+    Keeps an FTS5 table in sync with the listings and ranks matches with
+    bm25 for local development.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def index(self, listing, document):
+        label = listing._meta.label_lower
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {SQLITE_FTS_TABLE} WHERE listing_id = %s AND model = %s',
+                [listing.pk.hex, label])
+            cursor.execute(
+                f'INSERT INTO {SQLITE_FTS_TABLE} (document, listing_id, model) VALUES (%s, %s, %s)',
+                [document, listing.pk.hex, label])
+
+    def add(self, listings):
+        """
+        Indexes listings that are not in the table yet, such as freshly
+        bulk-created ones, without the per-row delete index() does.
+        """
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {SQLITE_FTS_TABLE} (document, listing_id, model) VALUES (%s, %s, %s)',
+                [(listing.search_document, listing.pk.hex, listing._meta.label_lower)
+                 for listing in listings])
+
+    def remove(self, model, pk):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {SQLITE_FTS_TABLE} WHERE listing_id = %s AND model = %s',
+                [pk.hex, model._meta.label_lower])
+
+    def search(self, queryset, query):
+        tokens = tokenize(query)
+        if not tokens:
+            return unranked(queryset.none())
+        match = ' '.join(f'"{token}"' for token in tokens)
+        qn = self.connection.ops.quote_name
+        fts = qn(SQLITE_FTS_TABLE)
+        listing_id = f'{qn(queryset.model._meta.db_table)}.{qn(queryset.model._meta.pk.column)}'
+        # Joined to the listings on their id, which SQLite stores as the same
+        # hex the index holds, so the caller's filters, the ordering and the
+        # pagination all run in the one query that walks the MATCH. bm25 is
+        # lower-is-better; negate it so higher ranks sort first.
+        return queryset.extra(
+            tables=[SQLITE_FTS_TABLE],
+            where=[f'{fts}.listing_id = {listing_id}', f'{fts} MATCH %s', f'{fts}.model = %s'],
+            params=[match, queryset.model._meta.label_lower],
+        ).annotate(search_rank=RawSQL(f'-bm25({fts})', [], output_field=FloatField()))
+
+
+def get_search_backend(using='default'):
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend()
+    if connection.vendor == 'sqlite':
+        return SQLiteSearchBackend(connection)
+    return FallbackSearchBackend()
+
+
+def update_search_index(listing):
+    """
+    Rebuilds the stored search document of one listing and pushes it to the
+    backend index. Uses update() so updated_on and post_save are untouched.
+    """
+    document = build_search_document(listing)
+    type(listing).objects.filter(pk=listing.pk).update(
+        search_document=document)
+    get_search_backend(listing._state.db or 'default').index(listing, document)
+
+
+def add_to_search_index(listings, using='default'):
+    """
+    Pushes the stored search_document of new listings to the backend index.
+    """
+    if listings:
+        get_search_backend(using).add(listings)
+
+
+def remove_from_search_index(listing):
+    get_search_backend(listing._state.db or 'default').remove(
+        type(listing), listing.pk)
+
+
+def search_listings(queryset, query):
+    """
+    Restricts a listing queryset to full-text matches for query and
+    annotates each row with search_rank (higher is better).
+    """
+    return get_search_backend(queryset.db).search(queryset, query)
@@ -1,12 +1,37 @@
 # serializers.py
 
+from django.db import transaction
 from rest_framework import serializers
 from .models import Amenities, CarListing, CarModel, CarType, DiscountOption, Review, ShortletListing, Specifications
 from authentication.serializers import UserBusinessSerializer, UserSerializer
+from utils.taxonomy_cache import TaxonomyField, TaxonomyListField
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericForeignKey
 
 
+class DynamicFieldsMixin:
+    """
+    Lets callers trim a serializer with fields=[...] and, on serializers that
+    declare expandable_fields, opt into nested objects with expand=[...].
+    """
+    expandable_fields = {}
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        expand = kwargs.pop('expand', None)
+        super().__init__(*args, **kwargs)
+
+        for field_name in expand or ():
+            if field_name in self.expandable_fields:
+                serializer_class, options = self.expandable_fields[field_name]
+                self.fields[field_name] = serializer_class(
+                    read_only=True, **options)
+
+        if fields:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+
 class AmenitiesSerializer(serializers.ModelSerializer):
     class Meta:
         model = Amenities
@@ -42,32 +67,113 @@ class DiscountOptionSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_on', 'updated_on']
 
 
-class ShortletListingSerializer(serializers.ModelSerializer):
+class ShortletListingSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    distance_km = serializers.FloatField(read_only=True)
     user = UserSerializer(read_only=True)
     business = UserBusinessSerializer(read_only=True)
-    specification = SpecificationsSerializer(many=True, read_only=True)
-    amenities = AmenitiesSerializer(many=True, read_only=True)
-    discount_option = DiscountOptionSerializer(read_only=True)
+    specification = TaxonomyListField(Specifications)
+    amenities = TaxonomyListField(Amenities)
+    discount_option = TaxonomyField(DiscountOption, source='discount_option_id')
 
     class Meta:
         model = ShortletListing
-        fields = '__all__'
+        exclude = ['search_document']
         read_only_fields = ['user', 'business', 'created_on', 'updated_on']
 
 
-class CarListingSerializer(serializers.ModelSerializer):
+class CarListingSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    distance_km = serializers.FloatField(read_only=True)
     user = UserSerializer(read_only=True)
     business = UserBusinessSerializer(read_only=True)
-    specification = SpecificationsSerializer(many=True, read_only=True)
-    amenities = AmenitiesSerializer(many=True, read_only=True)
-    discount_option = DiscountOptionSerializer(read_only=True)
+    specification = TaxonomyListField(Specifications)
+    amenities = TaxonomyListField(Amenities)
+    discount_option = TaxonomyField(DiscountOption, source='discount_option_id')
 
     class Meta:
         model = CarListing
-        fields = '__all__'
+        exclude = ['search_document']
         read_only_fields = ['user', 'business', 'created_on', 'updated_on']
 
 
+class ShortletListingImportSerializer(serializers.ModelSerializer):
+    """
+    Validates one row of a bulk shortlet import. Tags are given by name and
+    resolved in bulk by listing.imports.
+    """
+    amenities = serializers.ListField(
+        child=serializers.CharField(max_length=250), required=False)
+    specification = serializers.ListField(
+        child=serializers.CharField(max_length=250), required=False)
+    discount_option = serializers.CharField(max_length=250)
+
+    class Meta:
+        model = ShortletListing
+        exclude = ['user', 'business', 'search_document']
+        read_only_fields = ['status', 'is_approved',
+                            'is_booked', 'created_on', 'updated_on']
+
+
+class CarListingImportSerializer(serializers.ModelSerializer):
+    """
+    Validates one row of a bulk car import. Tags, car types and car models
+    are given by name and resolved in bulk by listing.imports.
+    """
+    amenities = serializers.ListField(
+        child=serializers.CharField(max_length=250), required=False)
+    specification = serializers.ListField(
+        child=serializers.CharField(max_length=250), required=False)
+    discount_option = serializers.CharField(max_length=250)
+    type_of_car = serializers.CharField(
+        max_length=250, required=False, allow_null=True, allow_blank=True)
+    car_model = serializers.CharField(
+        max_length=250, required=False, allow_null=True, allow_blank=True)
+
+    class Meta:
+        model = CarListing
+        exclude = ['user', 'business', 'search_document']
+        read_only_fields = ['status', 'is_approved',
+                            'is_booked', 'created_on', 'updated_on']
+
+
+LISTING_EXPANDABLE_FIELDS = {
+    'user': (UserSerializer, {}),
+    'business': (UserBusinessSerializer, {}),
+    'specification': (TaxonomyListField, {'model': Specifications}),
+    'amenities': (TaxonomyListField, {'model': Amenities}),
+    'discount_option': (TaxonomyField, {'model': DiscountOption, 'source': 'discount_option_id'}),
+}
+
+
+class ShortletListingCardSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    business_name = serializers.CharField(
+        source='business.business_name', read_only=True)
+    distance_km = serializers.FloatField(read_only=True)
+    expandable_fields = LISTING_EXPANDABLE_FIELDS
+
+    class Meta:
+        model = ShortletListing
+        fields = ['id', 'product_name', 'address', 'type_of_apartment', 'max_guests',
+                  'price_per_day', 'discount_price', 'thumbnail_1', 'business_name',
+                  'latitude', 'longitude', 'distance_km', 'rating_avg', 'rating_count',
+                  'status', 'is_booked', 'updated_on']
+        read_only_fields = fields
+
+
+class CarListingCardSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    business_name = serializers.CharField(
+        source='business.business_name', read_only=True)
+    distance_km = serializers.FloatField(read_only=True)
+    expandable_fields = LISTING_EXPANDABLE_FIELDS
+
+    class Meta:
+        model = CarListing
+        fields = ['id', 'product_name', 'address', 'type_of_car', 'car_model', 'is_driver',
+                  'price_per_day', 'discount_price', 'thumbnail_1', 'business_name',
+                  'latitude', 'longitude', 'distance_km', 'rating_avg', 'rating_count',
+                  'status', 'is_booked', 'updated_on']
+        read_only_fields = fields
+
+
 class ReviewSerializer(serializers.ModelSerializer):
     content_type = serializers.SlugRelatedField(
         slug_field='model',
@@ -103,11 +209,14 @@ class ReviewSerializer(serializers.ModelSerializer):
 
         listing = model_class.objects.get(id=object_id)
 
-        review = Review.objects.create(
-            user=validated_data['user'],
-            content_type=content_type,
-            object_id=object_id,
-            rating=validated_data['rating'],
-            review=validated_data['review']
-        )
+        # The rating aggregates are updated by a post_save signal; keep them
+        # in the same transaction as the review itself.
+        with transaction.atomic():
+            review = Review.objects.create(
+                user=validated_data['user'],
+                content_type=content_type,
+                object_id=object_id,
+                rating=validated_data['rating'],
+                review=validated_data['review']
+            )
         return review
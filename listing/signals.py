@@ -0,0 +1,137 @@
+from django.dispatch import receiver
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from authentication.models import UserBusiness
+from listing.cache import bump_listing_versions, forget_listing
+from listing.models import Amenities, CarListing, CarModel, CarType, DiscountOption, Review, ShortletListing, Specifications
+from listing.ratings import apply_review_rating
+from listing.geo import listing_geohash
+from listing.search import remove_from_search_index, update_search_index
+from listing.taxonomy import invalidate_taxonomy_cache
+
+LISTING_MODELS = (ShortletListing, CarListing)
+
+
+# GEOSPATIAL INDEX
+@receiver(pre_save, sender=ShortletListing)
+@receiver(pre_save, sender=CarListing)
+def set_listing_geohash(sender, instance, **kwargs):
+    instance.geohash = listing_geohash(instance.latitude, instance.longitude)
+
+
+# FULL-TEXT SEARCH INDEX
+@receiver(post_save, sender=ShortletListing)
+@receiver(post_save, sender=CarListing)
+def index_listing(sender, instance, raw=False, **kwargs):
+    if not raw:
+        update_search_index(instance)
+
+
+@receiver(post_delete, sender=ShortletListing)
+@receiver(post_delete, sender=CarListing)
+def unindex_listing(sender, instance, **kwargs):
+    remove_from_search_index(instance)
+
+
+@receiver(m2m_changed, sender=ShortletListing.amenities.through)
+@receiver(m2m_changed, sender=ShortletListing.specification.through)
+@receiver(m2m_changed, sender=CarListing.amenities.through)
+@receiver(m2m_changed, sender=CarListing.specification.through)
+def reindex_listing_tags(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        update_search_index(instance)
+    elif pk_set:
+        for listing in model.objects.filter(pk__in=pk_set):
+            update_search_index(listing)
+
+
+@receiver(post_save, sender=Amenities)
+@receiver(post_save, sender=Specifications)
+def reindex_tagged_listings(sender, instance, created, raw=False, **kwargs):
+    if created or raw:
+        return
+    field_name = 'amenities' if sender is Amenities else 'specification'
+    for listing_model in LISTING_MODELS:
+        for listing in listing_model.objects.filter(**{field_name: instance}):
+            update_search_index(listing)
+
+
+# RATING AGGREGATES
+@receiver(pre_save, sender=Review)
+def remember_review_rating(sender, instance, raw=False, **kwargs):
+    # The review as stored, so an edit can take its old rating back out.
+    instance._stored_review = None
+    if not raw and not instance._state.adding:
+        instance._stored_review = sender.objects.filter(pk=instance.pk).only(
+            'content_type', 'object_id', 'rating').first()
+
+
+@receiver(post_save, sender=Review)
+def add_review_rating(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    stored = getattr(instance, '_stored_review', None)
+    if created:
+        apply_review_rating(instance, 1)
+    elif stored is not None and ((stored.content_type_id, stored.object_id, stored.rating)
+          != (instance.content_type_id, instance.object_id, instance.rating)):
+        apply_review_rating(stored, -1)
+        apply_review_rating(instance, 1)
+
+
+@receiver(post_delete, sender=Review)
+def remove_review_rating(sender, instance, **kwargs):
+    apply_review_rating(instance, -1)
+
+
+# TAXONOMY CACHE
+@receiver([post_save, post_delete], sender=Amenities)
+@receiver([post_save, post_delete], sender=Specifications)
+@receiver([post_save, post_delete], sender=CarType)
+@receiver([post_save, post_delete], sender=CarModel)
+@receiver([post_save, post_delete], sender=DiscountOption)
+def invalidate_taxonomy(sender, **kwargs):
+    invalidate_taxonomy_cache(sender)
+
+
+# RESPONSE CACHE
+@receiver(post_save, sender=ShortletListing)
+@receiver(post_save, sender=CarListing)
+def retire_cached_listing(sender, instance, **kwargs):
+    bump_listing_versions(sender, [instance.pk])
+
+
+@receiver(post_delete, sender=ShortletListing)
+@receiver(post_delete, sender=CarListing)
+def forget_cached_listing(sender, instance, **kwargs):
+    forget_listing(sender, instance.pk)
+
+
+@receiver(m2m_changed, sender=ShortletListing.amenities.through)
+@receiver(m2m_changed, sender=ShortletListing.specification.through)
+@receiver(m2m_changed, sender=CarListing.amenities.through)
+@receiver(m2m_changed, sender=CarListing.specification.through)
+def retire_cached_listing_tags(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        bump_listing_versions(type(instance), [instance.pk])
+    elif pk_set:
+        bump_listing_versions(model, pk_set)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def retire_cached_reviewed_listing(sender, instance, raw=False, **kwargs):
+    listing_model = instance.content_type.model_class()
+    if not raw and listing_model in LISTING_MODELS:
+        bump_listing_versions(listing_model, [instance.object_id])
+
+
+@receiver(post_save, sender=UserBusiness)
+@receiver(post_delete, sender=UserBusiness)
+def retire_cached_business_listings(sender, instance, **kwargs):
+    for listing_model in LISTING_MODELS:
+        bump_listing_versions(listing_model, listing_model.objects.filter(
+            business_id=instance.pk).values_list('pk', flat=True))
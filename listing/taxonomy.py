@@ -0,0 +1,14 @@
+from listing.models import Amenities, CarModel, CarType, DiscountOption, Specifications
+from listing.serializers import AmenitiesSerializer, CarModelSerializer, CarTypeSerializer, DiscountOptionSerializer, SpecificationsSerializer
+from utils.taxonomy_cache import TaxonomyCache
+
+amenities = TaxonomyCache(Amenities, AmenitiesSerializer, 'tag')
+specifications = TaxonomyCache(Specifications, SpecificationsSerializer, 'tag')
+car_types = TaxonomyCache(CarType, CarTypeSerializer, 'title')
+car_models = TaxonomyCache(CarModel, CarModelSerializer, 'title')
+discount_options = TaxonomyCache(
+    DiscountOption, DiscountOptionSerializer, 'title')
+
+
+def invalidate_taxonomy_cache(model):
+    TaxonomyCache.for_model(model).invalidate()
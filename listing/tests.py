@@ -1,3 +1,537 @@
-from django.test import TestCase
+import importlib
+import math
+import uuid
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from django.apps import apps
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from authentication.models import CustomUser, UserBusiness
+from listing import geo
+from listing.exports import export_columns, stream_export
+from listing.imports import import_stream, read_rows
+from listing.ratings import rebuild_ratings
+from listing.search import FallbackSearchBackend, add_to_search_index, search_listings
+from listing.serializers import ShortletListingSerializer
+from listing.views import serialize_listings_with_reviews
+from utils import taxonomy_cache
+from utils.renderers import FastJSONRenderer
+from utils.taxonomy_cache import TaxonomyCache
+from listing.models import Amenities, CarListing, DiscountOption, Review, ShortletListing, Specifications
 
-# Create your tests here.
+
+class ListingTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email='host@example.com', password='x' * 12)
+        cls.business = UserBusiness.objects.create(
+            user=cls.user, business_name='Host', business_country='NG',
+            business_state='Lagos', business_postal_code='100001')
+        cls.discount_option = DiscountOption.objects.create(title='Weekly')
+        cls.amenities = [Amenities.objects.create(tag=f'amenity {i}') for i in range(3)]
+        cls.specifications = [Specifications.objects.create(tag=f'specification {i}') for i in range(3)]
+
+    @classmethod
+    def create_shortlet(cls, i, reviews=0, tags=1, **fields):
+        listing = ShortletListing.objects.create(
+            user=cls.user, business=cls.business, address=f'{i} Admiralty Way', landmark_1='a',
+            landmark_2='b', landmark_3='c', product_name=f'Flat {i}', type_of_apartment='studio',
+            utility_service_staffs='1', max_guests=2, price_per_day=100 + i, discount='0',
+            discount_option=cls.discount_option, **fields)
+        listing.amenities.add(*cls.amenities[:tags])
+        listing.specification.add(*cls.specifications[:tags])
+        cls.create_reviews(listing, reviews)
+        return listing
+
+    @classmethod
+    def create_car(cls, i, reviews=0, tags=1):
+        listing = CarListing.objects.create(
+            user=cls.user, business=cls.business, address=f'{i} Allen Avenue', landmark_1='a',
+            landmark_2='b', landmark_3='c', product_name=f'Car {i}', discount='0',
+            discount_option=cls.discount_option)
+        listing.amenities.add(*cls.amenities[:tags])
+        cls.create_reviews(listing, reviews)
+        return listing
+
+    @classmethod
+    def create_reviews(cls, listing, count):
+        for i in range(count):
+            Review.objects.create(user=cls.user, listing=listing, rating=i % 5 + 1, review='Good stay')
+
+
+class ListingQueryCountTests(ListingTestCase):
+    """
+    The list and detail endpoints load a page with a fixed number of
+    queries, however many listings, reviews or tags it holds.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.shortlets = [cls.create_shortlet(i, reviews=i % 3) for i in range(12)]
+        cls.cars = [cls.create_car(i, reviews=i % 3) for i in range(12)]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def warm(self, url, params):
+        # Load the process-wide taxonomy cache, then drop the cached
+        # response so what is counted is the database work of a fresh page.
+        self.client.get(url, params)
+        cache.clear()
+
+    # The ETag aggregate, the page with its users and businesses joined, the
+    # businesses' categories, specifications, amenities and latest reviews.
+    LIST_QUERIES = 6
+    # The version seeded from updated_on, the listing with its user and
+    # business joined, the business' categories, specifications, amenities.
+    DETAIL_QUERIES = 5
+
+    def assertQueries(self, expected, *requests):
+        """
+        Requests each (url, params) pair of requests and asserts that each
+        runs exactly expected queries.
+        """
+        responses = []
+        for url, params in requests:
+            self.warm(url, params)
+            with self.assertNumQueries(expected):
+                response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+            responses.append(response)
+        return responses
+
+    def assertPageSizeQueries(self, url, results_key, small=2, large=10):
+        small_response, large_response = self.assertQueries(
+            self.LIST_QUERIES, (url, {'page_size': small}), (url, {'page_size': large}))
+        self.assertEqual(len(small_response.json()['data'][results_key]), small)
+        self.assertEqual(len(large_response.json()['data'][results_key]), large)
+
+    def test_shortlet_list_queries_do_not_grow_with_page_size(self):
+        self.assertPageSizeQueries(reverse('listing:all-shortlet-listings'), 'shortlets')
+
+    def test_car_rental_list_queries_do_not_grow_with_page_size(self):
+        self.assertPageSizeQueries(reverse('listing:all-car-rentals'), 'car_rentals')
+
+    def test_shortlet_detail_queries_do_not_grow_with_reviews_and_tags(self):
+        sparse = self.create_shortlet(100)
+        busy = self.create_shortlet(101, reviews=10, tags=3)
+        self.assertQueries(
+            self.DETAIL_QUERIES,
+            (reverse('listing:shortlet-listing-detail', args=[sparse.pk]), {}),
+            (reverse('listing:shortlet-listing-detail', args=[busy.pk]), {}))
+
+    def test_car_detail_queries_do_not_grow_with_reviews_and_tags(self):
+        sparse = self.create_car(100)
+        busy = self.create_car(101, reviews=10, tags=3)
+        self.assertQueries(
+            self.DETAIL_QUERIES,
+            (reverse('listing:car-listing-detail', args=[sparse.pk]), {}),
+            (reverse('listing:car-listing-detail', args=[busy.pk]), {}))
+
+
+class ListingConditionalGetTests(ListingTestCase):
+    """
+    Collection ETags answer 304 and 412 until anything a page renders
+    changes, including what leaves the listings' updated_on alone.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.listing = cls.create_shortlet(1)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('listing:all-shortlet-listings')
+
+    def etag(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        return response['ETag']
+
+    def assertChanges(self, change):
+        etag = self.etag()
+        change()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_unchanged_collection_is_not_modified(self):
+        etag = self.etag()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(self.client.get(self.url, {'page_size': 5}, HTTP_IF_NONE_MATCH=etag).status_code,
+                         status.HTTP_200_OK)
+
+    def test_stale_if_match_fails(self):
+        etag = self.etag()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MATCH=etag).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MATCH='"stale"').status_code,
+                         status.HTTP_412_PRECONDITION_FAILED)
+
+    def test_tag_changes_are_seen(self):
+        self.assertChanges(lambda: self.listing.amenities.add(self.amenities[1]))
+        self.assertChanges(lambda: self.listing.specification.clear())
+
+    def test_review_changes_are_seen(self):
+        self.assertChanges(lambda: self.create_reviews(self.listing, 1))
+        self.assertChanges(lambda: Review.objects.get().delete())
+
+    def test_owner_changes_are_seen(self):
+        def rename():
+            self.user.first_name = 'Renamed'
+            self.user.save()
+        self.assertChanges(rename)
+
+
+class ReviewRatingTests(ListingTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.listing = cls.create_shortlet(1)
+        cls.other = cls.create_shortlet(2)
+
+    def review(self, rating, listing=None):
+        return Review.objects.create(user=self.user, listing=listing or self.listing, rating=rating, review='Fine')
+
+    def assertRatings(self, count, avg, histogram, listing=None):
+        listing = ShortletListing.objects.get(pk=(listing or self.listing).pk)
+        self.assertEqual(
+            (listing.rating_count, listing.rating_avg, [getattr(listing, f'rating_{value}') for value in range(1, 6)]),
+            (count, avg, histogram))
+
+    def test_reviews_are_counted(self):
+        self.review(5)
+        self.review(2)
+        self.assertRatings(2, 3.5, [0, 1, 0, 0, 1])
+        self.assertEqual(ShortletListing.objects.get(pk=self.listing.pk).rating_total, 7)
+
+    def test_edited_rating_moves_between_buckets(self):
+        review = self.review(5)
+        review.rating = 1
+        review.save()
+        self.assertRatings(1, 1.0, [1, 0, 0, 0, 0])
+        review.review = 'Still fine'
+        review.save()
+        self.assertRatings(1, 1.0, [1, 0, 0, 0, 0])
+
+    def test_review_moved_to_another_listing(self):
+        review = self.review(4)
+        review.object_id = self.other.pk
+        review.save()
+        self.assertRatings(0, 0.0, [0, 0, 0, 0, 0])
+        self.assertRatings(1, 4.0, [0, 0, 0, 1, 0], listing=self.other)
+
+    def test_deleted_reviews_are_taken_out(self):
+        first = self.review(4)
+        second = self.review(2)
+        first.delete()
+        self.assertRatings(1, 2.0, [0, 1, 0, 0, 0])
+        second.delete()
+        self.assertRatings(0, 0.0, [0, 0, 0, 0, 0])
+
+    def test_reviews_leave_updated_on_alone(self):
+        updated_on = ShortletListing.objects.get(pk=self.listing.pk).updated_on
+        self.review(3).delete()
+        self.assertEqual(ShortletListing.objects.get(pk=self.listing.pk).updated_on, updated_on)
+
+    def test_reviews_retire_cached_responses(self):
+        url = reverse('listing:shortlet-listing-detail', args=[self.listing.pk])
+        client = APIClient()
+        client.force_authenticate(self.user)
+        self.assertEqual(client.get(url).json()['data']['rating_count'], 0)
+        self.review(5)
+        self.assertEqual(client.get(url).json()['data']['rating_count'], 1)
+
+    def corrupt(self):
+        ShortletListing.objects.update(rating_count=9, rating_total=9, rating_avg=1, rating_1=9)
+
+    def test_rebuild_recounts_every_listing(self):
+        self.review(5)
+        self.review(3)
+        self.corrupt()
+        self.assertEqual(rebuild_ratings(ShortletListing, chunk_size=1), 1)
+        self.assertRatings(2, 4.0, [0, 0, 1, 0, 1])
+        self.assertRatings(0, 0.0, [0, 0, 0, 0, 0], listing=self.other)
+
+    def test_migration_backfills_existing_reviews(self):
+        self.review(4, listing=self.other)
+        self.corrupt()
+        migration = importlib.import_module('listing.migrations.0008_backfill_rating_aggregates')
+        migration.backfill_rating_aggregates(apps, None)
+        self.assertRatings(0, 0.0, [0, 0, 0, 0, 0])
+        self.assertRatings(1, 4.0, [0, 0, 0, 1, 0], listing=self.other)
+
+
+class RendererParityTests(ListingTestCase):
+
+    def assertSameRendering(self, data):
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_listing_page_renders_like_json_renderer(self):
+        listings = [self.create_shortlet(i, reviews=3, tags=2, latitude=6.4281, longitude=3.4219)
+                    for i in range(3)]
+        results = serialize_listings_with_reviews(listings, ShortletListingSerializer)
+        self.assertSameRendering({'message': 'Café \u2028 ✓', 'data': {'results': results}})
+
+    def test_python_values_render_like_json_renderer(self):
+        self.assertSameRendering({
+            'aware': timezone.now(),
+            'naive': datetime(2030, 1, 1, 12, 30, 15, 123456),
+            'offset': datetime(2030, 1, 1, tzinfo=timezone.get_fixed_timezone(60)),
+            'date': datetime(2030, 1, 1).date(),
+            'time': time(23, 59, 59, 999999),
+            'duration': timedelta(hours=1, microseconds=5),
+            'price': Decimal('10.50'),
+            'id': self.user.pk,
+            'ids': CustomUser.objects.values_list('pk', flat=True),
+            1: 'non-string key',
+        })
+
+    def test_non_finite_floats_render_as_null(self):
+        # The one documented difference: JSONRenderer raises instead.
+        self.assertEqual(FastJSONRenderer().render({'avg': math.nan}), b'{"avg":null}')
+        with self.assertRaises(ValueError):
+            JSONRenderer().render({'avg': math.nan})
+
+
+class ListingSearchTests(ListingTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.best = cls.described(1, 'Pool house with a pool view and a heated pool')
+        cls.good = cls.described(2, 'Garden flat near the pool')
+        cls.other = cls.described(3, 'Quiet garden flat')
+        cls.hidden = cls.described(4, 'Pool pool pool pool', is_approved=False)
+
+    @classmethod
+    def described(cls, i, description, is_approved=True):
+        return cls.create_shortlet(i, product_description=description, is_approved=is_approved)
+
+    def search(self, query, queryset=None, backend=None):
+        if queryset is None:
+            queryset = ShortletListing.objects.filter(is_approved=True)
+        if backend is not None:
+            return backend.search(queryset, query)
+        return search_listings(queryset, query)
+
+    def test_matches_are_ranked(self):
+        self.assertEqual(list(self.search('pool').order_by('-search_rank', '-id')), [self.best, self.good])
+
+    def test_every_token_must_match(self):
+        self.assertEqual(list(self.search('garden pool')), [self.good])
+        self.assertEqual(list(self.search('!!')), [])
+
+    def test_filters_apply_to_every_match(self):
+        # Far more better-ranked matches than any candidate cap, all of
+        # which the caller's filter rejects.
+        decoys = ShortletListing.objects.bulk_create([
+            ShortletListing(
+                user=self.user, business=self.business, address=f'{i} Decoy Road', landmark_1='',
+                landmark_2='', landmark_3='', product_name=f'Decoy {i}', type_of_apartment='studio',
+                utility_service_staffs='0', max_guests=2, price_per_day=100, discount='0',
+                discount_option=self.discount_option, search_document='pool ' * 10)
+            for i in range(1200)])
+        add_to_search_index(decoys)
+        self.assertCountEqual(self.search('pool'), [self.best, self.good])
+        self.assertEqual(self.search('pool', ShortletListing.objects.all()).count(), 1203)
+
+    def test_search_pages_follow_the_rank(self):
+        client = APIClient()
+        url = reverse('listing:shortlet-listing-search')
+        params = {'q': 'pool', 'page_size': 1}
+        found = []
+        while True:
+            data = client.get(url, params).json()['data']
+            found += [listing['id'] for listing in data['shortlets']]
+            if not data['next']:
+                break
+            params['cursor'] = data['next']
+        self.assertEqual(found, [str(self.best.pk), str(self.good.pk)])
+
+    def test_fallback_backend_matches_without_ranking(self):
+        listings = self.search('garden', backend=FallbackSearchBackend())
+        self.assertCountEqual(listings, [self.good, self.other])
+        self.assertEqual({listing.search_rank for listing in listings}, {0.0})
+        self.assertEqual(list(self.search('garden pool', backend=FallbackSearchBackend())), [self.good])
+        self.assertCountEqual(
+            self.search('pool', ShortletListing.objects.filter(is_approved=False), FallbackSearchBackend()),
+            [self.hidden])
+
+
+class TaxonomyCacheTests(ListingTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.taxonomy = TaxonomyCache.for_model(Amenities)
+        self.taxonomy.invalidate()
+
+    def cached_snapshot(self):
+        # A snapshot from the shared cache, as another process would see.
+        self.taxonomy.snapshot()
+        taxonomy_cache.local_snapshots.delete(self.taxonomy.key)
+        self.assertFalse(self.taxonomy.snapshot().fresh)
+
+    def add_unseen(self, count):
+        # bulk_create sends no signals, so the snapshots stay as they are.
+        return Amenities.objects.bulk_create([Amenities(tag=f'new {i}') for i in range(count)])
+
+    def test_unseen_rows_reload_the_table_once(self):
+        self.cached_snapshot()
+        new = self.add_unseen(5)
+        with self.assertNumQueries(1):
+            self.assertEqual([self.taxonomy.get(amenity.pk)['tag'] for amenity in new],
+                             [f'new {i}' for i in range(5)])
+        self.assertTrue(self.taxonomy.snapshot().fresh)
+
+    def test_fresh_snapshot_answers_misses(self):
+        self.cached_snapshot()
+        with self.assertNumQueries(1):
+            self.assertIsNone(self.taxonomy.get(uuid.uuid4()))
+            self.assertIsNone(self.taxonomy.get(uuid.uuid4()))
+
+    def test_snapshot_stops_being_fresh(self):
+        self.taxonomy.snapshot()
+        new = self.add_unseen(1)
+        self.assertIsNone(self.taxonomy.get(new[0].pk))
+        self.taxonomy.snapshot().loaded_at -= taxonomy_cache.RELOAD_INTERVAL
+        self.assertEqual(self.taxonomy.get(new[0].pk)['tag'], 'new 0')
+
+    def test_listing_with_unseen_tags_renders_with_one_reload(self):
+        listing = self.create_shortlet(1)
+        self.cached_snapshot()
+        new = self.add_unseen(5)
+        listing.amenities.set(new)
+        listing = ShortletListing.objects.prefetch_related('amenities').get(pk=listing.pk)
+        field = ShortletListingSerializer().fields['amenities']
+        with self.assertNumQueries(1):
+            self.assertEqual(len(field.to_representation(listing.amenities)), 5)
+
+
+class ListingExportTests(ListingTestCase):
+
+    def test_export_has_no_ids(self):
+        self.assertNotIn('id', export_columns(ShortletListing))
+        self.assertNotIn('id', export_columns(CarListing))
+
+    def test_export_imports_as_new_listings(self):
+        original = self.create_shortlet(1, tags=2, latitude=6.4281, longitude=3.4219)
+        for file_format in ('csv', 'jsonl'):
+            with self.subTest(file_format=file_format):
+                lines = ''.join(stream_export(ShortletListing.objects.filter(pk=original.pk), file_format))
+                summary = import_stream(
+                    ShortletListing, read_rows(lines.splitlines(keepends=True), file_format),
+                    self.user, self.business)
+                self.assertEqual((summary['created'], summary['failed']), (1, 0), summary['errors'])
+                copy = ShortletListing.objects.exclude(pk=original.pk).latest('created_on')
+                self.assertEqual(
+                    (copy.product_name, copy.geohash, set(copy.amenities.values_list('tag', flat=True))),
+                    (original.product_name, original.geohash, {'amenity 0', 'amenity 1'}))
+                copy.delete()
+
+
+class GeohashTests(SimpleTestCase):
+
+    def assertCovered(self, cells, latitude, longitude):
+        geohash = geo.encode_geohash(latitude, longitude)
+        self.assertTrue(any(geohash.startswith(cell) for cell in cells),
+                        f"{geohash} ({latitude}, {longitude}) is outside {sorted(cells)}")
+
+    def assertBoxCovered(self, min_lat, min_lng, max_lat, max_lng, steps=12):
+        cells = geo.cover_bounding_box(min_lat, min_lng, max_lat, max_lng)
+        self.assertLessEqual(len(cells), geo.MAX_COVER_CELLS * 2)
+        lng_span = (max_lng - min_lng) % 360 or 360
+        for i in range(steps + 1):
+            for j in range(steps + 1):
+                longitude = geo.wrap_longitude(min_lng + lng_span * j / steps)
+                self.assertCovered(cells, min_lat + (max_lat - min_lat) * i / steps, longitude)
+        return cells
+
+    def test_known_encodings(self):
+        self.assertEqual(geo.encode_geohash(42.6, -5.6, 5), 'ezs42')
+        self.assertEqual(geo.encode_geohash(57.64911, 10.40744, 11), 'u4pruydqqvj')
+        self.assertEqual(geo.encode_geohash(57.64911, 10.40744), 'u4pruydqq')
+        self.assertEqual(geo.listing_geohash(None, 3.4), '')
+
+    def test_cover_small_box_at_fine_precision(self):
+        cells = self.assertBoxCovered(57.649, 10.407, 57.6491, 10.4071)
+        self.assertLessEqual(len(cells), geo.MAX_COVER_CELLS)
+        self.assertTrue(all(cell.startswith('u4pruyd') for cell in cells), cells)
+
+    def test_cover_box_across_cell_boundaries(self):
+        # 0,0 is the corner of the four top-level cells 7, k, e and s.
+        cells = self.assertBoxCovered(-0.5, -0.5, 0.5, 0.5)
+        self.assertEqual({cell[0] for cell in cells}, {'7', 'k', 'e', 's'})
+
+    def test_cover_box_across_the_antimeridian(self):
+        cells = self.assertBoxCovered(-17.9, 177.5, -17.5, -179.5)
+        self.assertEqual({cell[0] for cell in cells}, {'r', '2'})
+        self.assertNotIn(geo.encode_geohash(-17.7, 0.0)[0], {cell[0] for cell in cells})
+
+    def test_radius_box_wraps_the_antimeridian(self):
+        min_lat, min_lng, max_lat, max_lng = geo.radius_bounding_box(-17.7, 179.9, 50)
+        self.assertGreater(min_lng, max_lng)
+        self.assertEqual(geo.longitude_ranges(min_lng, max_lng), [(min_lng, 180.0), (-180.0, max_lng)])
+
+    def test_radius_box_spans_all_longitudes_at_a_pole(self):
+        self.assertEqual(geo.radius_bounding_box(89.9, 10.0, 50)[1::2], (-180.0, 180.0))
+
+
+class GeoSearchTests(ListingTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.center = (6.4281, 3.4219)
+        lat_delta, lng_delta = cls.degrees(5)
+        cls.inside = cls.located(1, cls.center[0] + lat_delta * 0.9, cls.center[1])
+        cls.here = cls.located(2, *cls.center)
+        # In the radius' bounding box but outside the circle.
+        cls.corner = cls.located(3, cls.center[0] + lat_delta * 0.9, cls.center[1] + lng_delta * 0.9)
+        cls.far = cls.located(4, cls.center[0] + lat_delta * 3, cls.center[1])
+        cls.unplaced = cls.create_shortlet(5)
+
+    @classmethod
+    def degrees(cls, radius_km):
+        min_lat, min_lng, max_lat, max_lng = geo.radius_bounding_box(*cls.center, radius_km)
+        return (max_lat - min_lat) / 2, (max_lng - min_lng) / 2
+
+    @classmethod
+    def located(cls, i, latitude, longitude):
+        return cls.create_shortlet(i, latitude=latitude, longitude=longitude)
+
+    def test_geohash_is_stored_on_save(self):
+        self.assertEqual(self.here.geohash, geo.encode_geohash(*self.center))
+        self.assertEqual(self.unplaced.geohash, '')
+
+    def test_within_radius_drops_box_corners(self):
+        listings = geo.within_radius(ShortletListing.objects.all(), *self.center, 5).order_by('distance_km')
+        self.assertEqual(list(listings), [self.here, self.inside])
+        self.assertAlmostEqual(listings[0].distance_km, 0, places=6)
+        self.assertAlmostEqual(listings[1].distance_km, 4.5, delta=0.01)
+
+    def test_within_bounding_box_keeps_corners(self):
+        lat_delta, lng_delta = self.degrees(5)
+        listings = geo.within_bounding_box(
+            ShortletListing.objects.all(), self.center[0] - lat_delta, self.center[1] - lng_delta,
+            self.center[0] + lat_delta, self.center[1] + lng_delta)
+        self.assertCountEqual(listings, [self.here, self.inside, self.corner])
+
+    def test_within_radius_across_the_antimeridian(self):
+        east = self.located(10, -17.7, 179.98)
+        west = self.located(11, -17.7, -179.98)
+        self.located(12, -17.7, 0.0)
+        listings = geo.within_radius(ShortletListing.objects.all(), -17.7, 179.99, 10)
+        self.assertCountEqual(listings, [east, west])
@@ -1,7 +1,7 @@
 from django.urls import path
 from .views import (
-    CarModelAPIView,
-    CarModelCreateAPIView,
+    CarTypeAPIView,
+    CarTypeCreateAPIView,
     CarModelCreateAPIView,
     AmenitiesCreateAPIView,
     SpecificationsCreateAPIView,
@@ -17,40 +17,54 @@ from .views import (
     ReviewAPIView,
     ShortletListingAPIView,
     GetAllShortletListAPIView,
-    GetAllCarRentalListAPIView
+    GetAllCarRentalListAPIView,
+    ShortletListingSearchAPIView,
+    CarRentalSearchAPIView,
+    ShortletListingReviewsAPIView,
+    CarListingReviewsAPIView,
+    ShortletListingImportAPIView,
+    CarListingImportAPIView,
+    ShortletListingExportAPIView,
+    CarListingExportAPIView,
 
 )
 app_name = 'listing'
 urlpatterns = [
     # CarType URLs
-    path('car-types/<int:pk>/', CarModelAPIView.as_view(), name='car-type-detail'),
-    path('car-types/', CarModelCreateAPIView.as_view(), name='car-type-list'),
+    path('car-types/<uuid:pk>/', CarTypeAPIView.as_view(), name='car-type-detail'),
+    path('car-types/', CarTypeCreateAPIView.as_view(), name='car-type-list'),
 
     # CarModel URLs
-    path('car-models/<int:pk>/', CarModelAPIView.as_view(), name='car-model-detail'),
+    path('car-models/<uuid:pk>/', CarModelAPIView.as_view(), name='car-model-detail'),
     path('car-models/', CarModelCreateAPIView.as_view(), name='car-model-list'),
 
     # Amenities URLs
-    path('amenities/<int:pk>/', AmenitiesAPIView.as_view(), name='amenity-detail'),
+    path('amenities/<uuid:pk>/', AmenitiesAPIView.as_view(), name='amenity-detail'),
     path('amenities/', AmenitiesCreateAPIView.as_view(), name='amenity-list'),
 
     # Specifications URLs
-    path('specifications/<int:pk>/', SpecificationsAPIView.as_view(),
+    path('specifications/<uuid:pk>/', SpecificationsAPIView.as_view(),
          name='specification-detail'),
     path('specifications/', SpecificationsCreateAPIView.as_view(),
          name='specification-list'),
 
     # DiscountOption URLs
-    path('discount-options/<int:pk>/', DiscountOptionAPIView.as_view(),
+    path('discount-options/<uuid:pk>/', DiscountOptionAPIView.as_view(),
          name='discount-option-detail'),
     path('discount-options/', DiscountOptionCreateAPIView.as_view(),
          name='discount-option-list'),
 
     # CarListing URLs
-    path('car-listings/<int:pk>/', CarListingAPIView.as_view(),
+    path('car-listings/<uuid:pk>/', CarListingAPIView.as_view(),
          name='car-listing-detail'),
     path('car-listings/', CarListingCreateAPIView.as_view(),
          name='car-listing-list'),
+    path('car-listings/<uuid:pk>/reviews/', CarListingReviewsAPIView.as_view(),
+         name='car-listing-reviews'),
+    path('car-listings/import/', CarListingImportAPIView.as_view(),
+         name='car-listing-import'),
+    path('car-listings/export/', CarListingExportAPIView.as_view(),
+         name='car-listing-export'),
 
     # Review API
     path('reviews/<uuid:pk>/', ReviewAPIView.as_view(), name='review-detail'),
@@ -61,6 +75,12 @@ urlpatterns = [
          name='shortlet-listing-detail'),
     path('shortlet-listings/', ShortletListingCreateAPIView.as_view(),
          name='shortlet-listing-list'),
+    path('shortlet-listings/<uuid:pk>/reviews/', ShortletListingReviewsAPIView.as_view(),
+         name='shortlet-listing-reviews'),
+    path('shortlet-listings/import/', ShortletListingImportAPIView.as_view(),
+         name='shortlet-listing-import'),
+    path('shortlet-listings/export/', ShortletListingExportAPIView.as_view(),
+         name='shortlet-listing-export'),
 
     # Get All Shortlet Listings API
     path('shortlet-listings/all/', GetAllShortletListAPIView.as_view(),
@@ -69,4 +89,10 @@ urlpatterns = [
     # Get All Car Rentals API
     path('car-rentals/all/', GetAllCarRentalListAPIView.as_view(),
          name='all-car-rentals'),
+
+    # Public search APIs
+    path('shortlet-listings/search/', ShortletListingSearchAPIView.as_view(),
+         name='shortlet-listing-search'),
+    path('car-rentals/search/', CarRentalSearchAPIView.as_view(),
+         name='car-rental-search'),
 ]
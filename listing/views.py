@@ -1,21 +1,164 @@
+import codecs
+from decimal import Decimal
+from asgiref.sync import sync_to_async
+from django.http import StreamingHttpResponse
 from django.shortcuts import render
 
 from django.db.models import Q
+from django.utils.dateparse import parse_datetime
 from rest_framework.views import APIView
+from rest_framework.parsers import MultiPartParser
 from rest_framework import status
 from django.contrib.contenttypes.models import ContentType
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from authentication.models import UserBusiness
+from booking.availability import available_listings
 from listing.models import Amenities, CarListing, CarModel, CarType, DiscountOption, Review, ShortletListing, Specifications
-from listing.serializers import AmenitiesSerializer, CarListingSerializer, CarModelSerializer, CarTypeSerializer, DiscountOptionSerializer, ReviewSerializer, ShortletListingSerializer, SpecificationsSerializer
+from listing.geo import within_bounding_box, within_radius
+from listing.exports import EXPORT_CONTENT_TYPES, stream_export
+from listing.imports import IMPORT_FORMATS, guess_format, import_listings, import_stream, read_rows
+from listing import taxonomy
+from listing.cache import cache_listing_detail, cache_search, collection_validators, listing_detail_validators
+from listing.search import search_listings
+from listing.serializers import AmenitiesSerializer, CarListingCardSerializer, CarListingSerializer, CarModelSerializer, CarTypeSerializer, DiscountOptionSerializer, ReviewSerializer, ShortletListingCardSerializer, ShortletListingSerializer, SpecificationsSerializer
+from utils.async_views import AsyncAPIView
 from utils.custom_response import custom_response
+from utils.conditional import conditional_get
+from utils.custom_pagination import CursorPagination
+from utils.taxonomy_cache import taxonomy_response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from exceptions.custom_apiexception_class import CustomAPIException
 # Create your views here.
 
 
-class CarModelCreateAPIView(APIView):
+def review_summary(review):
+    return {
+        'user': review.user_id,
+        'rating': review.rating,
+        'review': review.review,
+        'created_on': review.created_on
+    }
+
+
+# Reviews embedded per listing in list responses; the rest are paged
+# through ListingReviewsAPIView.
+LATEST_REVIEWS_LIMIT = 3
+
+
+def serialize_listings_with_reviews(listings, serializer_class, include_reviews=True, **serializer_kwargs):
+    """
+    Serializes a page of listings and attaches each listing's latest
+    reviews, fetching the reviews for the whole page in a single query.
+    """
+    listings_data = serializer_class(
+        listings, many=True, **serializer_kwargs).data
+    if not include_reviews:
+        return listings_data
+
+    reviews = Review.objects.grouped_by_object(
+        listings, limit=LATEST_REVIEWS_LIMIT)
+    for listing, listing_data in zip(listings, listings_data):
+        listing_data['reviews'] = [
+            review_summary(review) for review in reviews.get(listing.id, [])]
+    return listings_data
+
+
+def bulk_import_response(request, model, business, message):
+    """
+    Imports a list of listings for the business and reports the rows that
+    failed validation by their index in the request body.
+    """
+    rows = request.data if isinstance(request.data, list) else [request.data]
+    try:
+        listings, errors = import_listings(model, rows, request.user, business)
+    except Exception as e:
+        return CustomAPIException(
+            detail=str(e),
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+        ).get_full_details()
+
+    if not listings:
+        return CustomAPIException(
+            detail="Invalid data found.",
+            status_code=status.HTTP_400_BAD_REQUEST,
+            data={'errors': errors}
+        ).get_full_details()
+
+    return custom_response(
+        status_code=status.HTTP_201_CREATED,
+        message=message,
+        data={
+            'created': len(listings),
+            'ids': [listing.id for listing in listings],
+            'errors': errors,
+        }
+    )
+
+
+def split_query_param(request, name):
+    """
+    Reads a list query parameter given either repeated or comma separated.
+    """
+    values = []
+    for value in request.query_params.getlist(name):
+        values += [item.strip() for item in value.split(',') if item.strip()]
+    return values
+
+
+LISTING_SERIALIZERS = {
+    ShortletListing: (ShortletListingSerializer, ShortletListingCardSerializer),
+    CarListing: (CarListingSerializer, CarListingCardSerializer),
+}
+
+
+class ListingRepresentation:
+    """
+    Resolves ?view=card, ?fields= and ?expand= into the queryset, serializer
+    and serializer options used to render listings.
+    """
+
+    def __init__(self, request, model):
+        self.model = model
+        self.fields = split_query_param(request, 'fields')
+        self.expand = split_query_param(request, 'expand')
+        self.is_card = request.query_params.get('view') == 'card'
+
+    @property
+    def include_reviews(self):
+        if self.fields and 'reviews' not in self.fields:
+            return False
+        return not self.is_card or 'reviews' in self.expand
+
+    def get_queryset(self):
+        if self.is_card:
+            return self.model.objects.for_card(self.expand)
+        return self.model.objects.for_api()
+
+    def get_serializer(self, *args, **kwargs):
+        full_serializer_class, card_serializer_class = LISTING_SERIALIZERS[self.model]
+        kwargs['fields'] = self.fields or None
+        if self.is_card:
+            return card_serializer_class(*args, expand=self.expand, **kwargs)
+        return full_serializer_class(*args, **kwargs)
+
+    def serialize_page(self, listings):
+        return serialize_listings_with_reviews(
+            listings, self.get_serializer, include_reviews=self.include_reviews)
+
+    async def aserialize(self, listing):
+        # Serializers may still touch the database (taxonomy cache misses),
+        # so they run in a worker thread.
+        return await sync_to_async(lambda: self.get_serializer(listing).data)()
+
+    async def aserialize_page(self, listings):
+        return await sync_to_async(self.serialize_page)(listings)
+
+
+class CarTypeCreateAPIView(APIView):
+
+    def get(self, request, format=None):
+        return taxonomy_response(request, taxonomy.car_types, "Car types fetched successfully", taxonomy.car_types.all())
 
     @swagger_auto_schema(
         request_body=CarTypeSerializer(many=True),
@@ -36,21 +179,20 @@ class CarModelCreateAPIView(APIView):
                 detail="Invalid data found.", status_code=status.HTTP_404_NOT_FOUND).get_full_details()
 
 
-class CarModelAPIView(APIView):
+class CarTypeAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, pk, format=None):
         try:
-            car_model = CarType.objects.get(id=pk)
-        except CarType.DoesNotExist:
-            error_msg = f"Car type with id {pk} not found."
-            return CustomAPIException(detail=error_msg, status_code=status.HTTP_404_NOT_FOUND).get_full_details()
+            car_type = taxonomy.car_types.get(pk)
         except Exception as e:
-            error_msg = f"An error occurred while retrieving the Car model: {str(e)}"
+            error_msg = f"An error occurred while retrieving the Car type: {str(e)}"
             return CustomAPIException(detail=error_msg, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR).get_full_details()
+        if car_type is None:
+            error_msg = f"Car type with id {pk} not found."
+            return CustomAPIException(detail=error_msg, status_code=status.HTTP_404_NOT_FOUND).get_full_details()
 
-        serializer = CarTypeSerializer(car_model)
-        return custom_response(status_code=status.HTTP_200_OK, message="Car type fetched successfully", data=serializer.data)
+        return taxonomy_response(request, taxonomy.car_types, "Car type fetched successfully", car_type)
 
     @swagger_auto_schema(request_body=CarTypeSerializer)
     def put(self, request, pk, format=None):
@@ -78,13 +220,16 @@ class CarModelAPIView(APIView):
             car_type.delete()
             return custom_response(status_code=status.HTTP_204_NO_CONTENT, message="Car type deleted successfully")
 
-        except CarModel.DoesNotExist:
+        except CarType.DoesNotExist:
             return custom_response(status_code=status.HTTP_404_NOT_FOUND, message="Car type not found or you do not have permission to delete this Car type")
         except Exception as e:
             return custom_response(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, message="An unexpected error occurred", data=str(e))
 
 
 class CarModelCreateAPIView(APIView):
+    def get(self, request, format=None):
+        return taxonomy_response(request, taxonomy.car_models, "Car models fetched successfully", taxonomy.car_models.all())
+
     @swagger_auto_schema(
         request_body=CarModelSerializer(many=True),
         responses={status.HTTP_201_CREATED: CarModelSerializer(many=True)}
@@ -109,16 +254,15 @@ class CarModelAPIView(APIView):
 
     def get(self, request, pk, format=None):
         try:
-            car_model = CarModel.objects.get(id=pk)
-        except CarModel.DoesNotExist:
-            error_msg = f"Car model with id {pk} not found."
-            return CustomAPIException(detail=error_msg, status_code=status.HTTP_404_NOT_FOUND).get_full_details()
+            car_model = taxonomy.car_models.get(pk)
         except Exception as e:
             error_msg = f"An error occurred while retrieving the Car model: {str(e)}"
             return CustomAPIException(detail=error_msg, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR).get_full_details()
+        if car_model is None:
+            error_msg = f"Car model with id {pk} not found."
+            return CustomAPIException(detail=error_msg, status_code=status.HTTP_404_NOT_FOUND).get_full_details()
 
-        serializer = CarModelSerializer(car_model)
-        return custom_response(status_code=status.HTTP_200_OK, message="Car model fetched successfully", data=serializer.data)
+        return taxonomy_response(request, taxonomy.car_models, "Car model fetched successfully", car_model)
 
     @swagger_auto_schema(request_body=CarModelSerializer)
     def put(self, request, pk, format=None):
@@ -153,6 +297,9 @@ class CarModelAPIView(APIView):
 
 
 class AmenitiesCreateAPIView(APIView):
+    def get(self, request, format=None):
+        return taxonomy_response(request, taxonomy.amenities, "Amenities fetched successfully", taxonomy.amenities.all())
+
     @swagger_auto_schema(
         request_body=AmenitiesSerializer(many=True),
         responses={status.HTTP_201_CREATED: AmenitiesSerializer(many=True)}
@@ -177,16 +324,15 @@ class AmenitiesAPIView(APIView):
 
     def get(self, request, pk, format=None):
         try:
-            amenity = Amenities.objects.get(id=pk)
-        except Amenities.DoesNotExist:
-            error_msg = f"Amenity with id {pk} not found."
-            return CustomAPIException(detail=error_msg, status_code=status.HTTP_404_NOT_FOUND).get_full_details()
+            amenity = taxonomy.amenities.get(pk)
         except Exception as e:
             error_msg = f"An error occurred while retrieving the Amenity: {str(e)}"
             return CustomAPIException(detail=error_msg, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR).get_full_details()
+        if amenity is None:
+            error_msg = f"Amenity with id {pk} not found."
+            return CustomAPIException(detail=error_msg, status_code=status.HTTP_404_NOT_FOUND).get_full_details()
 
-        serializer = AmenitiesSerializer(amenity)
-        return custom_response(status_code=status.HTTP_200_OK, message="Amenities fetched successfully", data=serializer.data)
+        return taxonomy_response(request, taxonomy.amenities, "Amenities fetched successfully", amenity)
 
     @swagger_auto_schema(
         request_body=AmenitiesSerializer(many=True),
@@ -239,6 +385,9 @@ class AmenitiesAPIView(APIView):
 
 
 class SpecificationsCreateAPIView(APIView):
+    def get(self, request, format=None):
+        return taxonomy_response(request, taxonomy.specifications, "Specifications fetched successfully", taxonomy.specifications.all())
+
     @swagger_auto_schema(
         request_body=SpecificationsSerializer(many=True),
         responses={
@@ -264,16 +413,15 @@ class SpecificationsAPIView(APIView):
 
     def get(self, request, pk, format=None):
         try:
-            specification = Specifications.objects.get(id=pk)
-        except Specifications.DoesNotExist:
-            error_msg = f"Specification with id {pk} not found."
-            return CustomAPIException(detail=error_msg, status_code=status.HTTP_404_NOT_FOUND).get_full_details()
+            specification = taxonomy.specifications.get(pk)
         except Exception as e:
             error_msg = f"An error occurred while retrieving the Specification: {str(e)}"
             return CustomAPIException(detail=error_msg, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR).get_full_details()
+        if specification is None:
+            error_msg = f"Specification with id {pk} not found."
+            return CustomAPIException(detail=error_msg, status_code=status.HTTP_404_NOT_FOUND).get_full_details()
 
-        serializer = SpecificationsSerializer(specification)
-        return custom_response(status_code=status.HTTP_200_OK, message="Specification fetched successfully", data=serializer.data)
+        return taxonomy_response(request, taxonomy.specifications, "Specification fetched successfully", specification)
 
     @swagger_auto_schema(request_body=SpecificationsSerializer)
     def put(self, request, pk, format=None):
@@ -308,6 +456,9 @@ class SpecificationsAPIView(APIView):
 
 
 class DiscountOptionCreateAPIView(APIView):
+    def get(self, request, format=None):
+        return taxonomy_response(request, taxonomy.discount_options, "Discount options fetched successfully", taxonomy.discount_options.all())
+
     @swagger_auto_schema(
         request_body=DiscountOptionSerializer(many=True),
         responses={
@@ -333,16 +484,15 @@ class DiscountOptionAPIView(APIView):
 
     def get(self, request, pk, format=None):
         try:
-            discountOption = DiscountOption.objects.get(id=pk)
-        except DiscountOption.DoesNotExist:
-            error_msg = f"Discount option with id {pk} not found."
-            return CustomAPIException(detail=error_msg, status_code=status.HTTP_404_NOT_FOUND).get_full_details()
+            discount_option = taxonomy.discount_options.get(pk)
         except Exception as e:
             error_msg = f"An error occurred while retrieving the Discount option: {str(e)}"
             return CustomAPIException(detail=error_msg, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR).get_full_details()
+        if discount_option is None:
+            error_msg = f"Discount option with id {pk} not found."
+            return CustomAPIException(detail=error_msg, status_code=status.HTTP_404_NOT_FOUND).get_full_details()
 
-        serializer = SpecificationsSerializer(discountOption)
-        return custom_response(status_code=status.HTTP_200_OK, message="Discount option fetched successfully", data=serializer.data)
+        return taxonomy_response(request, taxonomy.discount_options, "Discount option fetched successfully", discount_option)
 
     @swagger_auto_schema(request_body=DiscountOptionSerializer)
     def put(self, request, pk, format=None):
@@ -379,118 +529,54 @@ class DiscountOptionAPIView(APIView):
 class CarListingCreateAPIView(APIView):
     @swagger_auto_schema(
         request_body=openapi.Schema(
-            type=openapi.TYPE_OBJECT,
-            properties={
-                'amenities': openapi.Schema(
-                    type=openapi.TYPE_ARRAY,
-                    items=openapi.Schema(type=openapi.TYPE_STRING),
-                    example=["uuid-of-amenity-1", "uuid-of-amenity-2"]
-                ),
-                'specification': openapi.Schema(
-                    type=openapi.TYPE_ARRAY,
-                    items=openapi.Schema(type=openapi.TYPE_STRING),
-                    example=["uuid-of-specification-1",
-                             "uuid-of-specification-2"]
-                ),
-                'type_of_car': openapi.Schema(
-                    type=openapi.TYPE_STRING,
-                    example="uuid-of-car-type"
-                ),
-                'car_model': openapi.Schema(
-                    type=openapi.TYPE_STRING,
-                    example="uuid-of-car-model"
-                ),
-            }
+            type=openapi.TYPE_ARRAY,
+            items=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'amenities': openapi.Schema(
+                        type=openapi.TYPE_ARRAY,
+                        items=openapi.Schema(type=openapi.TYPE_STRING),
+                        example=["Wi-Fi", "Air conditioning"]
+                    ),
+                    'specification': openapi.Schema(
+                        type=openapi.TYPE_ARRAY,
+                        items=openapi.Schema(type=openapi.TYPE_STRING),
+                        example=["Automatic", "4 seats"]
+                    ),
+                    'type_of_car': openapi.Schema(
+                        type=openapi.TYPE_STRING,
+                        example="SUV"
+                    ),
+                    'car_model': openapi.Schema(
+                        type=openapi.TYPE_STRING,
+                        example="Highlander"
+                    ),
+                }
+            )
         )
     )
     def post(self, request, *args, **kwargs):
-        data = request.data
-        user = request.user
-
         try:
-            business = UserBusiness.objects.get(user=user)
+            business = UserBusiness.objects.get(user=request.user)
         except UserBusiness.DoesNotExist:
             return custom_response(
                 status_code=status.HTTP_404_NOT_FOUND,
                 message="User business not found."
             )
 
-        def get_or_create_amenities(tags):
-            amenities = []
-            for tag in tags:
-                obj, created = Amenities.objects.get_or_create(tag=tag)
-                amenities.append(obj)
-            return amenities
-
-        def get_or_create_specifications(tags):
-            specifications = []
-            for tag in tags:
-                obj, created = Specifications.objects.get_or_create(tag=tag)
-                specifications.append(obj)
-            return specifications
-
-        def get_or_create_car_type(title):
-            obj, created = CarType.objects.get_or_create(title=title)
-            return obj
-
-        def get_or_create_car_model(title):
-            obj, created = CarModel.objects.get_or_create(title=title)
-            return obj
-
-        # Process each item in the request data
-        processed_data = []
-        for item in data:
-            item['user'] = user.id
-            item['business'] = business.id
-
-            # Get or create amenities
-            if 'amenities' in item:
-                item['amenities'] = [
-                    amenity.id for amenity in get_or_create_amenities(item['amenities'])]
-
-            # Get or create specifications
-            if 'specification' in item:
-                item['specification'] = [
-                    spec.id for spec in get_or_create_specifications(item['specification'])]
-
-            # Get or create car type and car model
-            if 'type_of_car' in item:
-                item['type_of_car'] = get_or_create_car_type(
-                    item['type_of_car']).id
-            if 'car_model' in item:
-                item['car_model'] = get_or_create_car_model(
-                    item['car_model']).id
-
-            processed_data.append(item)
-
-        # Serialize and validate the data
-        serializer = CarListingSerializer(data=processed_data, many=True)
-        if serializer.is_valid():
-            try:
-                serializer.save()
-                return custom_response(
-                    status_code=status.HTTP_201_CREATED,
-                    message="Car listing created successfully",
-                    data=serializer.data
-                )
-            except Exception as e:
-                return CustomAPIException(
-                    detail=str(e),
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
-                ).get_full_details()
-        else:
-            return CustomAPIException(
-                detail="Invalid data found.",
-                status_code=status.HTTP_400_BAD_REQUEST
-            ).get_full_details()
+        return bulk_import_response(
+            request, CarListing, business, "Car listing created successfully")
 
 
-class CarListingAPIView(APIView):
+class CarListingAPIView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
 
-    def get(self, request, pk, format=None):
+    @conditional_get(listing_detail_validators(CarListing))
+    @cache_listing_detail(CarListing)
+    async def get(self, request, pk, format=None):
+        representation = ListingRepresentation(request, CarListing)
         try:
-            amenity = CarListing.objects.get(id=pk)
+            amenity = await representation.get_queryset().aget(id=pk)
         except CarListing.DoesNotExist:
             error_msg = f"Car listing with id {pk} not found."
             return CustomAPIException(detail=error_msg, status_code=status.HTTP_404_NOT_FOUND).get_full_details()
@@ -498,8 +584,8 @@ class CarListingAPIView(APIView):
             error_msg = f"An error occurred while retrieving the car listing: {str(e)}"
             return CustomAPIException(detail=error_msg, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR).get_full_details()
 
-        serializer = CarListingSerializer(amenity)
-        return custom_response(status_code=status.HTTP_200_OK, message="Car Listing fetched successfully", data=serializer.data)
+        data = await representation.aserialize(amenity)
+        return custom_response(status_code=status.HTTP_200_OK, message="Car Listing fetched successfully", data=data)
 
     @swagger_auto_schema(request_body=CarListingSerializer)
     def put(self, request, pk, format=None):
@@ -535,6 +621,21 @@ class CarListingAPIView(APIView):
 
 
 class ReviewCreateAPIView(APIView):
+
+    def get(self, request, format=None):
+        try:
+            paginator = CursorPagination(ordering=('-created_on', '-id'))
+            reviews = paginator.paginate_queryset(
+                Review.objects.filter(user=request.user), request, view=self)
+        except CustomAPIException as e:
+            return e.get_full_details()
+        except Exception as e:
+            error_msg = f"An error occurred while retrieving the reviews: {str(e)}"
+            return CustomAPIException(detail=error_msg, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR).get_full_details()
+
+        serializer = ReviewSerializer(reviews, many=True)
+        return paginator.get_paginated_response(serializer.data, message="Reviews fetched successfully")
+
     @swagger_auto_schema(
         request_body=openapi.Schema(
             type=openapi.TYPE_OBJECT,
@@ -558,8 +659,7 @@ class ReviewCreateAPIView(APIView):
                 # Check if the content type and object ID are valid
                 content_type = serializer.validated_data['content_type']
                 object_id = serializer.validated_data['object_id']
-                model = ContentType.objects.get(
-                    model=content_type).model_class()
+                model = content_type.model_class()
 
                 # Check if the object exists
                 if not model.objects.filter(id=object_id).exists():
@@ -591,127 +691,205 @@ class ReviewAPIView(APIView):
         return custom_response(status_code=status.HTTP_200_OK, message="Review fetched successfully", data=serializer.data)
 
 
+class ListingReviewsAPIView(APIView):
+    """
+    Pages through one listing's reviews, newest first, over the
+    (content_type, object_id, created_on, id) index.
+    """
+    permission_classes = [IsAuthenticated]
+    model = None
+
+    def get(self, request, pk, format=None):
+        try:
+            if not self.model.objects.filter(id=pk).exists():
+                return CustomAPIException(
+                    detail=f"Listing with id {pk} not found.", status_code=status.HTTP_404_NOT_FOUND).get_full_details()
+
+            content_type = ContentType.objects.get_for_model(self.model)
+            paginator = CursorPagination(ordering=('-created_on', '-id'))
+            reviews = paginator.paginate_queryset(
+                Review.objects.filter(content_type=content_type, object_id=pk), request, view=self)
+        except CustomAPIException as e:
+            return e.get_full_details()
+        except Exception as e:
+            error_msg = f"An error occurred while retrieving the reviews: {str(e)}"
+            return CustomAPIException(detail=error_msg, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR).get_full_details()
+
+        serializer = ReviewSerializer(reviews, many=True)
+        return paginator.get_paginated_response(serializer.data, message="Reviews fetched successfully")
+
+
+class ShortletListingReviewsAPIView(ListingReviewsAPIView):
+    model = ShortletListing
+
+
+class CarListingReviewsAPIView(ListingReviewsAPIView):
+    model = CarListing
+
+
 class ShortletListingCreateAPIView(APIView):
     @swagger_auto_schema(
         request_body=openapi.Schema(
-            type=openapi.TYPE_OBJECT,
-            properties={
-                'amenities': openapi.Schema(
-                    type=openapi.TYPE_ARRAY,
-                    items=openapi.Schema(type=openapi.TYPE_STRING),
-                    example=["uuid-of-amenity-1", "uuid-of-amenity-2"]
-                ),
-                'specification': openapi.Schema(
-                    type=openapi.TYPE_ARRAY,
-                    items=openapi.Schema(type=openapi.TYPE_STRING),
-                    example=["uuid-of-specification-1",
-                             "uuid-of-specification-2"]
-                ),
-                'type_of_apartment': openapi.Schema(
-                    type=openapi.TYPE_STRING,
-                    example="uuid-of-apartment-type"
-                ),
-                'utility_service_staffs': openapi.Schema(
-                    type=openapi.TYPE_STRING,
-                    example="uuid-of-utility-service-staffs"
-                ),
-                'discount_option': openapi.Schema(
-                    type=openapi.TYPE_STRING,
-                    example="uuid-of-discount-option"
-                ),
-                'price_per_day': openapi.Schema(
-                    type=openapi.TYPE_NUMBER,
-                    example=100.00
-                ),
-                'discount_price': openapi.Schema(
-                    type=openapi.TYPE_NUMBER,
-                    example=80.00
-                ),
-                # Other fields as necessary
-            }
+            type=openapi.TYPE_ARRAY,
+            items=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'amenities': openapi.Schema(
+                        type=openapi.TYPE_ARRAY,
+                        items=openapi.Schema(type=openapi.TYPE_STRING),
+                        example=["Wi-Fi", "Air conditioning"]
+                    ),
+                    'specification': openapi.Schema(
+                        type=openapi.TYPE_ARRAY,
+                        items=openapi.Schema(type=openapi.TYPE_STRING),
+                        example=["Automatic", "4 seats"]
+                    ),
+                    'type_of_apartment': openapi.Schema(
+                        type=openapi.TYPE_STRING,
+                        example="uuid-of-apartment-type"
+                    ),
+                    'utility_service_staffs': openapi.Schema(
+                        type=openapi.TYPE_STRING,
+                        example="uuid-of-utility-service-staffs"
+                    ),
+                    'discount_option': openapi.Schema(
+                        type=openapi.TYPE_STRING,
+                        example="Weekly"
+                    ),
+                    'price_per_day': openapi.Schema(
+                        type=openapi.TYPE_NUMBER,
+                        example=100.00
+                    ),
+                    'discount_price': openapi.Schema(
+                        type=openapi.TYPE_NUMBER,
+                        example=80.00
+                    ),
+                    # Other fields as necessary
+                }
+            )
         )
     )
     def post(self, request, *args, **kwargs):
-        data = request.data
-        user = request.user
+        try:
+            business = UserBusiness.objects.get(user=request.user)
+        except UserBusiness.DoesNotExist:
+            return custom_response(
+                status_code=status.HTTP_404_NOT_FOUND,
+                message="User business not found."
+            )
+
+        return bulk_import_response(
+            request, ShortletListing, business, "Shortlet listing created successfully")
+
 
+class ListingImportAPIView(APIView):
+    """
+    Streams an uploaded CSV or JSONL file into the caller's business in
+    chunks. start_row skips rows a previous, interrupted upload committed.
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+    model = None
+
+    @swagger_auto_schema(manual_parameters=[
+        openapi.Parameter('file', openapi.IN_FORM,
+                          type=openapi.TYPE_FILE, required=True),
+        openapi.Parameter('file_format', openapi.IN_FORM, type=openapi.TYPE_STRING,
+                          enum=list(IMPORT_FORMATS)),
+        openapi.Parameter('start_row', openapi.IN_FORM,
+                          type=openapi.TYPE_INTEGER),
+    ])
+    def post(self, request, *args, **kwargs):
         try:
-            business = UserBusiness.objects.get(user=user)
+            business = UserBusiness.objects.get(user=request.user)
         except UserBusiness.DoesNotExist:
             return custom_response(
                 status_code=status.HTTP_404_NOT_FOUND,
                 message="User business not found."
             )
 
-        def get_or_create_amenities(tags):
-            amenities = []
-            for tag in tags:
-                obj, created = Amenities.objects.get_or_create(tag=tag)
-                amenities.append(obj)
-            return amenities
-
-        def get_or_create_specifications(tags):
-            specifications = []
-            for tag in tags:
-                obj, created = Specifications.objects.get_or_create(tag=tag)
-                specifications.append(obj)
-            return specifications
-
-        def get_or_create_discount_option(title):
-            obj, created = DiscountOption.objects.get_or_create(title=title)
-            return obj
-
-        # Process each item in the request data
-        processed_data = []
-        for item in data:
-            item['user'] = user.id
-            item['business'] = business.id
-
-            # Get or create amenities
-            if 'amenities' in item:
-                item['amenities'] = [
-                    amenity.id for amenity in get_or_create_amenities(item['amenities'])]
-
-            # Get or create specifications
-            if 'specification' in item:
-                item['specification'] = [
-                    spec.id for spec in get_or_create_specifications(item['specification'])]
-
-            # Get or create discount option
-            if 'discount_option' in item:
-                item['discount_option'] = get_or_create_discount_option(
-                    item['discount_option']).id
-
-            processed_data.append(item)
-
-        # Serialize and validate the data
-        serializer = ShortletListingSerializer(data=processed_data, many=True)
-        if serializer.is_valid():
-            try:
-                serializer.save()
-                return custom_response(
-                    status_code=status.HTTP_201_CREATED,
-                    message="Shortlet listing created successfully",
-                    data=serializer.data
-                )
-            except Exception as e:
-                return CustomAPIException(
-                    detail=str(e),
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
-                ).get_full_details()
-        else:
+        upload = request.FILES.get('file')
+        if upload is None:
+            return CustomAPIException(
+                detail="A CSV or JSONL file is required.", status_code=status.HTTP_400_BAD_REQUEST).get_full_details()
+        file_format = request.data.get('file_format') or guess_format(upload.name)
+        if file_format not in IMPORT_FORMATS:
+            return CustomAPIException(
+                detail=f"file_format must be one of {', '.join(IMPORT_FORMATS)}.", status_code=status.HTTP_400_BAD_REQUEST).get_full_details()
+        try:
+            start_row = max(int(request.data.get('start_row') or 0), 0)
+        except ValueError:
             return CustomAPIException(
-                detail="Invalid data found.",
-                status_code=status.HTTP_400_BAD_REQUEST
+                detail="start_row must be an integer.", status_code=status.HTTP_400_BAD_REQUEST).get_full_details()
+
+        try:
+            lines = codecs.iterdecode(upload, 'utf-8-sig')
+            summary = import_stream(
+                self.model, read_rows(lines, file_format), request.user, business, start_row=start_row)
+        except Exception as e:
+            return CustomAPIException(
+                detail=str(e),
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                data={'next_row': start_row}
             ).get_full_details()
 
+        return custom_response(
+            status_code=status.HTTP_201_CREATED if summary['created'] else status.HTTP_400_BAD_REQUEST,
+            message=f"Imported {summary['created']} {self.model._meta.verbose_name_plural}.",
+            data=summary
+        )
 
-class ShortletListingAPIView(APIView):
+
+class ListingExportAPIView(APIView):
+    """
+    Streams the caller's listings as CSV or JSONL in the import format.
+    """
     permission_classes = [IsAuthenticated]
+    model = None
+
+    @swagger_auto_schema(manual_parameters=[
+        openapi.Parameter('file_format', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                          enum=list(IMPORT_FORMATS)),
+    ])
+    def get(self, request, *args, **kwargs):
+        file_format = request.query_params.get('file_format', 'csv')
+        if file_format not in IMPORT_FORMATS:
+            return CustomAPIException(
+                detail=f"file_format must be one of {', '.join(IMPORT_FORMATS)}.", status_code=status.HTTP_400_BAD_REQUEST).get_full_details()
 
-    def get(self, request, pk, format=None):
+        response = StreamingHttpResponse(
+            stream_export(self.model.objects.filter(user=request.user), file_format),
+            content_type=EXPORT_CONTENT_TYPES[file_format])
+        filename = f"{self.model._meta.model_name}s.{file_format}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class ShortletListingImportAPIView(ListingImportAPIView):
+    model = ShortletListing
+
+
+class CarListingImportAPIView(ListingImportAPIView):
+    model = CarListing
+
+
+class ShortletListingExportAPIView(ListingExportAPIView):
+    model = ShortletListing
+
+
+class CarListingExportAPIView(ListingExportAPIView):
+    model = CarListing
+
+
+class ShortletListingAPIView(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+
+    @conditional_get(listing_detail_validators(ShortletListing))
+    @cache_listing_detail(ShortletListing)
+    async def get(self, request, pk, format=None):
+        representation = ListingRepresentation(request, ShortletListing)
         try:
-            shortlet_listing = ShortletListing.objects.get(id=pk)
+            shortlet_listing = await representation.get_queryset().aget(id=pk)
         except ShortletListing.DoesNotExist:
             error_msg = f"Shortlet listing with id {pk} not found."
             return CustomAPIException(detail=error_msg, status_code=status.HTTP_404_NOT_FOUND).get_full_details()
@@ -719,8 +897,8 @@ class ShortletListingAPIView(APIView):
             error_msg = f"An error occurred while retrieving the shortlet listing: {str(e)}"
             return CustomAPIException(detail=error_msg, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR).get_full_details()
 
-        serializer = ShortletListingSerializer(shortlet_listing)
-        return custom_response(status_code=status.HTTP_200_OK, message="Shortlet listing fetched successfully", data=serializer.data)
+        data = await representation.aserialize(shortlet_listing)
+        return custom_response(status_code=status.HTTP_200_OK, message="Shortlet listing fetched successfully", data=data)
 
     @swagger_auto_schema(request_body=ShortletListingSerializer)
     def put(self, request, pk, format=None):
@@ -755,89 +933,74 @@ class ShortletListingAPIView(APIView):
             return custom_response(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, message="An unexpected error occurred", data=str(e))
 
 
+def listing_collection_validators(view, request, *args, **kwargs):
+    try:
+        queryset = view.model.objects.filter(view.get_filters(request))
+    except (ValueError, ArithmeticError):
+        # Left for the view to report.
+        return None, None
+    return collection_validators(request, queryset)
+
+
 class GetAllShortletListAPIView(APIView):
     permission_classes = [IsAuthenticated]
-
+    model = ShortletListing
+
+    def get_filters(self, request):
+        # Fetch query parameters
+        product_name = request.query_params.get('product_name', None)
+        address = request.query_params.get('address', None)
+        listing_status = request.query_params.get('status', None)
+        is_approved = request.query_params.get('is_approved', None)
+        is_booked = request.query_params.get('is_booked', None)
+        amenities = request.query_params.getlist(
+            'amenities', None)  # Expecting a list of amenities
+        type_of_apartment = request.query_params.get(
+            'type_of_apartment', None)
+
+        # Base filter for fetching shortlets owned by the user
+        filters = Q(user=request.user)
+
+        # Apply filters based on query parameters
+        if product_name:
+            filters &= Q(product_name__icontains=product_name)
+        if address:
+            filters &= Q(address__icontains=address)
+        if listing_status:
+            filters &= Q(status__iexact=listing_status)
+        if is_approved is not None:
+            filters &= Q(is_approved=bool(int(is_approved)))
+        if is_booked is not None:
+            filters &= Q(is_booked=bool(int(is_booked)))
+        if type_of_apartment:
+            filters &= Q(type_of_apartment__iexact=type_of_apartment)
+        if amenities:
+            filters &= Q(amenities__tag__in=amenities)
+        return filters
+
+    @conditional_get(listing_collection_validators)
     def get(self, request, format=None):
         try:
-            # Fetch query parameters
-            product_name = request.query_params.get('product_name', None)
-            address = request.query_params.get('address', None)
-            status = request.query_params.get('status', None)
-            is_approved = request.query_params.get('is_approved', None)
-            is_booked = request.query_params.get('is_booked', None)
-            amenities = request.query_params.getlist(
-                'amenities', None)  # Expecting a list of amenities
-            type_of_apartment = request.query_params.get(
-                'type_of_apartment', None)
-
-            # Base filter for fetching shortlets owned by the user
-            filters = Q(user=request.user)
-
-            # Apply filters based on query parameters
-            if product_name:
-                filters &= Q(product_name__icontains=product_name)
-            if address:
-                filters &= Q(address__icontains=address)
-            if status:
-                filters &= Q(status__iexact=status)
-            if is_approved is not None:
-                filters &= Q(is_approved=bool(int(is_approved)))
-            if is_booked is not None:
-                filters &= Q(is_booked=bool(int(is_booked)))
-            if type_of_apartment:
-                filters &= Q(type_of_apartment__iexact=type_of_apartment)
-            if amenities:
-                filters &= Q(amenities__name__in=amenities)
-
-            # Fetch filtered shortlet listings
-            shortlets = ShortletListing.objects.filter(
-                filters).distinct().order_by('-updated_on')
-            if not shortlets.exists():
+            filters = self.get_filters(request)
+
+            # Fetch a page of filtered shortlet listings
+            representation = ListingRepresentation(request, ShortletListing)
+            paginator = CursorPagination()
+            shortlets = paginator.paginate_queryset(
+                representation.get_queryset().filter(filters).distinct(), request, view=self)
+            if not shortlets and paginator.cursor is None:
                 return CustomAPIException(
                     detail="No shortlets found for this user",
                     status_code=status.HTTP_404_NOT_FOUND
                 ).get_full_details()
 
-            shortlets_data = []
-
-            # Retrieve and serialize shortlets and their reviews
-            for shortlet in shortlets:
-                try:
-                    # Get content type for ShortletListing
-                    content_type = ContentType.objects.get_for_model(
-                        ShortletListing)
-
-                    # Retrieve reviews related to the shortlet using GenericForeignKey
-                    reviews = Review.objects.filter(
-                        content_type=content_type, object_id=shortlet.id)
-                    shortlet_data = ShortletListingSerializer(shortlet).data
-                    reviews_data = []
-
-                    for review in reviews:
-                        review_data = {
-                            'user': review.user.id,
-                            'rating': review.rating,
-                            'review': review.review,
-                            'created_on': review.created_on
-                        }
-                        reviews_data.append(review_data)
-
-                    # Add reviews to the shortlet data
-                    shortlet_data['reviews'] = reviews_data
-                    shortlets_data.append(shortlet_data)
-                except Exception as e:
-                    error_msg = f"An error occurred while retrieving the reviews for shortlet {shortlet.id}: {str(e)}"
-
-                    return CustomAPIException(detail=error_msg, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR).get_full_details()
-
-            # Prepare the final response
-            response_data = {
-                "shortlets": shortlets_data
-            }
+            # Serialize shortlets with their reviews loaded in one query
+            shortlets_data = representation.serialize_page(shortlets)
 
-            return custom_response(status_code=status.HTTP_200_OK, message="Shortlets and reviews fetched successfully", data=response_data)
+            return paginator.get_paginated_response(shortlets_data, message="Shortlets and reviews fetched successfully", results_key="shortlets")
 
+        except CustomAPIException as e:
+            return e.get_full_details()
         except Exception as e:
             error_msg = f"An error occurred while retrieving the shortlets: {str(e)}"
 
@@ -846,82 +1009,225 @@ class GetAllShortletListAPIView(APIView):
 
 class GetAllCarRentalListAPIView(APIView):
     permission_classes = [IsAuthenticated]
-
+    model = CarListing
+
+    def get_filters(self, request):
+        # Fetch query parameters
+        car_model = request.query_params.get('car_model', None)
+        car_type = request.query_params.get('car_type', None)
+        rental_status = request.query_params.get('rental_status', None)
+        is_approved = request.query_params.get('is_approved', None)
+        is_booked = request.query_params.get('is_booked', None)
+        amenities = request.query_params.getlist(
+            'amenities', None)  # Expecting a list of amenities
+        type_of_car = request.query_params.get('type_of_car', None)
+
+        # Base filter for fetching car rentals owned by the user
+        filters = Q(user=request.user)
+
+        # Apply filters based on query parameters
+        if car_model:
+            filters &= Q(car_model__title__icontains=car_model)
+        if car_type:
+            filters &= Q(type_of_car__title__icontains=car_type)
+        if rental_status:
+            filters &= Q(status__iexact=rental_status)
+        if is_approved is not None:
+            filters &= Q(is_approved=bool(int(is_approved)))
+        if is_booked is not None:
+            filters &= Q(is_booked=bool(int(is_booked)))
+        if type_of_car:
+            filters &= Q(type_of_car__title__iexact=type_of_car)
+        if amenities:
+            filters &= Q(amenities__tag__in=amenities)
+        return filters
+
+    @conditional_get(listing_collection_validators)
     def get(self, request, format=None):
         try:
-            # Fetch query parameters
-            car_model = request.query_params.get('car_model', None)
-            car_type = request.query_params.get('car_type', None)
-            rental_status = request.query_params.get('rental_status', None)
-            is_approved = request.query_params.get('is_approved', None)
-            is_booked = request.query_params.get('is_booked', None)
-            amenities = request.query_params.getlist(
-                'amenities', None)  # Expecting a list of amenities
-            type_of_car = request.query_params.get('type_of_car', None)
-
-            # Base filter for fetching car rentals owned by the user
-            filters = Q(user=request.user)
-
-            # Apply filters based on query parameters
-            if car_model:
-                filters &= Q(car_model__icontains=car_model)
-            if car_type:
-                filters &= Q(car_type__icontains=car_type)
-            if rental_status:
-                filters &= Q(rental_status__iexact=rental_status)
-            if is_approved is not None:
-                filters &= Q(is_approved=bool(int(is_approved)))
-            if is_booked is not None:
-                filters &= Q(is_booked=bool(int(is_booked)))
-            if type_of_car:
-                filters &= Q(type_of_car__iexact=type_of_car)
-            if amenities:
-                filters &= Q(amenities__name__in=amenities)
-
-            # Fetch filtered car rentals
-            car_rentals = CarListing.objects.filter(
-                filters).distinct().order_by('-updated_on')
-            if not car_rentals.exists():
+            filters = self.get_filters(request)
+
+            # Fetch a page of filtered car rentals
+            representation = ListingRepresentation(request, CarListing)
+            paginator = CursorPagination()
+            car_rentals = paginator.paginate_queryset(
+                representation.get_queryset().filter(filters).distinct(), request, view=self)
+            if not car_rentals and paginator.cursor is None:
                 return CustomAPIException(
                     detail="No car rentals found for this user",
                     status_code=status.HTTP_404_NOT_FOUND
                 ).get_full_details()
 
-            car_rentals_data = []
+            car_rentals_data = representation.serialize_page(car_rentals)
 
-            for car_rental in car_rentals:
-                try:
-                    content_type = ContentType.objects.get_for_model(
-                        CarListing)
+            return paginator.get_paginated_response(car_rentals_data, message="Car rentals and reviews fetched successfully", results_key="car_rentals")
 
-                    reviews = Review.objects.filter(
-                        content_type=content_type, object_id=car_rental.id)
-                    car_rental_data = CarListingSerializer(car_rental).data
-                    reviews_data = []
+        except CustomAPIException as e:
+            return e.get_full_details()
+        except Exception as e:
+            error_msg = f"An error occurred while retrieving the car rentals: {str(e)}"
 
-                    for review in reviews:
-                        review_data = {
-                            'user': review.user.id,
-                            'rating': review.rating,
-                            'review': review.review,
-                            'created_on': review.created_on
-                        }
-                        reviews_data.append(review_data)
+            return CustomAPIException(detail=error_msg, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR).get_full_details()
 
-                    car_rental_data['reviews'] = reviews_data
-                    car_rentals_data.append(car_rental_data)
-                except Exception as e:
-                    error_msg = f"An error occurred while retrieving the reviews for car rental {car_rental.id}: {str(e)}"
 
-                    return CustomAPIException(detail=error_msg, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR).get_full_details()
+DEFAULT_SEARCH_RADIUS_KM = 5
+MAX_SEARCH_RADIUS_KM = 100
+
+
+class ListingSearchAPIView(AsyncAPIView):
+    """
+    Public search over approved listings. Attribute filters and the optional
+    availability window are combined into one query; availability is a
+    NOT EXISTS anti-join against Booking rather than a per-listing check.
+    A q parameter adds ranked full-text matching through listing.search, and
+    lat/lng/radius_km or bbox restrict results geographically via listing.geo.
+    """
+    permission_classes = [AllowAny]
+    model = None
+    results_key = 'results'
+    message = "Listings fetched successfully"
+
+    def get_filters(self, request):
+        filters = Q(is_approved=True)
+
+        product_name = request.query_params.get('product_name', None)
+        address = request.query_params.get('address', None)
+        amenities = split_query_param(request, 'amenities')
+        min_price = request.query_params.get('min_price', None)
+        max_price = request.query_params.get('max_price', None)
+
+        if product_name:
+            filters &= Q(product_name__icontains=product_name)
+        if address:
+            filters &= Q(address__icontains=address)
+        if amenities:
+            filters &= Q(amenities__tag__in=amenities)
+        if min_price:
+            filters &= Q(price_per_day__gte=Decimal(min_price))
+        if max_price:
+            filters &= Q(price_per_day__lte=Decimal(max_price))
+        return filters
+
+    def get_availability_window(self, request):
+        start_time = request.query_params.get('start_time', None)
+        end_time = request.query_params.get('end_time', None)
+        if not start_time and not end_time:
+            return None
+        start_time = parse_datetime(start_time or '')
+        end_time = parse_datetime(end_time or '')
+        if start_time is None or end_time is None or start_time >= end_time:
+            raise CustomAPIException(
+                detail="start_time and end_time must be ISO 8601 datetimes with start_time before end_time.",
+                status_code=status.HTTP_400_BAD_REQUEST)
+        return start_time, end_time
+
+    def get_location(self, request):
+        """
+        Reads either lat/lng (with an optional radius_km) or a
+        bbox=min_lat,min_lng,max_lat,max_lng query parameter; a bbox with
+        min_lng greater than max_lng crosses the antimeridian.
+        """
+        latitude = request.query_params.get('lat', None)
+        longitude = request.query_params.get('lng', None)
+        bbox = request.query_params.get('bbox', None)
+
+        if latitude is not None and longitude is not None:
+            radius_km = float(request.query_params.get(
+                'radius_km', DEFAULT_SEARCH_RADIUS_KM))
+            if not 0 < radius_km <= MAX_SEARCH_RADIUS_KM:
+                raise ValueError('radius_km out of range')
+            return {'point': (float(latitude), float(longitude), radius_km)}
+        if bbox:
+            min_lat, min_lng, max_lat, max_lng = [
+                float(value) for value in bbox.split(',')]
+            if min_lat > max_lat:
+                raise ValueError('bbox corners out of order')
+            return {'bbox': (min_lat, min_lng, max_lat, max_lng)}
+        return None
+
+    @cache_search
+    async def get(self, request, format=None):
+        try:
+            try:
+                filters = self.get_filters(request)
+                location = self.get_location(request)
+            except (ValueError, ArithmeticError):
+                raise CustomAPIException(
+                    detail="Invalid search parameters.", status_code=status.HTTP_400_BAD_REQUEST)
+
+            representation = ListingRepresentation(request, self.model)
+            listings = representation.get_queryset().filter(filters).distinct()
+            window = self.get_availability_window(request)
+            if window is not None:
+                # May look up the listing's content type on first use.
+                listings = await sync_to_async(available_listings)(listings, *window)
+            if location and 'point' in location:
+                listings = within_radius(listings, *location['point'])
+            elif location:
+                listings = within_bounding_box(listings, *location['bbox'])
+
+            # sort=rating orders by the stored rating aggregates. Otherwise
+            # free-text queries are ranked, radius searches are nearest
+            # first and everything else is newest first.
+            query = request.query_params.get('q', '').strip()
+            if query:
+                # Backends may look things up while building the query.
+                listings = await sync_to_async(search_listings)(listings, query)
+            if request.query_params.get('sort') == 'rating':
+                paginator = CursorPagination(
+                    ordering=('-rating_avg', '-rating_count', '-id'))
+            elif query:
+                paginator = CursorPagination(ordering=('-search_rank', '-id'))
+            elif location and 'point' in location:
+                paginator = CursorPagination(ordering=('distance_km', 'id'))
+            else:
+                paginator = CursorPagination()
+            page = await paginator.apaginate_queryset(listings, request, view=self)
+            listings_data = await representation.aserialize_page(page)
+            return paginator.get_paginated_response(listings_data, message=self.message, results_key=self.results_key)
 
-            response_data = {
-                "car_rentals": car_rentals_data
-            }
+        except CustomAPIException as e:
+            return e.get_full_details()
+        except Exception as e:
+            error_msg = f"An error occurred while searching listings: {str(e)}"
+            return CustomAPIException(detail=error_msg, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR).get_full_details()
 
-            return custom_response(status_code=status.HTTP_200_OK, message="Car rentals and reviews fetched successfully", data=response_data)
 
-        except Exception as e:
-            error_msg = f"An error occurred while retrieving the car rentals: {str(e)}"
+class ShortletListingSearchAPIView(ListingSearchAPIView):
+    model = ShortletListing
+    results_key = 'shortlets'
+    message = "Shortlets fetched successfully"
 
-            return CustomAPIException(detail=error_msg, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR).get_full_details()
+    def get_filters(self, request):
+        filters = super().get_filters(request)
+
+        type_of_apartment = request.query_params.get(
+            'type_of_apartment', None)
+        max_guests = request.query_params.get('max_guests', None)
+
+        if type_of_apartment:
+            filters &= Q(type_of_apartment__iexact=type_of_apartment)
+        if max_guests:
+            filters &= Q(max_guests__gte=int(max_guests))
+        return filters
+
+
+class CarRentalSearchAPIView(ListingSearchAPIView):
+    model = CarListing
+    results_key = 'car_rentals'
+    message = "Car rentals fetched successfully"
+
+    def get_filters(self, request):
+        filters = super().get_filters(request)
+
+        type_of_car = request.query_params.get('type_of_car', None)
+        car_model = request.query_params.get('car_model', None)
+        is_driver = request.query_params.get('is_driver', None)
+
+        if type_of_car:
+            filters &= Q(type_of_car__title__iexact=type_of_car)
+        if car_model:
+            filters &= Q(car_model__title__icontains=car_model)
+        if is_driver is not None:
+            filters &= Q(is_driver=bool(int(is_driver)))
+        return filters
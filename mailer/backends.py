@@ -0,0 +1,21 @@
+from django.core.mail.backends.base import BaseEmailBackend
+from mailer.queues import get_queue
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """
+    EMAIL_BACKEND that stores messages in the mail queue instead of talking
+    to the mail server, so sending costs a request one INSERT. The
+    send_queued_mail worker delivers them.
+    """
+
+    def send_messages(self, email_messages):
+        email_messages = [message for message in email_messages if message.recipients()]
+        if not email_messages:
+            return 0
+        try:
+            return get_queue().enqueue(email_messages)
+        except Exception:
+            if not self.fail_silently:
+                raise
+            return 0
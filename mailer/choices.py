@@ -0,0 +1,11 @@
+STATUS_QUEUED = 'QUEUED'
+STATUS_SENDING = 'SENDING'
+STATUS_SENT = 'SENT'
+STATUS_FAILED = 'FAILED'
+
+STATUS_TYPE = [
+    (STATUS_QUEUED, 'Queued'),
+    (STATUS_SENDING, 'Sending'),
+    (STATUS_SENT, 'Sent'),
+    (STATUS_FAILED, 'Failed'),
+]
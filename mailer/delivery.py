@@ -0,0 +1,70 @@
+import logging
+from django.conf import settings
+from django.core.mail import BadHeaderError, get_connection
+from mailer.queues import get_queue
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DELIVERY_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+
+BATCH_SIZE = 100
+
+
+def get_delivery_connection():
+    return get_connection(
+        getattr(settings, 'MAILER_DELIVERY_BACKEND', DEFAULT_DELIVERY_BACKEND),
+        fail_silently=False)
+
+
+def reconnect(connection):
+    connection.close()
+    try:
+        connection.open()
+    except Exception as e:
+        logger.warning(f"Could not reconnect to the mail server: {e}")
+
+
+def deliver_batch(queue=None, batch_size=BATCH_SIZE):
+    """
+    Claims up to batch_size due emails and sends them over one connection
+    to the mail server. Returns (claimed, sent).
+
+    A failed email is handed back to the queue for a later retry and the
+    connection is reopened, since SMTP errors often leave it unusable.
+    The claim on the emails still to send is renewed before each one, and
+    an email another worker has taken over in the meantime is skipped.
+    """
+    queue = queue or get_queue()
+    claimed = queue.claim(batch_size)
+    if not claimed:
+        return 0, 0
+
+    connection = get_delivery_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        logger.warning(f"Could not connect to the mail server: {e}")
+        for token, message in claimed:
+            queue.mark_failed(token, e)
+        return len(claimed), 0
+
+    sent = 0
+    try:
+        for index, (token, message) in enumerate(claimed):
+            if token not in queue.renew([pending for pending, _ in claimed[index:]]):
+                logger.warning(f"Skipping queued email to {message.to}: its claim was taken over.")
+                continue
+            try:
+                connection.send_messages([message])
+            except BadHeaderError as e:
+                queue.mark_failed(token, e, permanent=True)
+            except Exception as e:
+                logger.warning(f"Sending queued email to {message.to} failed: {e}")
+                queue.mark_failed(token, e)
+                reconnect(connection)
+            else:
+                queue.mark_sent(token)
+                sent += 1
+    finally:
+        connection.close()
+    return len(claimed), sent
@@ -0,0 +1,30 @@
+import time
+from django.core.management.base import BaseCommand
+from mailer.delivery import BATCH_SIZE, deliver_batch
+
+
+class Command(BaseCommand):
+    help = "Delivers queued emails, once or continuously with --loop."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                            help="Emails sent per mail server connection.")
+        parser.add_argument('--loop', action='store_true',
+                            help="Keep polling the queue instead of exiting when it is empty.")
+        parser.add_argument('--interval', type=float, default=2,
+                            help="Seconds to wait between polls of an empty queue.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        try:
+            while True:
+                claimed, sent = deliver_batch(batch_size=batch_size)
+                if claimed:
+                    self.stdout.write(f"Sent {sent} of {claimed} queued emails.")
+                if claimed == batch_size:
+                    continue
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,20 @@
+from django.db import models
+from django.db.models import Q
+from mailer.choices import STATUS_QUEUED, STATUS_SENDING
+
+
+class QueuedEmailQuerySet(models.QuerySet):
+
+    def due(self, now, lease_expired_before):
+        """
+        Returns the emails ready for a delivery attempt: queued ones whose
+        retry time has come, and ones claimed by a worker that has not
+        reported back within its lease (it most likely died mid-batch).
+        """
+        return self.filter(
+            Q(status=STATUS_QUEUED, next_attempt_at__lte=now)
+            | Q(status=STATUS_SENDING, claimed_at__lt=lease_expired_before)
+        )
+
+
+QueuedEmailManager = models.Manager.from_queryset(QueuedEmailQuerySet)
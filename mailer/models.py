@@ -0,0 +1,33 @@
+from django.db import models
+from mailer.choices import STATUS_QUEUED, STATUS_TYPE
+from mailer.managers import QueuedEmailManager
+
+
+class QueuedEmail(models.Model):
+    """
+    An outbound email waiting for the send_queued_mail worker. The message
+    is stored as plain fields (see mailer.queues) rather than pickled.
+    """
+    subject = models.TextField(blank=True)
+    from_email = models.CharField(max_length=254, blank=True)
+    message = models.JSONField(default=dict)
+    status = models.CharField(
+        max_length=10, choices=STATUS_TYPE, default=STATUS_QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField()
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_on = models.DateTimeField(auto_now_add=True)
+    sent_on = models.DateTimeField(null=True, blank=True)
+
+    objects = QueuedEmailManager()
+
+    def __str__(self):
+        return f'{self.subject} ({self.status})'
+
+    class Meta:
+        ordering = ['next_attempt_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'],
+                         name='queued_email_due_idx'),
+        ]
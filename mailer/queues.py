@@ -0,0 +1,207 @@
+import base64
+import random
+from datetime import timedelta
+from email.mime.base import MIMEBase
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from mailer.choices import STATUS_FAILED, STATUS_QUEUED, STATUS_SENDING, STATUS_SENT
+from mailer.models import QueuedEmail
+
+DEFAULT_QUEUE_BACKEND = 'mailer.queues.DatabaseQueue'
+
+# Delivery attempts before an email is marked FAILED for good.
+MAX_ATTEMPTS = 8
+
+# Retries wait RETRY_BASE_DELAY * 2 ** (attempts - 1) seconds, capped at
+# RETRY_MAX_DELAY, plus up to 10% jitter so a burst of failures does not
+# retry in lockstep.
+RETRY_BASE_DELAY = 60
+RETRY_MAX_DELAY = 60 * 60
+
+# Seconds a worker may hold claimed emails before another worker takes
+# them over.
+CLAIM_LEASE = 10 * 60
+
+# Share of CLAIM_LEASE after which a worker still sending a batch renews
+# the lease on the emails it has left.
+LEASE_RENEW_AFTER = 0.5
+
+
+def retry_delay(attempts):
+    delay = min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY)
+    return timedelta(seconds=delay * (1 + random.random() / 10))
+
+
+def serialize_message(message):
+    """
+    Returns a JSON-compatible dict holding everything needed to rebuild an
+    EmailMessage or EmailMultiAlternatives.
+    """
+    attachments = []
+    for attachment in message.attachments:
+        if isinstance(attachment, MIMEBase):
+            raise ValueError("MIMEBase attachments cannot be queued.")
+        filename, content, mimetype = attachment
+        is_text = isinstance(content, str)
+        if is_text:
+            content = content.encode()
+        attachments.append({
+            'filename': filename,
+            'content': base64.b64encode(content).decode(),
+            'mimetype': mimetype,
+            'text': is_text,
+        })
+    return {
+        'subject': message.subject,
+        'body': message.body,
+        'from_email': message.from_email,
+        'to': list(message.to),
+        'cc': list(message.cc),
+        'bcc': list(message.bcc),
+        'reply_to': list(message.reply_to),
+        'headers': dict(message.extra_headers),
+        'alternatives': [list(alternative) for alternative in getattr(message, 'alternatives', [])],
+        'attachments': attachments,
+        'content_subtype': message.content_subtype,
+        'mixed_subtype': message.mixed_subtype,
+        'encoding': message.encoding,
+    }
+
+
+def deserialize_message(data):
+    message = EmailMultiAlternatives(
+        subject=data['subject'], body=data['body'], from_email=data['from_email'],
+        to=data['to'], cc=data['cc'], bcc=data['bcc'], reply_to=data['reply_to'],
+        headers=data['headers'],
+        alternatives=[tuple(alternative) for alternative in data['alternatives']],
+    )
+    for attachment in data['attachments']:
+        content = base64.b64decode(attachment['content'])
+        if attachment['text']:
+            content = content.decode()
+        message.attach(attachment['filename'], content, attachment['mimetype'])
+    message.content_subtype = data['content_subtype']
+    message.mixed_subtype = data['mixed_subtype']
+    message.encoding = data['encoding']
+    return message
+
+
+class BaseQueue:
+    """
+    Storage for outbound mail. Set MAILER_QUEUE_BACKEND to the dotted path
+    of a subclass to keep the queue somewhere other than the database.
+
+    claim() hands out (token, message) pairs; the worker passes the tokens
+    it has yet to send to renew() before each send, and reports each token
+    it sends back through exactly one of mark_sent() or mark_failed().
+    """
+
+    def enqueue(self, messages):
+        raise NotImplementedError
+
+    def claim(self, limit):
+        raise NotImplementedError
+
+    def renew(self, tokens):
+        """
+        Extends the claim on tokens and returns the ones still held. Those
+        left out were taken over by another worker and must not be sent.
+        """
+        return tokens
+
+    def mark_sent(self, token):
+        raise NotImplementedError
+
+    def mark_failed(self, token, error, permanent=False):
+        raise NotImplementedError
+
+
+class DatabaseQueue(BaseQueue):
+    """
+    Keeps the queue in the QueuedEmail table, so mail works without any
+    service besides the database. On PostgreSQL, concurrent workers skip
+    each other's rows with SELECT ... FOR UPDATE SKIP LOCKED.
+    """
+
+    def enqueue(self, messages):
+        now = timezone.now()
+        QueuedEmail.objects.bulk_create([
+            QueuedEmail(
+                subject=message.subject, from_email=message.from_email or '',
+                message=serialize_message(message), next_attempt_at=now)
+            for message in messages
+        ])
+        return len(messages)
+
+    def claim(self, limit):
+        now = timezone.now()
+        with transaction.atomic():
+            emails = list(QueuedEmail.objects.due(
+                now, now - timedelta(seconds=CLAIM_LEASE)
+            ).select_for_update(skip_locked=True)[:limit])
+            QueuedEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+                status=STATUS_SENDING, claimed_at=now)
+
+        claimed = []
+        for email in emails:
+            email.status, email.claimed_at = STATUS_SENDING, now
+            try:
+                claimed.append((email, deserialize_message(email.message)))
+            except (KeyError, TypeError, ValueError) as e:
+                self.mark_failed(email, f"Unreadable queued message: {e}", permanent=True)
+        return claimed
+
+    def renew(self, emails):
+        """
+        Moves claimed_at forward on the emails whose lease is more than
+        LEASE_RENEW_AFTER used up, so a batch that sends slowly is not
+        reclaimed, and sent twice, by another worker. A row whose
+        claimed_at is no longer the one this worker set was taken over.
+        """
+        now = timezone.now()
+        renew_before = now - timedelta(seconds=CLAIM_LEASE * LEASE_RENEW_AFTER)
+        due = [email for email in emails if email.claimed_at <= renew_before]
+        if not due:
+            return emails
+
+        due_pks = [email.pk for email in due]
+        renewed = QueuedEmail.objects.filter(
+            pk__in=due_pks, status=STATUS_SENDING,
+            claimed_at__in={email.claimed_at for email in due},
+        ).update(claimed_at=now)
+        if renewed == len(due):
+            held = set(due_pks)
+        else:
+            held = set(QueuedEmail.objects.filter(
+                pk__in=due_pks, status=STATUS_SENDING, claimed_at=now,
+            ).values_list('pk', flat=True))
+        lost = set()
+        for email in due:
+            if email.pk in held:
+                email.claimed_at = now
+            else:
+                lost.add(email.pk)
+        return [email for email in emails if email.pk not in lost]
+
+    def mark_sent(self, email):
+        # The body goes once delivered: it may hold OTPs and reset tokens.
+        QueuedEmail.objects.filter(pk=email.pk).update(
+            status=STATUS_SENT, sent_on=timezone.now(), claimed_at=None,
+            attempts=email.attempts + 1, message={}, last_error='')
+
+    def mark_failed(self, email, error, permanent=False):
+        attempts = email.attempts + 1
+        if permanent or attempts >= MAX_ATTEMPTS:
+            status, next_attempt_at = STATUS_FAILED, email.next_attempt_at
+        else:
+            status, next_attempt_at = STATUS_QUEUED, timezone.now() + retry_delay(attempts)
+        QueuedEmail.objects.filter(pk=email.pk).update(
+            status=status, attempts=attempts, next_attempt_at=next_attempt_at,
+            claimed_at=None, last_error=str(error))
+
+
+def get_queue():
+    return import_string(getattr(settings, 'MAILER_QUEUE_BACKEND', DEFAULT_QUEUE_BACKEND))()
@@ -0,0 +1,60 @@
+from datetime import timedelta
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from mailer.choices import STATUS_SENDING, STATUS_SENT
+from mailer.delivery import deliver_batch
+from mailer.models import QueuedEmail
+from mailer.queues import CLAIM_LEASE, LEASE_RENEW_AFTER, DatabaseQueue
+
+
+@override_settings(MAILER_DELIVERY_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class DatabaseQueueLeaseTests(TestCase):
+
+    def setUp(self):
+        self.queue = DatabaseQueue()
+        self.queue.enqueue([
+            EmailMessage(f'Message {i}', 'Body', 'from@example.com', [f'to{i}@example.com'])
+            for i in range(3)])
+
+    def age_claims(self, emails, seconds):
+        claimed_at = timezone.now() - timedelta(seconds=seconds)
+        QueuedEmail.objects.filter(pk__in=[email.pk for email in emails]).update(claimed_at=claimed_at)
+        for email in emails:
+            email.claimed_at = claimed_at
+
+    def test_fresh_claims_are_not_renewed(self):
+        emails = [email for email, message in self.queue.claim(3)]
+        with self.assertNumQueries(0):
+            self.assertEqual(self.queue.renew(emails), emails)
+
+    def test_renewal_keeps_a_slow_batch_from_being_reclaimed(self):
+        emails = [email for email, message in self.queue.claim(3)]
+        self.age_claims(emails, CLAIM_LEASE * LEASE_RENEW_AFTER + 1)
+        self.assertEqual(self.queue.renew(emails[1:]), emails[1:])
+
+        # Once the original lease runs out, only the email that was not
+        # renewed is handed to another worker.
+        self.age_claims(emails[:1], CLAIM_LEASE + 1)
+        self.assertEqual([email for email, message in DatabaseQueue().claim(3)], emails[:1])
+
+    def test_claims_taken_over_are_dropped(self):
+        emails = [email for email, message in self.queue.claim(3)]
+        self.age_claims(emails, CLAIM_LEASE + 1)
+        taken = [email for email, message in DatabaseQueue().claim(1)]
+        self.assertEqual(len(taken), 1)
+        held = self.queue.renew(emails)
+        self.assertEqual(len(held), 2)
+        self.assertNotIn(taken[0], held)
+
+    def test_deliver_batch_skips_emails_taken_over(self):
+        class TakenOverQueue(DatabaseQueue):
+            # Another worker takes the last email over mid-batch.
+            def renew(self, emails):
+                return [email for email in emails if email.subject != 'Message 2']
+
+        self.assertEqual(deliver_batch(TakenOverQueue()), (3, 2))
+        self.assertCountEqual([message.subject for message in mail.outbox], ['Message 0', 'Message 1'])
+        self.assertEqual(QueuedEmail.objects.filter(status=STATUS_SENT).count(), 2)
+        self.assertEqual(QueuedEmail.objects.get(subject='Message 2').status, STATUS_SENDING)
@@ -57,6 +57,7 @@ INSTALLED_APPS = [
     'drf_yasg',
     'channels',
     'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     'django_rest_passwordreset',
     'cloudinary',
@@ -69,6 +70,7 @@ INSTALLED_APPS = [
     'authentication',
     'booking',
     'listing',
+    'mailer',
 ]
 
 AUTHENTICATION_BACKENDS = (
@@ -89,17 +91,28 @@ ACTIVATE_JWT: True
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'utils.middleware.StaticFilesMiddleware',
+    'utils.middleware.CompressionMiddleware',
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     'corsheaders.middleware.CorsMiddleware',
-    'social_django.middleware.SocialAuthExceptionMiddleware',
+    'utils.middleware.SocialAuthExceptionMiddleware',
 
 ]
 
+# API response compression, see utils.middleware.CompressionMiddleware.
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_CONTENT_TYPES = [
+    'application/json',
+    'application/x-ndjson',
+    'text/csv',
+]
+COMPRESSION_PATH_PREFIXES = ['/api/']
+COMPRESSION_BROTLI_QUALITY = 5
+
 ROOT_URLCONF = "tripdey.urls"
 
 TEMPLATES = [
@@ -213,7 +226,12 @@ DJANGO_REST_PASSWORDRESET_TOKEN_CONFIG = {
 }
 
 # EMAIL CONFIGURATION
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# Mail is queued by mailer and delivered by `manage.py send_queued_mail`
+# through MAILER_DELIVERY_BACKEND.
+EMAIL_BACKEND = 'mailer.backends.QueuedEmailBackend'
+MAILER_DELIVERY_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+MAILER_QUEUE_BACKEND = 'mailer.queues.DatabaseQueue'
+EMAIL_TIMEOUT = 30
 EMAIL_HOST = 'smtp.mail.yahoo.com'
 EMAIL_PORT = 465
 EMAIL_USE_SSL = True
@@ -229,10 +247,14 @@ DRF_STANDARDIZED_ERRORS = {
 }
 REST_FRAMEWORK = {
     'EXCEPTION_HANDLER': "drf_standardized_errors.handler.exception_handler",
+    'DEFAULT_RENDERER_CLASSES': [
+        'utils.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-        'oauth2_provider.contrib.rest_framework.OAuth2Authentication',
-        'drf_social_oauth2.authentication.SocialAuthentication',
+        # Routes each request to the JWT, OAuth2 or social backend listed
+        # in authentication.authentication.BACKENDS.
+        'authentication.authentication.DispatchAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -264,12 +286,19 @@ SOCIAL_AUTH_GOOGLE_OAUTH2_SCOPE = [
     'https://www.googleapis.com/auth/userinfo.profile',
 ]
 
+# OAuth client ids whose Google ID tokens GoogleAPIView accepts. Set
+# GOOGLE_ID_TOKEN_KEY_SOURCE to the dotted path of a key source factory
+# (see authentication.id_tokens) to verify against another issuer's keys.
+GOOGLE_CLIENT_IDS = [
+    "350555450693-gjibqaqtqt6q1o061vaps46c0cs7poci.apps.googleusercontent.com",
+]
+
 
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "ROTATE_REFRESH_TOKENS": True,
-    "BLACKLIST_AFTER_ROTATION": False,
+    "BLACKLIST_AFTER_ROTATION": True,
     "UPDATE_LAST_LOGIN": True,
 
     "ALGORITHM": "HS256",
@@ -297,15 +326,35 @@ SIMPLE_JWT = {
     "SLIDING_TOKEN_LIFETIME": timedelta(minutes=5),
     "SLIDING_TOKEN_REFRESH_LIFETIME": timedelta(days=1),
 
-    "TOKEN_OBTAIN_SERIALIZER": "rest_framework_simplejwt.serializers.TokenObtainPairSerializer",
-    "TOKEN_REFRESH_SERIALIZER": "rest_framework_simplejwt.serializers.TokenRefreshSerializer",
-    "TOKEN_VERIFY_SERIALIZER": "rest_framework_simplejwt.serializers.TokenVerifySerializer",
+    "TOKEN_OBTAIN_SERIALIZER": "authentication.tokens.ClaimsTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "authentication.tokens.ClaimsTokenRefreshSerializer",
+    "TOKEN_VERIFY_SERIALIZER": "authentication.tokens.RevocationCheckedTokenVerifySerializer",
     "TOKEN_BLACKLIST_SERIALIZER": "rest_framework_simplejwt.serializers.TokenBlacklistSerializer",
     "SLIDING_TOKEN_OBTAIN_SERIALIZER": "rest_framework_simplejwt.serializers.TokenObtainSlidingSerializer",
     "SLIDING_TOKEN_REFRESH_SERIALIZER": "rest_framework_simplejwt.serializers.TokenRefreshSlidingSerializer",
 }
 
 
+# Local memory by default, for tests and development. Production must set
+# REDIS_CACHE_URL so every worker shares the taxonomy and response caches,
+# the users that authentication.authentication looks up on every request
+# and the revocation version. Without a shared cache, authentication.checks
+# fails `manage.py check --deploy`, which the release phase runs.
+if os.getenv('REDIS_CACHE_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_CACHE_URL'),
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }
+
+
 CHANNEL_LAYERS = {
     'default': {
         'BACKEND': 'channels_redis.core.RedisChannelLayer',
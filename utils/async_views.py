@@ -0,0 +1,23 @@
+from adrf.views import APIView
+from asgiref.sync import iscoroutinefunction
+from django.utils.functional import classproperty
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView whose coroutine handlers run on the event loop under ASGI.
+
+    Django refuses views that mix sync and async handlers; this one accepts
+    them and runs the sync ones (the writes, with their Cloudinary uploads
+    and emails) through sync_to_async, in a worker thread, so they never
+    block the loop. Authentication, permissions and throttling are sync in
+    DRF and run the same way.
+    """
+
+    @classproperty
+    def view_is_async(cls):
+        return any(
+            iscoroutinefunction(getattr(cls, method))
+            for method in cls.http_method_names
+            if method != 'options' and hasattr(cls, method)
+        )
@@ -0,0 +1,67 @@
+import hashlib
+from functools import wraps
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+
+
+def make_etag(*parts):
+    return quote_etag(hashlib.md5(
+        '|'.join(str(part) for part in parts).encode()).hexdigest())
+
+
+def not_modified(request, etag=None, last_modified=None):
+    """
+    Returns a 304 (or 412) response when the request's If-None-Match or
+    If-Modified-Since header already matches these validators, else None.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return get_conditional_response(
+        request, etag=etag, last_modified=timestamp)
+
+
+def set_validators(response, etag=None, last_modified=None):
+    if response.status_code != status.HTTP_200_OK:
+        return response
+    if etag:
+        response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+
+def conditional_get(validators):
+    """
+    Adds conditional GET support to an APIView get() method.
+
+    validators(view, request, *args, **kwargs) returns (etag, last_modified)
+    for the resource, either of which may be None. It runs before the view
+    and should only read cheap version data (updated_on, a cache version,
+    an aggregate), so an unchanged resource is answered with a 304 without
+    loading or serializing anything.
+
+    Coroutine get() methods get an async wrapper that runs validators in a
+    worker thread.
+    """
+    def decorator(get):
+        if iscoroutinefunction(get):
+            @wraps(get)
+            async def async_wrapper(view, request, *args, **kwargs):
+                etag, last_modified = await sync_to_async(validators)(
+                    view, request, *args, **kwargs)
+                response = not_modified(request, etag, last_modified)
+                if response is not None:
+                    return response
+                return set_validators(await get(view, request, *args, **kwargs), etag, last_modified)
+            return async_wrapper
+
+        @wraps(get)
+        def wrapper(view, request, *args, **kwargs):
+            etag, last_modified = validators(view, request, *args, **kwargs)
+            response = not_modified(request, etag, last_modified)
+            if response is not None:
+                return response
+            return set_validators(get(view, request, *args, **kwargs), etag, last_modified)
+        return wrapper
+    return decorator
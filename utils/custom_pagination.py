@@ -1,6 +1,14 @@
+import json
+import base64
+import binascii
+from asgiref.sync import sync_to_async
 from django.core.paginator import Paginator, EmptyPage
+from django.db import connections
+from django.db.models import Q
+from rest_framework import status
 from rest_framework.response import Response
 
+from exceptions.custom_apiexception_class import CustomAPIException
 from utils.custom_response import custom_response
 
 
@@ -28,3 +36,114 @@ class CustomPagination:
             'num_pages': self.page.paginator.num_pages,
             'results': data
         })
+
+
+def approximate_count(queryset):
+    """
+    Returns the planner's row estimate on PostgreSQL, which avoids a full
+    COUNT(*) scan, and an exact count on other databases.
+    """
+    if connections[queryset.db].vendor != 'postgresql':
+        return queryset.count()
+    plan = json.loads(queryset.order_by().explain(format='json'))
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class CursorPagination:
+    """
+    Keyset pagination over a unique ordering such as (-updated_on, -id).
+
+    Each page is fetched with a WHERE clause on the last row of the previous
+    page instead of an OFFSET, so page cost stays flat as the table grows.
+    No COUNT query is run unless the client asks for one with ?count=1.
+    """
+    page_size = 24
+    max_page_size = 100
+    ordering = ('-updated_on', '-id')
+    cursor_query_param = 'cursor'
+
+    def __init__(self, ordering=None):
+        if ordering is not None:
+            self.ordering = ordering
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(
+                'page_size', self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def encode_cursor(self, instance):
+        position = [str(getattr(instance, field.lstrip('-')))
+                    for field in self.ordering]
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            position = None
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise CustomAPIException(
+                detail="Invalid cursor.", status_code=status.HTTP_400_BAD_REQUEST)
+        return position
+
+    def get_position_filter(self, position):
+        """
+        Builds (a < x) OR (a = x AND b < y) OR ... for the ordering, flipping
+        the comparison for ascending fields.
+        """
+        filters = Q()
+        equal = {}
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            filters |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return filters
+
+    def get_page_queryset(self, queryset, request):
+        self.request = request
+        self.cursor = self.decode_cursor(request)
+        self.count = None
+        queryset = queryset.order_by(*self.ordering)
+        if self.cursor is not None:
+            queryset = queryset.filter(self.get_position_filter(self.cursor))
+        return queryset[:self.get_page_size(request) + 1]
+
+    def wants_count(self, request):
+        return request.query_params.get('count') in ('1', 'true')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page = self.get_page_queryset(queryset, request)
+        if self.wants_count(request):
+            self.count = approximate_count(queryset)
+        return self.set_page(list(page))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        paginate_queryset() for async views, fetching the page through the
+        async ORM.
+        """
+        page = self.get_page_queryset(queryset, request)
+        if self.wants_count(request):
+            self.count = await sync_to_async(approximate_count)(queryset)
+        return self.set_page([instance async for instance in page])
+
+    def set_page(self, results):
+        page_size = self.get_page_size(self.request)
+        has_next = len(results) > page_size
+        results = results[:page_size]
+        self.next_cursor = self.encode_cursor(results[-1]) if has_next else None
+        return results
+
+    def get_paginated_response(self, data, message="Success", results_key='results'):
+        return custom_response(status_code=200, message=message, data={
+            'count': self.count,
+            'next': self.next_cursor,
+            results_key: data
+        })
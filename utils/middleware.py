@@ -0,0 +1,203 @@
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from social_django.middleware import SocialAuthExceptionMiddleware as BaseSocialAuthExceptionMiddleware
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+# Defaults for the COMPRESSION_* settings.
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_CONTENT_TYPES = ('application/json',)
+COMPRESSION_PATH_PREFIXES = ('/api/',)
+# Quality 11 is meant for static assets; 4-6 keeps per-request cost close
+# to gzip while still compressing noticeably better.
+COMPRESSION_BROTLI_QUALITY = 5
+
+
+def compression_setting(name):
+    return getattr(settings, name, globals()[name])
+
+
+def parse_accept_encoding(header):
+    """
+    Returns a dict mapping each coding in an Accept-Encoding header to its
+    q-value.
+    """
+    accepted = {}
+    for item in header.split(','):
+        coding, *params = item.split(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def brotli_compressor():
+    return brotli.Compressor(
+        mode=brotli.MODE_TEXT, quality=compression_setting('COMPRESSION_BROTLI_QUALITY'))
+
+
+def compress_brotli(content):
+    compressor = brotli_compressor()
+    return compressor.process(content) + compressor.finish()
+
+
+def compress_brotli_sequence(sequence):
+    compressor = brotli_compressor()
+    for item in sequence:
+        data = compressor.process(item)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def compress_brotli_async_sequence(sequence):
+    compressor = brotli_compressor()
+    async for item in sequence:
+        data = compressor.process(item)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Compresses API responses with brotli or gzip, whichever the client
+    prefers (brotli on a tie, and only when the brotli package is
+    installed).
+
+    Only responses under COMPRESSION_PATH_PREFIXES whose media type is in
+    COMPRESSION_CONTENT_TYPES are touched, and non-streaming ones only from
+    COMPRESSION_MIN_SIZE bytes. Streaming responses, such as the listing
+    exports, are compressed chunk by chunk as they are sent. HTML is left
+    out of the defaults on purpose: the browsable API pages carry a CSRF
+    token, which compression would expose to BREACH-style attacks.
+    """
+
+    def process_response(self, request, response):
+        if not self.is_compressible(request, response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if not response.streaming and len(response.content) < compression_setting('COMPRESSION_MIN_SIZE'):
+            return response
+
+        encoding = self.select_encoding(request)
+        if encoding == 'gzip':
+            return super().process_response(request, response)
+        if encoding == 'br':
+            return self.compress_brotli(response)
+        return response
+
+    def is_compressible(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return False
+        if 'no-transform' in response.get('Cache-Control', ''):
+            return False
+        if not request.path.startswith(tuple(compression_setting('COMPRESSION_PATH_PREFIXES'))):
+            return False
+        media_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        return media_type in compression_setting('COMPRESSION_CONTENT_TYPES')
+
+    def select_encoding(self, request):
+        """
+        Returns 'br', 'gzip' or None for the request's Accept-Encoding.
+        """
+        accepted = parse_accept_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        encodings = ('br', 'gzip') if brotli is not None else ('gzip',)
+        best, best_quality = None, 0.0
+        for encoding in encodings:
+            quality = accepted.get(encoding, accepted.get('*', 0.0))
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    def compress_brotli(self, response):
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = compress_brotli_async_sequence(
+                    response.streaming_content)
+            else:
+                response.streaming_content = compress_brotli_sequence(
+                    response.streaming_content)
+            del response.headers['Content-Length']
+        else:
+            compressed_content = compress_brotli(response.content)
+            if len(compressed_content) >= len(response.content):
+                return response
+            response.content = compressed_content
+            response.headers['Content-Length'] = str(len(response.content))
+
+        # Same as GZipMiddleware: a compressed body no longer matches a
+        # strong ETag byte for byte.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
+
+
+# Django runs a sync-only middleware, and every layer below it down to the
+# view, in a worker thread. Under ASGI that would push the async views back
+# onto async_to_sync, so the two sync-only middlewares in MIDDLEWARE get
+# async-capable versions below.
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoiseMiddleware that can also run in async mode, where it serves
+    static files from a worker thread and awaits everything else. API
+    requests never leave the event loop.
+    """
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        self.serves_root = bool(getattr(settings, 'WHITENOISE_ROOT', None))
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        path = request.path_info
+        if not self.autorefresh:
+            static_file = self.files.get(path)
+        elif self.serves_root or path.startswith(self.static_prefix):
+            # Autorefresh (DEBUG) looks files up on disk.
+            static_file = await sync_to_async(self.find_file)(path)
+        else:
+            static_file = None
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
+
+
+class SocialAuthExceptionMiddleware(BaseSocialAuthExceptionMiddleware):
+    """
+    social_django's middleware only implements process_exception, which
+    Django adapts itself, so its pass-through __call__ works in both modes.
+    """
+    async_capable = True
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
@@ -0,0 +1,65 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# orjson writes these two characters raw; DRF escapes them so responses can
+# be embedded in a <script> tag, and so do we.
+LINE_SEPARATORS = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+encoder = JSONEncoder()
+
+# Types orjson would write itself, handed to DRF's encoder instead so they
+# come out as JSONRenderer writes them: datetimes, dates and times in DRF's
+# format (it rejects aware times), and dataclasses, which DRF refuses.
+PASSTHROUGH = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS) if orjson else 0
+
+
+def dumps(data):
+    """
+    Serializes data to compact UTF-8 JSON bytes with orjson when it is
+    installed, else with DRF's JSONEncoder. Everything orjson does not write
+    the way DRF does (datetimes, Decimal, timedelta, lazy strings,
+    querysets, ...) is converted by DRF's encoder, so the output matches
+    JSONRenderer's with one exception: orjson writes NaN and infinite floats
+    as null, where JSONRenderer raises ValueError under STRICT_JSON. Finding
+    them first would take a pass over the data costing more than orjson's
+    whole encoding.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                data, default=encoder.default,
+                option=orjson.OPT_NON_STR_KEYS | PASSTHROUGH)
+        except orjson.JSONEncodeError:
+            # Integers beyond 64 bits and the like; the json module copes.
+            pass
+    return json.dumps(
+        data, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Drop-in replacement for DRF's JSONRenderer backed by dumps() above.
+    Requests for indented output (the browsable API, ?indent=) and
+    ensure_ascii configurations go through DRF's own rendering instead.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        if (orjson is None or self.ensure_ascii or not self.compact
+                or self.get_indent(accepted_media_type, renderer_context)):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = dumps(data)
+        for raw, escaped in LINE_SEPARATORS:
+            if raw in ret:
+                ret = ret.replace(raw, escaped)
+        return ret
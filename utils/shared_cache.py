@@ -0,0 +1,14 @@
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+# Cache backends whose entries are not seen by other processes.
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+def is_shared(alias=DEFAULT_CACHE_ALIAS):
+    """
+    Returns whether every process using the cache sees what the others
+    store in it, which state such as cached users and invalidations relies on.
+    """
+    return not isinstance(caches[alias], PROCESS_LOCAL_CACHES)
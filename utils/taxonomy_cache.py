@@ -0,0 +1,170 @@
+import json
+import time
+from django.core.cache import cache
+from django.utils.dateparse import parse_datetime
+from rest_framework import serializers, status
+
+from utils.conditional import make_etag, not_modified, set_validators
+from utils.custom_response import custom_response
+from utils.local_cache import LocalLRUCache
+
+# Seconds a process trusts its own copy of a table before re-reading the
+# shared cache. Saves and deletes in the same process invalidate at once;
+# other processes catch up within this window.
+LOCAL_TTL = 30
+
+# Seconds the shared cache keeps a table snapshot; signals delete it on
+# every change, so this only bounds the damage of a missed invalidation.
+SHARED_TTL = 60 * 60
+
+# Seconds a snapshot read from the database is trusted to hold every row,
+# so ids missing from it do not reload the table again. Bounds reloads to
+# one per table per interval however many new rows a page renders.
+RELOAD_INTERVAL = 5
+
+# max-age sent with taxonomy GET responses.
+TAXONOMY_MAX_AGE = 60
+
+local_snapshots = LocalLRUCache(maxsize=32, ttl=LOCAL_TTL)
+
+# TaxonomyCache instances by model, filled in as they are created.
+registry = {}
+
+
+class TaxonomySnapshot:
+    """
+    The serialized rows of one taxonomy table, indexed by id and by name.
+    loaded_at is the time.monotonic() a snapshot was read from the database,
+    or None for one read from the shared cache.
+    """
+
+    def __init__(self, items, name_field, loaded_at=None):
+        self.items = items
+        self.loaded_at = loaded_at
+        self.etag = make_etag(json.dumps(items, sort_keys=True))
+        updated = [parse_datetime(item['updated_on'])
+                   for item in items if item.get('updated_on')]
+        self.last_modified = max(updated, default=None)
+        self.by_id = {str(item['id']): item for item in items}
+        self.by_name = {}
+        for item in items:
+            self.by_name.setdefault(item[name_field], item)
+
+    @property
+    def fresh(self):
+        return self.loaded_at is not None and time.monotonic() - self.loaded_at < RELOAD_INTERVAL
+
+
+class TaxonomyCache:
+    """
+    Caches a whole reference table (amenities, car types, ...) as serialized
+    rows: first in process memory, then in Django's cache, then from the
+    database. Call invalidate() whenever a row is saved or deleted.
+    """
+
+    def __init__(self, model, serializer_class, name_field):
+        self.model = model
+        self.serializer_class = serializer_class
+        self.name_field = name_field
+        self.key = f'taxonomy:{model._meta.label_lower}'
+        registry[model] = self
+
+    @classmethod
+    def for_model(cls, model):
+        return registry[model]
+
+    def snapshot(self):
+        snapshot = local_snapshots.get(self.key)
+        if snapshot is not None:
+            return snapshot
+        items = cache.get(self.key)
+        if items is None:
+            return self.reload()
+        snapshot = TaxonomySnapshot(items, self.name_field)
+        local_snapshots.set(self.key, snapshot)
+        return snapshot
+
+    def reload(self):
+        """
+        Reads the table from the database into both cache levels and
+        returns the fresh snapshot.
+        """
+        items = self.load()
+        cache.set(self.key, items, SHARED_TTL)
+        snapshot = TaxonomySnapshot(items, self.name_field, loaded_at=time.monotonic())
+        local_snapshots.set(self.key, snapshot)
+        return snapshot
+
+    def load(self):
+        # A JSON round trip turns the serializer output into plain dicts and
+        # strings, which pickle into the shared cache and hash stably.
+        data = self.serializer_class(self.model.objects.all(), many=True).data
+        return json.loads(json.dumps(data, default=str))
+
+    def invalidate(self):
+        local_snapshots.delete(self.key)
+        cache.delete(self.key)
+
+    def all(self):
+        return self.snapshot().items
+
+    def get(self, pk):
+        """
+        Returns the serialized row with this id, or None if it does not exist.
+        A row missing from the snapshot, such as one another process added a
+        moment ago, reloads the whole table unless the snapshot is fresh, so
+        rendering many new rows costs one query rather than one each.
+        """
+        snapshot = self.snapshot()
+        item = snapshot.by_id.get(str(pk))
+        if item is None and not snapshot.fresh:
+            item = self.reload().by_id.get(str(pk))
+        return item
+
+    def ids_by_name(self, names):
+        """
+        Maps each of names that the snapshot knows to its row id.
+        """
+        by_name = self.snapshot().by_name
+        return {name: by_name[name]['id'] for name in names if name in by_name}
+
+
+class TaxonomyField(serializers.Field):
+    """
+    Renders a foreign key to a cached taxonomy from its *_id column, so the
+    related row does not have to be joined in.
+    """
+
+    def __init__(self, model, **kwargs):
+        self.model = model
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return TaxonomyCache.for_model(self.model).get(value)
+
+
+class TaxonomyListField(TaxonomyField):
+    """
+    Renders a many-to-many relation to a cached taxonomy. Only the related
+    ids are used, so the relation can be prefetched with only('id').
+    """
+
+    def to_representation(self, value):
+        taxonomy = TaxonomyCache.for_model(self.model)
+        return [item for item in (taxonomy.get(obj.pk) for obj in value.all()) if item is not None]
+
+
+def taxonomy_response(request, taxonomy, message, data):
+    """
+    Returns data with the taxonomy's ETag, Last-Modified and Cache-Control
+    headers, or an empty 304 when the client already has this version.
+    """
+    snapshot = taxonomy.snapshot()
+    response = not_modified(request, snapshot.etag, snapshot.last_modified)
+    if response is None:
+        response = set_validators(
+            custom_response(status_code=status.HTTP_200_OK, message=message, data=data),
+            snapshot.etag, snapshot.last_modified)
+    response['Cache-Control'] = f'private, max-age={TAXONOMY_MAX_AGE}'
+    return response